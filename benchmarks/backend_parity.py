@@ -0,0 +1,190 @@
+"""Parity check and timing of the DAODataProcessor compute backends.
+
+Runs ``process_path`` with the pandas backend and every other installed
+backend (duckdb, polars) over the same CSV or Parquet files, and fails
+when any result dict differs from the pandas one. Floats are compared
+with a relative tolerance, since the engines sum in different orders;
+everything else must match exactly. Streaming states built per chunk
+and merged, with one chunk's network column all missing, must give the
+same counts and time series as ``process``. No network access is needed.
+
+Usage:
+    python benchmarks/backend_parity.py --rows 100k
+    python benchmarks/backend_parity.py --data-dir data/backup/3 --backends duckdb
+"""
+import argparse
+import math
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import generate, parse_size  # noqa: E402
+from src.processors.backends import BACKENDS  # noqa: E402
+from src.processors.dao_processor import DAODataProcessor  # noqa: E402
+
+DEFAULT_RTOL = 1e-6
+# Chunks merged by the streaming state check
+MERGE_CHUNKS = 4
+
+
+def differences(expected: Any, actual: Any, rtol: float, path: str = '') -> List[str]:
+    """Human-readable differences between two result structures"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        found = []
+        for key in expected.keys() | actual.keys():
+            where = f"{path}/{key}"
+            if key not in actual:
+                found.append(f"{where}: missing")
+            elif key not in expected:
+                found.append(f"{where}: unexpected")
+            else:
+                found.extend(differences(expected[key], actual[key], rtol, where))
+        return found
+    if isinstance(expected, (np.ndarray, list)) and isinstance(
+        actual, (np.ndarray, list)
+    ):
+        if len(expected) != len(actual):
+            return [f"{path}: length {len(actual)} != {len(expected)}"]
+        return [
+            found for i, (left, right) in enumerate(zip(expected, actual))
+            for found in differences(left, right, rtol, f"{path}[{i}]")
+        ]
+    if isinstance(expected, float) or isinstance(actual, float):
+        try:
+            left, right = float(expected), float(actual)
+        except (TypeError, ValueError):
+            return [f"{path}: {actual!r} != {expected!r}"]
+        if (math.isnan(left) and math.isnan(right)) or math.isclose(
+            left, right, rel_tol=rtol
+        ):
+            return []
+        return [f"{path}: {right!r} != {left!r}"]
+    if expected != actual:
+        return [f"{path}: {actual!r} != {expected!r}"]
+    return []
+
+
+def installed_backends(names: List[str]) -> List[str]:
+    available = []
+    for name in names:
+        try:
+            DAODataProcessor(backend=name)
+        except ImportError:
+            print(f"{name}: not installed, skipped")
+            continue
+        available.append(name)
+    return available
+
+
+def run(paths: Dict[str, Path], backends: List[str], rtol: float) -> List[str]:
+    """Compare every backend against pandas; returns the failures"""
+    failures = []
+    reference = DAODataProcessor()
+    print(f"{'dataset':24} {'backend':8} {'seconds':>8}  result")
+    for name, path in paths.items():
+        start = time.perf_counter()
+        expected = reference.process_path(path, {'name': name})
+        print(f"{name:24} {'pandas':8} {time.perf_counter() - start:8.3f}  reference")
+        for backend in backends:
+            processor = DAODataProcessor(backend=backend)
+            start = time.perf_counter()
+            actual = processor.process_path(path, {'name': name})
+            elapsed = time.perf_counter() - start
+            found = differences(expected, actual, rtol)
+            print(f"{name:24} {backend:8} {elapsed:8.3f}  "
+                  f"{'identical' if not found else f'{len(found)} differences'}")
+            failures.extend(f"{name} [{backend}] {difference}" for difference in found)
+    return failures
+
+
+def merge_check(paths: Dict[str, Path], rtol: float) -> List[str]:
+    """Compare merged per-chunk streaming states against ``process``;
+    returns the failures"""
+    failures = []
+    processor = DAODataProcessor()
+    for name, path in paths.items():
+        if path.suffix != '.csv':
+            continue
+        df = pd.read_csv(path)
+        if 'network' not in df.columns or len(df) < MERGE_CHUNKS:
+            continue
+        chunks = np.array_split(np.arange(len(df)), MERGE_CHUNKS)
+        df['network'] = df['network'].astype(object)
+        df.loc[chunks[0], 'network'] = None
+        expected = processor.process(df, {'name': name})
+        state = processor.new_stream_state()
+        for rows in chunks:
+            part = processor.new_stream_state()
+            processor.update_stream_state(part, df.iloc[rows])
+            state.merge(part)
+        actual = processor.finalize_stream_state(state, {'name': name})
+        found = [
+            difference
+            for key in ('record_count', 'time_series')
+            for difference in differences(
+                expected.get(key), actual.get(key), rtol, f"/{key}"
+            )
+        ] + differences(
+            expected['network_stats'].get('networks'),
+            actual['network_stats'].get('networks'),
+            rtol,
+            '/network_stats/networks',
+        )
+        print(f"{name:24} {'merged':8} {'':>8}  "
+              f"{'identical' if not found else f'{len(found)} differences'}")
+        failures.extend(f"{name} [merged] {difference}" for difference in found)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that compute backends match pandas"
+    )
+    parser.add_argument(
+        '--data-dir',
+        type=Path,
+        default=None,
+        help="Directory of CSV or Parquet files (default: synthetic data)",
+    )
+    parser.add_argument(
+        '--rows', default='20k', help="Synthetic votes rows, e.g. 100k or 1m"
+    )
+    parser.add_argument(
+        '--backends', default=','.join(b for b in BACKENDS if b != 'pandas')
+    )
+    parser.add_argument('--parquet', action='store_true',
+                        help="Also compare on Parquet copies of the files")
+    parser.add_argument('--rtol', type=float, default=DEFAULT_RTOL)
+    args = parser.parse_args()
+
+    backends = installed_backends([name for name in args.backends.split(',') if name])
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.data_dir is None:
+            paths = generate(Path(tmp) / 'synthetic', parse_size(args.rows))
+        else:
+            paths = {path.stem: path for path in sorted(args.data_dir.rglob('*.csv'))}
+        if args.parquet:
+            for name, path in list(paths.items()):
+                parquet = Path(tmp) / 'parquet' / f"{path.stem}.parquet"
+                parquet.parent.mkdir(parents=True, exist_ok=True)
+                pd.read_csv(path).to_parquet(parquet)
+                paths[f"{name}.parquet"] = parquet
+        failures = run(paths, backends, args.rtol) + merge_check(paths, args.rtol)
+
+    if failures:
+        print("\nBackend differences:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nAll backends match pandas")
+
+
+if __name__ == '__main__':
+    main()
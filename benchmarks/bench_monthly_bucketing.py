@@ -0,0 +1,103 @@
+"""Benchmark monthly bucketing in DataProcessor against the row-wise implementation.
+
+Usage:
+    python benchmarks/bench_monthly_bucketing.py --rows 10000000
+    python benchmarks/bench_monthly_bucketing.py --rows 100000 --legacy-rows 100000
+"""
+import argparse
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.offsets import DateOffset
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils.data_processing import DataProcessor  # noqa: E402
+
+
+def legacy_process_new_daos(
+    processor: DataProcessor, df: pd.DataFrame, date_key: str
+) -> pd.DataFrame:
+    """The previous row-wise implementation, kept as the benchmark reference."""
+    dff = df.copy()
+    dff[date_key] = dff[date_key].apply(lambda x: processor.convert_timestamp(x))
+    dff = dff.dropna(subset=[date_key])
+    dff[date_key] = dff[date_key].dt.date
+    dff[date_key] = dff[date_key].apply(lambda d: d.replace(day=1))
+    dff = dff.groupby([date_key]).size().reset_index(name='count')
+    today = date.today().replace(day=1)
+    start = dff[date_key].min()
+    idx = pd.date_range(start=start, end=today, freq=DateOffset(months=1))
+    df_complete = pd.DataFrame({date_key: idx.date, 'count': 0})
+    dff = pd.concat([dff, df_complete]).drop_duplicates(subset=date_key, keep="first")
+    return dff.sort_values(date_key)
+
+
+def legacy_cumulative_total(values):
+    return [sum(values[:i + 1]) for i in range(len(values))]
+
+
+def make_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'createdAt': rng.integers(1_500_000_000, 1_700_000_000, rows),
+        'executedAt': rng.integers(1_500_000_000, 1_700_000_000, rows),
+    })
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument(
+        '--legacy-rows',
+        type=int,
+        default=200_000,
+        help="Rows for the row-wise reference; its time is extrapolated linearly to "
+             "--rows",
+    )
+    args = parser.parse_args()
+
+    processor = DataProcessor()
+
+    df = make_frame(args.rows)
+    vectorized, vec_time = timed(processor.process_new_daos, df, 'createdAt')
+    _, multi_time = timed(processor.monthly_counts, df, ['createdAt', 'executedAt'])
+
+    legacy_df = make_frame(args.legacy_rows)
+    expected, legacy_time = timed(
+        legacy_process_new_daos, processor, legacy_df, 'createdAt'
+    )
+    actual = processor.process_new_daos(legacy_df, 'createdAt')
+    assert expected['count'].tolist() == actual['count'].tolist(), "results differ"
+    assert (
+        expected['createdAt'].tolist() == actual['createdAt'].tolist()
+    ), "months differ"
+    legacy_estimate = legacy_time * args.rows / args.legacy_rows
+
+    counts = vectorized['count'].tolist()
+    cum_legacy, cum_legacy_time = timed(legacy_cumulative_total, counts)
+    cum_new, cum_new_time = timed(processor.calculate_cumulative_total, counts)
+    assert cum_legacy == cum_new
+
+    print(f"process_new_daos, {args.rows:,} rows")
+    print(f"  vectorized:            {vec_time:8.3f}s")
+    print(f"  row-wise (est.):       {legacy_estimate:8.3f}s  "
+          f"(measured {legacy_time:.3f}s on {args.legacy_rows:,} rows)")
+    print(f"  speedup:               {legacy_estimate / vec_time:8.1f}x")
+    print(f"monthly_counts, 2 date columns: {multi_time:8.3f}s")
+    print(f"calculate_cumulative_total, {len(counts)} months: "
+          f"{cum_legacy_time * 1e3:.3f}ms -> {cum_new_time * 1e3:.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
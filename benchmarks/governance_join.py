@@ -0,0 +1,135 @@
+"""Parity check and timing of GovernanceAnalyzer against pandas merges.
+
+Computes the per-DAO governance metrics once with GovernanceAnalyzer
+(integer-coded keys and bincount group-bys) and once the straightforward
+way, with pandas ``merge`` on string ids and ``groupby``, then compares
+them. Exits with 1 on any difference. No network access is needed.
+
+Usage:
+    python benchmarks/governance_join.py --rows 1m
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import generate, parse_size  # noqa: E402
+from src.analyzers.governance_analyzer import GovernanceAnalyzer  # noqa: E402
+
+DEFAULT_RTOL = 1e-9
+
+
+def gini(values: pd.Series) -> float:
+    x = np.sort(values.to_numpy(dtype=np.float64))
+    n = len(x)
+    if not n or x.sum() <= 0:
+        return np.nan
+    return 2 * np.sum(np.arange(1, n + 1) * x) / (n * x.sum()) - (n + 1) / n
+
+
+def reference(
+    daos: pd.DataFrame, proposals: pd.DataFrame, votes: pd.DataFrame
+) -> pd.DataFrame:
+    """Per-DAO metrics with pandas merges and group-bys"""
+    merged = votes[['proposal', 'voter', 'weight']].merge(
+        proposals[['id', 'dao']], left_on='proposal', right_on='id'
+    )
+    voters = merged.groupby('dao')['voter'].nunique()
+    proposal_voters = merged.groupby('proposal')['voter'].nunique()
+    per_proposal = (
+        proposals[['id', 'dao', 'executed']]
+        .merge(
+            proposal_voters.rename('proposal_voters'),
+            left_on='id',
+            right_index=True,
+            how='left',
+        )
+        .merge(voters.rename('dao_voters'), left_on='dao', right_index=True, how='left')
+    )
+    per_proposal['participation'] = (
+        per_proposal['proposal_voters'].fillna(0) / per_proposal['dao_voters']
+    )
+    power = merged.groupby(['dao', 'voter'])['weight'].max()
+
+    result = pd.DataFrame(index=daos['id'])
+    result['proposals'] = proposals.groupby('dao').size()
+    result['votes'] = merged.groupby('dao').size()
+    result['voters'] = voters
+    result = result.fillna({'proposals': 0, 'votes': 0, 'voters': 0})
+    result['votes_per_proposal'] = (result['votes'] / result['proposals']).where(
+        result['proposals'] > 0
+    )
+    result['pass_rate'] = per_proposal.groupby('dao')['executed'].mean()
+    result['participation'] = per_proposal.groupby('dao')['participation'].mean()
+    result['voting_power_gini'] = power.groupby(level='dao').apply(gini)
+    return result
+
+
+def differences(expected: pd.DataFrame, actual: pd.DataFrame, rtol: float) -> List[str]:
+    found = []
+    actual = actual.reindex(expected.index)
+    for column in expected.columns:
+        left = expected[column].to_numpy(dtype=np.float64)
+        right = actual[column].to_numpy(dtype=np.float64)
+        same = np.isclose(left, right, rtol=rtol, atol=0) | (
+            np.isnan(left) & np.isnan(right)
+        )
+        for dao in expected.index[~same]:
+            found.append(
+                f"{dao} {column}: {actual.at[dao, column]!r} != "
+                f"{expected.at[dao, column]!r}"
+            )
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare GovernanceAnalyzer with pandas merges"
+    )
+    parser.add_argument(
+        '--rows', default='100k', help="Synthetic votes rows, e.g. 100k or 1m"
+    )
+    parser.add_argument('--data-dir', type=Path, default=Path('data/synthetic'))
+    parser.add_argument('--rtol', type=float, default=DEFAULT_RTOL)
+    args = parser.parse_args()
+
+    votes_rows = parse_size(args.rows)
+    data_dir = args.data_dir / f"governance_{votes_rows}"
+    paths = generate(data_dir, votes_rows)
+    tables: Dict[str, pd.DataFrame] = {
+        name: pd.read_csv(path) for name, path in paths.items()
+    }
+
+    start = time.perf_counter()
+    expected = reference(tables['daos'], tables['proposals'], tables['votes'])
+    merge_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = GovernanceAnalyzer().analyze(tables)
+    coded_seconds = time.perf_counter() - start
+    actual = pd.DataFrame.from_dict(result['dao_metrics'], orient='index')
+
+    print(f"{'method':12} {'seconds':>8}")
+    print(f"{'pandas merge':12} {merge_seconds:8.3f}")
+    print(
+        f"{'coded join':12} {coded_seconds:8.3f}  "
+        f"({merge_seconds / coded_seconds:.1f}x)"
+    )
+
+    found = differences(expected, actual, args.rtol)
+    if found:
+        print("\nDifferences:")
+        for difference in found:
+            print(f"  {difference}")
+        sys.exit(1)
+    print(f"\nAll {len(expected)} DAOs match")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""Benchmark the loader, processors and analyzer on synthetic data.
+
+Generates (or reuses) synthetic datasets for each size, times every
+pipeline stage and records throughput, latency percentiles and peak
+memory. Results can be saved as a baseline and later runs compared
+against it; the exit code is 1 when a stage regresses. No network
+access is needed.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 10k,100k --save-baseline
+    python benchmarks/run_benchmarks.py --sizes 10k,100k \
+        --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import gc
+import json
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Any, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import generate, parse_size, table_sizes  # noqa: E402
+from src.analyzers.dao_analyzer import DAOAnalyzer  # noqa: E402
+from src.data.data_loader import DataLoader  # noqa: E402
+from src.processors.dao_processor import DAODataProcessor  # noqa: E402
+from src.utils.data_processing import DataProcessor  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+# Relative slowdown or memory growth tolerated before flagging a regression
+DEFAULT_TOLERANCE = 0.25
+
+
+def measure(func: Callable[[], Any], rows: int, repeat: int) -> Dict[str, Any]:
+    """Run ``func`` ``repeat`` times and summarize latency, throughput and memory.
+
+    Latencies come from untraced runs, since tracemalloc slows allocation
+    heavy code several times over; one more run measures the traced peak.
+    """
+    latencies = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak_traced = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        'rows': rows,
+        'repeat': repeat,
+        'latency_p50': float(p50),
+        'latency_p95': float(p95),
+        'latency_p99': float(p99),
+        'throughput_rows_per_s': rows / p50 if p50 > 0 else float('inf'),
+        'peak_traced_bytes': int(peak_traced),
+        # Process high-water mark so far, including memory tracemalloc misses
+        # (e.g. pyarrow buffers); ru_maxrss is in KiB on Linux, bytes on macOS
+        'max_rss_bytes': int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                             * (1 if sys.platform == 'darwin' else 1024))
+    }
+
+
+def bench_size(data_dir: Path, votes: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Benchmark every stage on the datasets of one size"""
+    paths = {name: data_dir / f"{name}.csv" for name in table_sizes(votes)}
+    if not all(path.exists() for path in paths.values()):
+        generate(data_dir, votes)
+
+    loader = DataLoader(local_path=str(data_dir))
+    processor = DAODataProcessor()
+    analyzer = DAOAnalyzer()
+    utils_processor = DataProcessor()
+
+    results = {}
+    total_rows = sum(table_sizes(votes).values())
+    results['load_concurrent'] = measure(
+        lambda: loader.load_all_datasets(
+            {name: str(path) for name, path in paths.items()}
+        ),
+        total_rows,
+        repeat,
+    )
+
+    frames, processed = {}, {}
+    for name, path in paths.items():
+        rows = table_sizes(votes)[name]
+        results[f"load_csv/{name}"] = measure(
+            lambda: frames.__setitem__(name, loader.load_csv(str(path), name)),
+            rows,
+            repeat,
+        )
+        df = frames[name]
+        results[f"process/{name}"] = measure(
+            lambda: processed.__setitem__(name, processor.process(df, {'name': name})),
+            rows, repeat
+        )
+        results[f"process_new_daos/{name}"] = measure(
+            lambda: utils_processor.process_new_daos(df, 'createdAt'), rows, repeat
+        )
+        # Free the frame before the next table; the lambdas above close over df
+        del frames[name]
+        df = None
+
+    results['analyze'] = measure(
+        lambda: analyzer.analyze(processed), total_rows, repeat
+    )
+    return results
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """Regression messages for stages slower or hungrier than the baseline"""
+    regressions = []
+    for size, stages in current['results'].items():
+        for stage, stats in stages.items():
+            base = baseline.get('results', {}).get(size, {}).get(stage)
+            if base is None:
+                continue
+            for metric in ('latency_p50', 'peak_traced_bytes'):
+                if base[metric] > 0 and stats[metric] > base[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"{size} {stage}: {metric} {stats[metric]:.4g} vs baseline "
+                        f"{base[metric]:.4g} (+{stats[metric] / base[metric] - 1:.0%})"
+                    )
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    for size, stages in report['results'].items():
+        print(f"\n== {size} votes ==")
+        print(f"{'stage':32} {'p50 s':>9} {'p95 s':>9} {'rows/s':>12} {'peak MB':>9} "
+              f"{'RSS MB':>9}")
+        for stage, stats in stages.items():
+            print(
+                f"{stage:32} {stats['latency_p50']:9.4f} {stats['latency_p95']:9.4f} "
+                f"{stats['throughput_rows_per_s']:12,.0f} "
+                f"{stats['peak_traced_bytes'] / 1e6:9.1f} "
+                f"{stats.get('max_rss_bytes', 0) / 1e6:9.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the DAO analysis pipeline")
+    parser.add_argument(
+        '--sizes', default='10k,100k', help="Comma-separated vote counts"
+    )
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--data-dir', type=Path, default=Path('data/synthetic'))
+    parser.add_argument(
+        '--output', type=Path, default=None, help="Write results JSON here"
+    )
+    parser.add_argument(
+        '--baseline', type=Path, default=None, help="Compare against this JSON"
+    )
+    parser.add_argument('--save-baseline', action='store_true',
+                        help=f"Store the results as the baseline ({DEFAULT_BASELINE})")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'repeat': args.repeat
+        },
+        'results': {}
+    }
+    for size in args.sizes.split(','):
+        votes = parse_size(size)
+        report['results'][size] = bench_size(args.data_dir / size, votes, args.repeat)
+
+    print_report(report)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        DEFAULT_BASELINE.write_text(json.dumps(report, indent=2))
+        print(f"\nSaved baseline to {DEFAULT_BASELINE}")
+
+    if args.baseline:
+        regressions = compare(
+            report, json.loads(args.baseline.read_text()), args.tolerance
+        )
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+
+if __name__ == '__main__':
+    main()
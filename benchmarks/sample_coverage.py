@@ -0,0 +1,85 @@
+"""Coverage and latency of the sampled quick-look mode.
+
+Samples a synthetic votes table with many seeds and counts how often the
+95% bounds of the record count, network counts and monthly counts hold
+the exact values. Coverage should be close to 95%. The time of a
+sampled ``process_path`` is reported next to that of a full one. Exits
+with 1 if coverage of the record count falls below ``--min-coverage``.
+No network access is needed.
+
+Usage:
+    python benchmarks/sample_coverage.py --rows 2m --sample 20000 --seeds 50
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import generate, parse_size  # noqa: E402
+from src.processors.dao_processor import DAODataProcessor  # noqa: E402
+from src.processors.sampling import CSVSampler  # noqa: E402
+
+
+def dates(frame: pd.DataFrame) -> pd.Series:
+    return pd.to_datetime(frame['createdAt'], unit='s')
+
+
+def covered(bounds, value) -> bool:
+    return bounds[0] <= value <= bounds[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check the bounds of sampled estimates"
+    )
+    parser.add_argument('--rows', default='2m', help="Synthetic votes rows, e.g. 1m")
+    parser.add_argument('--sample', type=int, default=20000, help="Rows per sample")
+    parser.add_argument('--seeds', type=int, default=50, help="Samples to draw")
+    parser.add_argument('--data-dir', type=Path, default=Path('data/synthetic'))
+    parser.add_argument('--min-coverage', type=float, default=0.85)
+    args = parser.parse_args()
+
+    votes_rows = parse_size(args.rows)
+    path = generate(args.data_dir / f"sample_{votes_rows}", votes_rows)['votes']
+
+    start = time.perf_counter()
+    full = DAODataProcessor().process_path(path, {'name': 'votes'})
+    full_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    DAODataProcessor(sample_rows=args.sample).process_path(path, {'name': 'votes'})
+    sampled_seconds = time.perf_counter() - start
+    networks = full['network_stats']['networks']
+    months = full['time_series']['monthly_activity']
+
+    hits = {'record_count': 0, 'networks': 0, 'months': 0}
+    trials = {'record_count': 0, 'networks': 0, 'months': 0}
+    for seed in range(args.seeds):
+        sample = CSVSampler(args.sample, seed=seed).sample(path, dates=dates)
+        _, bounds = sample.record_count()
+        hits['record_count'] += covered(bounds, full['record_count'])
+        trials['record_count'] += 1
+        for network, (_, bounds) in sample.network_counts().items():
+            hits['networks'] += covered(bounds, networks.get(network, 0))
+            trials['networks'] += 1
+        _, monthly_bounds = sample.monthly_counts()
+        for month, bounds in monthly_bounds.items():
+            hits['months'] += covered(bounds, months.get(month, 0))
+            trials['months'] += 1
+
+    print(f"{full['record_count']} rows, {sample.blocks_read}/{sample.blocks} blocks, "
+          f"{sample.bytes_read / 2**20:.1f} MiB read per sample")
+    print(f"{'estimate':14} {'coverage':>8}")
+    for name in hits:
+        print(f"{name:14} {hits[name] / max(trials[name], 1):8.1%}")
+    print(f"\nprocess_path: sampled {sampled_seconds:.3f}s, full {full_seconds:.3f}s")
+
+    if hits['record_count'] / trials['record_count'] < args.min_coverage:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""Load test of the local metrics service.
+
+Starts ``MetricsService`` in a separate process on a free loopback port
+and drives it from keep-alive asyncio connections, reporting requests per
+second, latency percentiles, status codes and the service's cache stats.
+With ``--revalidate`` clients resend the ETag they got, like a dashboard
+polling for changes. Finally a snapshot is rewritten to time the hot
+reload. Without ``--snapshot-dir`` a snapshot is built from synthetic
+data; no network access is needed.
+
+Usage:
+    python benchmarks/serve_load.py --requests 20000 --concurrency 32
+    python benchmarks/serve_load.py --snapshot-dir data/backup/snapshots --revalidate
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.synthetic import generate, parse_size  # noqa: E402
+from src.service.metrics_service import MetricsService  # noqa: E402
+from src.service.snapshot import latest_snapshot, write_snapshot  # noqa: E402
+
+
+def build_snapshot(snapshot_dir: Path, votes: int) -> None:
+    """Process and analyze synthetic data into a snapshot"""
+    from src.analyzers.dao_analyzer import DAOAnalyzer
+    from src.data.data_loader import DataLoader
+    from src.processors.dao_processor import DAODataProcessor
+
+    data_dir = snapshot_dir.parent / 'synthetic'
+    generate(data_dir, votes)
+    processor = DAODataProcessor()
+    processed = {
+        name: processor.process(df, {'name': name})
+        for name, df in DataLoader(local_path=str(data_dir)).load_all_datasets().items()
+    }
+    write_snapshot(
+        snapshot_dir,
+        {'version': 'synthetic'},
+        DAOAnalyzer().analyze(processed),
+        processed,
+    )
+
+
+def serve(snapshot_dir: str, cache_size: int, ports: multiprocessing.Queue) -> None:
+    service = MetricsService(
+        snapshot_dir, port=0, cache_size=cache_size, reload_interval=0.2
+    )
+
+    async def main():
+        server = await service.start()
+        ports.put(service.port)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+async def request(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    target: str,
+    etag: Optional[str] = None,
+) -> Tuple[int, Dict[str, str], bytes]:
+    lines = [f"GET {target} HTTP/1.1", 'Host: localhost']
+    if etag:
+        lines.append(f"If-None-Match: {etag}")
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode().strip()
+        if not line:
+            break
+        name, _, value = line.partition(':')
+        headers[name.lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers, body
+
+
+async def fetch(port: int, target: str) -> Dict[str, Any]:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        return json.loads((await request(reader, writer, target))[2])
+    finally:
+        writer.close()
+
+
+async def client(port: int, targets: List[str], count: int, revalidate: bool,
+                 latencies: List[float], statuses: Counter) -> None:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    etags: Dict[str, str] = {}
+    try:
+        for i in range(count):
+            target = targets[i % len(targets)]
+            start = time.perf_counter()
+            status, headers, _ = await request(
+                reader, writer, target, etags.get(target) if revalidate else None
+            )
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+            if 'etag' in headers:
+                etags[target] = headers['etag']
+    finally:
+        writer.close()
+
+
+async def load(
+    port: int, total: int, concurrency: int, revalidate: bool
+) -> Dict[str, Any]:
+    datasets = (await fetch(port, '/datasets'))['datasets']
+    targets = ['/summary', '/datasets', '/version']
+    for name in datasets:
+        targets.append(f"/datasets/{name}")
+        for freq in ('D', 'W', 'M', 'Q'):
+            targets.append(f"/datasets/{name}/timeseries?freq={freq}")
+            targets.append(f"/datasets/{name}/timeseries?freq={freq}&by=network")
+
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        client(port, targets, total // concurrency, revalidate, latencies, statuses)
+        for _ in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        'requests': len(latencies),
+        'targets': len(targets),
+        'requests_per_s': len(latencies) / elapsed,
+        'latency_ms_p50': float(p50),
+        'latency_ms_p95': float(p95),
+        'latency_ms_p99': float(p99),
+        'statuses': dict(statuses),
+        'cache': (await fetch(port, '/stats'))['cache']
+    }
+
+
+async def reload_time(port: int, snapshot_dir: Path, timeout: float = 10.0) -> float:
+    """Seconds from rewriting the snapshot until the service serves it"""
+    before = (await fetch(port, '/health'))['loaded_at']
+    path = latest_snapshot(snapshot_dir)
+    start = time.perf_counter()
+    os.utime(path)
+    while time.perf_counter() - start < timeout:
+        if (await fetch(port, '/health'))['loaded_at'] != before:
+            return time.perf_counter() - start
+        await asyncio.sleep(0.02)
+    raise TimeoutError("The service did not reload the rewritten snapshot")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the local metrics service")
+    parser.add_argument(
+        '--snapshot-dir',
+        type=Path,
+        default=None,
+        help="Snapshots to serve (default: build one from synthetic data)",
+    )
+    parser.add_argument(
+        '--rows', default='100k', help="Synthetic votes rows without --snapshot-dir"
+    )
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--cache-size', type=int, default=256)
+    parser.add_argument('--revalidate', action='store_true',
+                        help="Send If-None-Match with the last ETag of each target")
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix='serve_load_'))
+    try:
+        snapshot_dir = tmp / 'snapshots'
+        if args.snapshot_dir is None:
+            build_snapshot(snapshot_dir, parse_size(args.rows))
+        else:
+            # A copy, so the reload test does not touch the real snapshots
+            shutil.copytree(args.snapshot_dir, snapshot_dir)
+
+        ports: multiprocessing.Queue = multiprocessing.Queue()
+        server = multiprocessing.Process(
+            target=serve, args=(str(snapshot_dir), args.cache_size, ports), daemon=True
+        )
+        server.start()
+        try:
+            port = ports.get(timeout=60)
+            report = asyncio.run(
+                load(port, args.requests, args.concurrency, args.revalidate)
+            )
+            report['reload_seconds'] = asyncio.run(reload_time(port, snapshot_dir))
+        finally:
+            server.terminate()
+            server.join()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Startup-time regression check for the command line interface.
+
+Runs light commands (``--help``, ``version``) under ``python -X importtime``
+and fails when they exit with an error, import heavy modules or exceed a
+time budget. ``version`` reads a small generated mirror, so no download
+is needed. Each command is measured cold, with an empty bytecode cache so
+every module is compiled again, and warm, with the cache already populated.
+
+Usage:
+    python benchmarks/startup_time.py
+    python benchmarks/startup_time.py --repeat 10 --max-seconds 0.3
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+MAIN = ROOT / 'main.py'
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import generate  # noqa: E402
+
+# Commands that must not pay for the data stack; {mirror} is the fixture
+LIGHT_COMMANDS = {
+    'help': ['--help'],
+    'version': ['version', '--mirror', '{mirror}'],
+    'process --help': ['process', '--help']
+}
+# Vote rows of the generated mirror
+FIXTURE_VOTES = 1000
+HEAVY_MODULES = (
+    'pandas',
+    'numpy',
+    'pyarrow',
+    'kagglehub',
+    'plotly',
+    'duckdb',
+    'polars',
+)
+DEFAULT_MAX_SECONDS = 0.5
+
+
+def run_once(args: List[str], pycache_prefix: str, cwd: Path) -> Dict[str, Any]:
+    """Run main.py once and return its wall time, exit status and
+    per-module import times"""
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache_prefix)
+    # The warm runs need the bytecode written by earlier runs
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', str(MAIN)] + args,
+        cwd=cwd, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+
+    # Lines look like "import time:   self [us] | cumulative | module"
+    imports = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line.split('|')
+        imports[module.strip()] = int(cumulative)
+    errors = [
+        line for line in proc.stderr.splitlines() if not line.startswith('import time:')
+    ]
+    return {
+        'wall': wall,
+        'imports': imports,
+        'returncode': proc.returncode,
+        'error': errors[-1] if errors else ''
+    }
+
+
+def measure(args: List[str], repeat: int, cwd: Path) -> Dict[str, Any]:
+    """Cold and warm startup statistics for one command"""
+    cold, warm, imported = [], [], set()
+    with tempfile.TemporaryDirectory() as warm_prefix:
+        runs = [run_once(args, warm_prefix, cwd)]
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as cold_prefix:
+                runs.append(run_once(args, cold_prefix, cwd))
+            cold.append(runs[-1]['wall'])
+            runs.append(run_once(args, warm_prefix, cwd))
+            warm.append(runs[-1]['wall'])
+            imported.update(runs[-1]['imports'])
+    failed = next((run for run in runs if run['returncode'] != 0), None)
+    heavy = sorted(
+        module for module in imported if module.split('.')[0] in HEAVY_MODULES
+    )
+    return {
+        'cold_p50': float(np.median(cold)),
+        'warm_p50': float(np.median(warm)),
+        'heavy_imports': sorted({module.split('.')[0] for module in heavy}),
+        'returncode': failed['returncode'] if failed else 0,
+        'error': failed['error'] if failed else ''
+    }
+
+
+def check(name: str, stats: Dict[str, Any], max_seconds: float) -> List[str]:
+    """Regressions of one command"""
+    failures = []
+    if stats['returncode'] != 0:
+        failures.append(f"{name} exited with {stats['returncode']}: {stats['error']}")
+    if stats['heavy_imports']:
+        failures.append(f"{name} imports {', '.join(stats['heavy_imports'])}")
+    if stats['warm_p50'] > max_seconds:
+        failures.append(
+            f"{name} took {stats['warm_p50']:.3f}s warm (budget {max_seconds}s)"
+        )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check CLI startup time")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=DEFAULT_MAX_SECONDS,
+                        help="Warm startup budget per light command")
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        # Runs happen in tmp, so manifests recorded for the mirror land there
+        mirror = Path(tmp) / 'versions' / '1'
+        generate(mirror, FIXTURE_VOTES)
+        print(f"{'command':16} {'cold s':>8} {'warm s':>8}  heavy imports")
+        for name, command in LIGHT_COMMANDS.items():
+            command = [arg.format(mirror=mirror) for arg in command]
+            stats = measure(command, args.repeat, Path(tmp))
+            print(f"{name:16} {stats['cold_p50']:8.3f} {stats['warm_p50']:8.3f}  "
+                  f"{', '.join(stats['heavy_imports']) or '-'}")
+            failures.extend(check(name, stats, args.max_seconds))
+
+    if failures:
+        print("\nStartup regressions:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nStartup within budget")
+
+
+if __name__ == '__main__':
+    main()
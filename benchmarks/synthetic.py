@@ -0,0 +1,157 @@
+"""Deterministic generator of DAO-shaped CSV datasets for benchmarks.
+
+Writes daos.csv, proposals.csv and votes.csv shaped like the
+daviddavo/dao-analyzer tables: hex addresses, platform/network columns
+and epoch-second createdAt timestamps. Sizes refer to the number of
+votes; proposals and DAOs scale down from it. Rows are written in chunks
+so 100M-row tables never have to fit in memory.
+
+Usage:
+    python benchmarks/synthetic.py --rows 1m --out data/synthetic/1m
+"""
+import argparse
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+PLATFORMS = ['aragon', 'daostack', 'daohaus']
+NETWORKS = ['mainnet', 'xdai']
+NETWORK_WEIGHTS = [0.6, 0.4]
+# First DAO activity on the platforms to the end of the generated range
+START_EPOCH = 1546300800  # 2019-01-01
+END_EPOCH = 1704067200  # 2024-01-01
+CHUNK_ROWS = 1_000_000
+# Cap on distinct addresses so the pool itself stays small at 100M rows
+MAX_ADDRESS_POOL = 2_000_000
+
+SIZE_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+
+def parse_size(value: str) -> int:
+    """Parse sizes like 10k, 1m or 100m"""
+    value = value.strip().lower().replace('_', '')
+    if value[-1] in SIZE_SUFFIXES:
+        return int(float(value[:-1]) * SIZE_SUFFIXES[value[-1]])
+    return int(value)
+
+
+def table_sizes(votes: int) -> Dict[str, int]:
+    return {
+        'daos': max(10, votes // 1000),
+        'proposals': max(20, votes // 20),
+        'votes': votes
+    }
+
+
+def address_pool(rng: np.random.Generator, size: int) -> np.ndarray:
+    raw = rng.bytes(20 * size).hex()
+    return np.array(
+        ['0x' + raw[i * 40 : (i + 1) * 40] for i in range(size)], dtype=object
+    )
+
+
+def skewed_choice(rng: np.random.Generator, pool_size: int, n: int) -> np.ndarray:
+    """Zipf-like picks so a few addresses are very active, as in real DAOs"""
+    return (pool_size * rng.power(0.3, n)).astype(np.int64).clip(0, pool_size - 1)
+
+
+def _write_chunks(path: Path, total: int, make_chunk) -> None:
+    first = True
+    for start in range(0, total, CHUNK_ROWS):
+        n = min(CHUNK_ROWS, total - start)
+        make_chunk(start, n).to_csv(
+            path, index=False, mode='w' if first else 'a', header=first
+        )
+        first = False
+
+
+def generate(out_dir: Path, votes: int, seed: int = 42) -> Dict[str, Path]:
+    """Write the three tables for ``votes`` vote rows and return their paths"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    sizes = table_sizes(votes)
+    rng = np.random.default_rng(seed)
+    addresses = address_pool(rng, min(MAX_ADDRESS_POOL, max(100, votes // 10)))
+
+    dao_platform = rng.choice(PLATFORMS, sizes['daos'])
+    dao_network = rng.choice(NETWORKS, sizes['daos'], p=NETWORK_WEIGHTS)
+    dao_created = np.sort(rng.integers(START_EPOCH, END_EPOCH, sizes['daos']))
+    dao_ids = address_pool(rng, sizes['daos'])
+
+    paths = {name: out_dir / f"{name}.csv" for name in sizes}
+
+    pd.DataFrame({
+        'id': dao_ids,
+        'platform': dao_platform,
+        'network': dao_network,
+        'name': [f"DAO {i}" for i in range(sizes['daos'])],
+        'creator': addresses[skewed_choice(rng, len(addresses), sizes['daos'])],
+        'createdAt': dao_created
+    }).to_csv(paths['daos'], index=False)
+
+    # Proposals belong to a DAO and are created after it
+    proposal_dao = skewed_choice(rng, sizes['daos'], sizes['proposals'])
+    proposal_created = np.minimum(
+        dao_created[proposal_dao]
+        + rng.exponential(86400 * 180, sizes['proposals']).astype(np.int64),
+        END_EPOCH,
+    )
+
+    def proposals_chunk(start: int, n: int) -> pd.DataFrame:
+        daos = proposal_dao[start:start + n]
+        chunk_rng = np.random.default_rng([seed, 1, start])
+        return pd.DataFrame({
+            'id': [f"{dao_ids[d]}-{start + i}" for i, d in enumerate(daos)],
+            'dao': dao_ids[daos],
+            'platform': dao_platform[daos],
+            'network': dao_network[daos],
+            'proposer': addresses[skewed_choice(chunk_rng, len(addresses), n)],
+            'createdAt': proposal_created[start:start + n],
+            'executed': chunk_rng.random(n) < 0.4
+        })
+
+    _write_chunks(paths['proposals'], sizes['proposals'], proposals_chunk)
+
+    def votes_chunk(start: int, n: int) -> pd.DataFrame:
+        chunk_rng = np.random.default_rng([seed, 2, start])
+        proposals = skewed_choice(chunk_rng, sizes['proposals'], n)
+        daos = proposal_dao[proposals]
+        return pd.DataFrame({
+            'id': np.arange(start, start + n),
+            'proposal': [f"{dao_ids[d]}-{p}" for d, p in zip(daos, proposals)],
+            'dao': dao_ids[daos],
+            'platform': dao_platform[daos],
+            'network': dao_network[daos],
+            'voter': addresses[skewed_choice(chunk_rng, len(addresses), n)],
+            'support': chunk_rng.random(n) < 0.7,
+            'weight': chunk_rng.lognormal(3, 2, n).round(6),
+            'createdAt': np.minimum(
+                proposal_created[proposals] + chunk_rng.integers(0, 86400 * 7, n),
+                END_EPOCH
+            )
+        })
+
+    _write_chunks(paths['votes'], sizes['votes'], votes_chunk)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic DAO datasets")
+    parser.add_argument(
+        '--rows', default='100k', help="Number of votes, e.g. 10k, 1m, 100m"
+    )
+    parser.add_argument('--out', type=Path, default=None,
+                        help="Output directory (default: data/synthetic/<rows>)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    votes = parse_size(args.rows)
+    out_dir = args.out or Path('data/synthetic') / args.rows
+    for name, path in generate(out_dir, votes, args.seed).items():
+        print(f"{name}: {path} ({path.stat().st_size / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,26 @@
+import argparse
 import logging
+import sys
 from pathlib import Path
-from src.providers.kaggle_provider import KaggleDatasetProvider
-from src.processors.dao_processor import DAODataProcessor
-from src.analyzers.dao_analyzer import DAOAnalyzer
+from typing import Dict, Any, List, Optional, Tuple
+
+# Heavy modules (pandas, pyarrow, kagglehub, plotly) are imported inside
+# the commands that need them, so `--help` and `version` start quickly.
+
+DATASET_PATH = "daviddavo/dao-analyzer"
+BACKUP_DIR = Path("data/backup")
+ANALYSIS_STORE = BACKUP_DIR / 'analysis.sqlite'
+SNAPSHOT_DIR = BACKUP_DIR / 'snapshots'
+COMMANDS = (
+    'version',
+    'fetch',
+    'process',
+    'analyze',
+    'plot',
+    'compare',
+    'history',
+    'serve',
+)
 
 def setup_logging():
     """Set up logging configuration"""
@@ -11,57 +29,601 @@ def setup_logging():
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
 
-def main():
+def memory_size(value: str) -> int:
+    """argparse type for sizes like 512M or 4G"""
+    from src.pipeline.memory_scheduler import parse_size
+    return parse_size(value)
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser with one subcommand per pipeline step"""
+    mirror = argparse.ArgumentParser(add_help=False)
+    mirror.add_argument(
+        '--mirror', type=Path, default=None,
+        help="Read the dataset from this local directory instead of the last download"
+    )
+
+    source = argparse.ArgumentParser(add_help=False, parents=[mirror])
+    source.add_argument(
+        '--fetch',
+        action='store_true',
+        help="Download the latest dataset version from Kaggle instead of using the "
+             "local copy",
+    )
+    source.add_argument(
+        '--verify-checksums', action='store_true',
+        help="Record and check file checksums in the manifest, not just sizes"
+    )
+
+    pipeline = argparse.ArgumentParser(add_help=False)
+    pipeline.add_argument(
+        '--workers', type=int, default=1,
+        help="Number of worker processes for dataset processing (default: 1)"
+    )
+    pipeline.add_argument(
+        '--approximate', action='store_true',
+        help="Estimate unique counts with HyperLogLog sketches"
+    )
+    pipeline.add_argument(
+        '--backend', choices=['pandas', 'duckdb', 'polars'], default='pandas',
+        help="Engine computing dataset metrics; duckdb and polars query the CSVs "
+             "in place instead of loading them (default: pandas)"
+    )
+    pipeline.add_argument(
+        '--memory-budget', type=memory_size, default=None,
+        help="Memory the pipeline may use, e.g. 4G; datasets are scheduled to fit "
+             "and large results spill to disk (default: no budget)"
+    )
+    pipeline.add_argument(
+        '--sample', type=int, default=None, metavar='ROWS',
+        help="Quick look: process a stratified sample of about ROWS rows per dataset, "
+             "read in bounded time, and scale counts up with 95%% bounds"
+    )
+    pipeline.add_argument(
+        '--sample-seed', type=int, default=None,
+        help="Seed of --sample, for repeatable quick looks"
+    )
+    pipeline.add_argument(
+        '--incremental', action='store_true',
+        help="Reuse stored results for unchanged files and process only appended rows"
+    )
+    pipeline.add_argument(
+        '--profile-output', type=Path, default=None,
+        help="Record timing spans for every pipeline stage and write them to this file"
+    )
+    pipeline.add_argument(
+        '--profile-format',
+        choices=['json', 'chrome'],
+        default='json',
+        help="Span file format; 'chrome' opens in chrome://tracing or Perfetto "
+             "(default: json)",
+    )
+    pipeline.add_argument(
+        '--profile-stage',
+        default=None,
+        help="Capture a cProfile of one stage by span name, e.g. "
+             "DAODataProcessor._get_summary_stats",
+    )
+    pipeline.add_argument(
+        '--trace-memory', action='store_true',
+        help="Record tracemalloc allocation deltas per span (slows the run down)"
+    )
+
+    analysis = argparse.ArgumentParser(add_help=False)
+    analysis.add_argument(
+        '--address-index',
+        action='store_true',
+        help="Build (or load) a global address index for exact cross-dataset address "
+             "metrics",
+    )
+    analysis.add_argument(
+        '--governance',
+        action='store_true',
+        help="Join votes, proposals and DAOs for per-DAO and per-platform governance "
+             "metrics",
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Analyze DAO datasets. Runs 'analyze' when no command is given."
+    )
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.add_parser(
+        'version', parents=[mirror],
+        help="Show the local dataset version without loading any data"
+    )
+    commands.add_parser('fetch', help="Download the latest dataset version from Kaggle")
+    commands.add_parser(
+        'process', parents=[source, pipeline],
+        help="Process every dataset and summarize the results"
+    )
+    commands.add_parser(
+        'analyze', parents=[source, pipeline, analysis],
+        help="Process and analyze every dataset"
+    )
+    plot = commands.add_parser(
+        'plot', parents=[source, pipeline, analysis],
+        help="Process, analyze and plot activity over time"
+    )
+    plot.add_argument(
+        '--freq', choices=['D', 'W', 'M', 'Q'], nargs='+', default=['M'],
+        help="Periods of the plotted counts, one batch figure each (default: M)"
+    )
+    plot.add_argument(
+        '--batch', action='store_true',
+        help="Compose all datasets into one WebGL figure per period, split by --by"
+    )
+    plot.add_argument(
+        '--by',
+        choices=['network', 'platform', 'platform_network'],
+        default='platform_network',
+        help="Series of each dataset in batch figures (default: platform_network)",
+    )
+    plot.add_argument(
+        '--point-budget',
+        type=int,
+        default=2000,
+        help="Maximum points per series in batch figures, downsampled with LTTB "
+             "(default: 2000)",
+    )
+    plot.add_argument(
+        '--output-dir',
+        type=Path,
+        default=None,
+        help="Write batch figures to this directory instead of showing them (implies "
+             "--batch)",
+    )
+    plot.add_argument(
+        '--format',
+        dest='image_format',
+        choices=['html', 'png', 'svg', 'pdf'],
+        default='html',
+        help="File format with --output-dir; images need kaleido (default: html)",
+    )
+
+    # Stored-analysis queries; they read only the analysis store
+    query = argparse.ArgumentParser(add_help=False)
+    query.add_argument('--dataset', default=None, help="Only this dataset, e.g. votes")
+    query.add_argument(
+        '--section',
+        default=None,
+        choices=[
+            'dataset_metrics',
+            'temporal_metrics',
+            'network_metrics',
+            'cross_dataset_metrics',
+        ],
+        help="Only this section of the analysis",
+    )
+    compare = commands.add_parser(
+        'compare', parents=[query],
+        help="Show stored metrics that changed between two analyzed versions"
+    )
+    compare.add_argument(
+        '--old', default=None,
+        help="Older version; the newest stored one at or before it is used "
+             "(default: the version before --new)"
+    )
+    compare.add_argument(
+        '--new', default=None,
+        help="Newer version, resolved like --old (default: the newest stored version)"
+    )
+    compare.add_argument(
+        '--metric', default=None,
+        help="Only this metric or the metrics under it, e.g. activity_trend"
+    )
+    history = commands.add_parser(
+        'history', parents=[query],
+        help="Show a stored metric across every analyzed version"
+    )
+    history.add_argument(
+        'metric', help="Dotted metric path, e.g. record_count or activity_trend.slope"
+    )
+
+    serve = commands.add_parser(
+        'serve', help="Serve the latest analysis snapshot as JSON over local HTTP"
+    )
+    serve.add_argument(
+        '--snapshot-dir',
+        type=Path,
+        default=SNAPSHOT_DIR,
+        help="Directory of analysis snapshots written by analyze (default: "
+             f"{SNAPSHOT_DIR})",
+    )
+    serve.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help="Interface to listen on (default: 127.0.0.1)",
+    )
+    serve.add_argument(
+        '--port', type=int, default=8050, help="Port to listen on (default: 8050)"
+    )
+    serve.add_argument(
+        '--cache-size', type=int, default=256,
+        help="Responses kept in the LRU cache (default: 256)"
+    )
+    serve.add_argument(
+        '--reload-interval', type=float, default=2.0,
+        help="Seconds between checks for a newer snapshot (default: 2)"
+    )
+    return parser
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments"""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Without a command, run the full analysis as before commands existed
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ('-h', '--help')):
+        argv.insert(0, 'analyze')
+    return build_parser().parse_args(argv)
+
+def print_version_info(version_info: Dict[str, Any]) -> None:
+    print("\nDataset Information:")
+    for key, value in version_info.items():
+        print(f"{key}: {value}")
+
+def make_provider(args: argparse.Namespace, remote: bool = False):
+    from src.providers.local_mirror_provider import LocalMirrorProvider
+    return LocalMirrorProvider(
+        dataset_path=DATASET_PATH,
+        backup_dir=BACKUP_DIR,
+        mirror_dir=getattr(args, 'mirror', None),
+        remote=remote or getattr(args, 'fetch', False),
+        verify_checksums=getattr(args, 'verify_checksums', False)
+    )
+
+def run_version(args: argparse.Namespace) -> None:
+    from src.providers.mirror_manifest import resolve_backup, resolve_mirror
+    try:
+        if args.mirror:
+            version_info, _ = resolve_mirror(args.mirror, DATASET_PATH, BACKUP_DIR)
+        else:
+            version_info, _ = resolve_backup(BACKUP_DIR, DATASET_PATH)
+    except FileNotFoundError as e:
+        # A missing local copy is an expected state, not a crash
+        sys.exit(f"error: {e}")
+    print_version_info(version_info)
+
+def run_fetch(args: argparse.Namespace) -> None:
+    print_version_info(make_provider(args, remote=True).get_version_info())
+
+
+def run_pipeline(
+    args: argparse.Namespace,
+) -> Tuple[Any, Any, Dict[str, Dict[str, Any]]]:
+    """Resolve, load and process every dataset.
+
+    Returns the provider, the (lazy) datasets and the processed results.
+    """
+    from src.processors.dao_processor import DAODataProcessor
+    from src.pipeline.parallel_runner import ParallelPipelineRunner
+
+    logger = logging.getLogger(__name__)
+    provider = make_provider(args)
+
+    # Print dataset version info
+    print_version_info(provider.get_version_info())
+
+    backend_options = {}
+    scheduler = None
+    if args.memory_budget:
+        from src.pipeline.memory_scheduler import (
+            MemoryBudgetScheduler,
+            duckdb_memory_limit,
+        )
+
+        scheduler = MemoryBudgetScheduler(args.memory_budget)
+        if args.backend == 'duckdb':
+            backend_options['memory_limit'] = duckdb_memory_limit(
+                args.memory_budget, args.workers
+            )
+    if args.sample and args.incremental:
+        raise ValueError("--sample cannot be combined with --incremental")
+    processor = DAODataProcessor(
+        approximate=args.approximate,
+        backend=args.backend,
+        backend_options=backend_options,
+        sample_rows=args.sample,
+        sample_seed=args.sample_seed,
+    )
+
+    # Load datasets
+    datasets = provider.get_datasets()
+    logger.info(f"Loaded {len(datasets)} datasets")
+
+    # Process datasets; each worker loads its own file and holds one
+    # raw DataFrame at a time
+    if args.incremental:
+        from src.pipeline.incremental_runner import IncrementalRunner
+        from src.pipeline.result_store import ResultStore
+        store = ResultStore(BACKUP_DIR / 'results.sqlite')
+        incremental = IncrementalRunner(
+            processor, store, workers=args.workers, scheduler=scheduler
+        )
+        runner = incremental.runner
+        processed_data = incremental.process_all(datasets)
+        for name, outcome in incremental.outcomes.items():
+            logger.info(f"{name}: {outcome}")
+    else:
+        runner = ParallelPipelineRunner(
+            processor, workers=args.workers, scheduler=scheduler
+        )
+        processed_data = runner.process_all(datasets)
+
+    report = runner.utilization_report()
+    logger.info(
+        f"Processed {len(processed_data)}/{len(datasets)} datasets in "
+        f"{report['wall_seconds']:.2f}s on {report['workers']} workers "
+        f"({report['pool_utilization']:.0%} pool utilization)"
+    )
+    for pid, worker in report['per_worker'].items():
+        logger.info(
+            f"Worker {pid}: {worker['tasks']} datasets, "
+            f"{worker['busy_seconds']:.2f}s busy ({worker['utilization']:.0%})"
+        )
+    if scheduler is not None:
+        memory = scheduler.report()
+        logger.info(
+            f"Holding {memory['retained_bytes'] / 2**20:.1f} MiB of results in memory, "
+            f"{memory['spilled_bytes'] / 2**20:.1f} MiB spilled to "
+            f"{memory['spill_dir']}"
+        )
+    return provider, datasets, processed_data
+
+
+def format_estimate(
+    value: float, bounds: Optional[List[float]] = None, spec: str = ''
+) -> str:
+    """A value, followed by its 95% bounds when it was estimated from a sample"""
+    if bounds is None or bounds[0] == bounds[1]:
+        # Files small enough to be read whole are exact
+        return format(value, spec)
+    low, high = (format(bound, spec or '.0f') for bound in bounds)
+    return f"~{value:{spec}} (95% CI {low} to {high})"
+
+
+def run_process(args: argparse.Namespace) -> None:
+    _, _, processed_data = run_pipeline(args)
+    print("\nProcessed Datasets:")
+    for dataset, result in processed_data.items():
+        print(f"\n{dataset}:")
+        bounds = result.get('sampling', {}).get('record_count_bounds')
+        print(f"Records: {format_estimate(result['record_count'], bounds)}")
+        if 'time_series' in result:
+            time_series = result['time_series']
+            print(
+                f"Time span: {time_series.get('start_date')} to "
+                f"{time_series.get('end_date')}"
+            )
+
+def run_analysis(args: argparse.Namespace) -> Tuple[Dict[str, Any], Any]:
+    """Process and analyze every dataset.
+
+    Returns the analysis and the analyzer, which holds the rollup cube.
+    """
+    from src.analyzers.dao_analyzer import DAOAnalyzer
+
+    logger = logging.getLogger(__name__)
+    provider, datasets, processed_data = run_pipeline(args)
+    analyzer = DAOAnalyzer()
+
+    # Exact address metrics need the shared address index
+    if args.address_index:
+        from src.analyzers.address_index import AddressIndex
+        index_path = provider.artifact_path('address_index.npz')
+        if index_path.exists():
+            analyzer.address_index = AddressIndex.load(index_path)
+            if analyzer.address_index.source == AddressIndex.source_fingerprint(
+                datasets
+            ):
+                logger.info(f"Loaded address index from {index_path}")
+            else:
+                logger.info(f"Address index {index_path} is stale, rebuilding it")
+                analyzer.address_index = None
+        if analyzer.address_index is None:
+            analyzer.address_index = AddressIndex.build(datasets)
+            analyzer.address_index.save(index_path)
+            provider.record_artifact('address_index.npz')
+
+    analysis = analyzer.analyze(processed_data)
+    if args.governance:
+        from src.analyzers.governance_analyzer import GovernanceAnalyzer
+        analysis['governance_metrics'] = GovernanceAnalyzer().analyze(datasets)
+
+    if args.sample:
+        # Estimates must not replace the stored results of the version
+        logger.info("Sampled run, not storing the analysis")
+        return analysis, analyzer
+
+    # Keep a snapshot per dataset version for `compare` and `history`, and
+    # the latest one with its time series for `serve`
+    from src.pipeline.analysis_store import AnalysisStore
+    from src.service.snapshot import write_snapshot
+    version_info = provider.get_version_info()
+    try:
+        AnalysisStore(ANALYSIS_STORE).save(version_info, analysis)
+        write_snapshot(SNAPSHOT_DIR, version_info, analysis, processed_data)
+    except Exception as e:
+        logger.warning(f"Could not store the analysis: {str(e)}")
+    return analysis, analyzer
+
+def run_analyze(args: argparse.Namespace) -> None:
+    analysis_results, _ = run_analysis(args)
+
+    # Display results
+    print("\nAnalysis Results:")
+    for dataset, metrics in analysis_results['dataset_metrics'].items():
+        print(f"\n{dataset}:")
+        records = format_estimate(
+            metrics['record_count'], metrics.get('record_count_bounds')
+        )
+        print(f"Records: {records}")
+        completeness = format_estimate(
+            metrics['completeness'], metrics.get('completeness_bounds'), '.2%'
+        )
+        print(f"Completeness: {completeness}")
+
+        if dataset in analysis_results['temporal_metrics']:
+            temporal = analysis_results['temporal_metrics'][dataset]
+            print(f"Time span: {temporal['time_span']}")
+            trend = temporal['activity_trend']
+            if 'trend' in trend:
+                slope = (
+                    f" ({trend['slope']:+.1f}/month)"
+                    if trend['slope'] is not None
+                    else ''
+                )
+                print(f"Activity trend: {trend['trend']}{slope}")
+                for changepoint in trend['changepoints']:
+                    print(
+                        f"Level shift in {changepoint['month'][:7]}: "
+                        f"{changepoint['before']:.0f} -> {changepoint['after']:.0f} "
+                        "per month"
+                    )
+
+    governance = analysis_results.get('governance_metrics')
+    if governance:
+        summary = governance['summary']
+        print(
+            f"\nGovernance: {summary['daos']} DAOs, {summary['proposals']} proposals, "
+            f"{summary['votes']} votes by {summary['voters']} voters"
+        )
+        for platform, metrics in governance['platform_metrics'].items():
+            print(f"\n{platform}:")
+            print(
+                f"DAOs: {metrics['daos']}, proposals: {metrics['proposals']}, votes: "
+                f"{metrics['votes']}"
+            )
+            for key, label in (
+                ('pass_rate', 'Pass rate'),
+                ('participation', 'Participation'),
+            ):
+                if metrics[key] is not None:
+                    print(f"{label}: {metrics[key]:.2%}")
+            if metrics['voting_power_gini'] is not None:
+                print(f"Voting power Gini: {metrics['voting_power_gini']:.3f}")
+
+def run_plot(args: argparse.Namespace) -> None:
+    import pandas as pd
+    from src.visualization.plotter import DAOPlotter
+
+    _, analyzer = run_analysis(args)
+    cube = analyzer.rollup_cube
+    plotter = DAOPlotter(point_budget=args.point_budget)
+    if not (args.batch or args.output_dir):
+        frames = {}
+        for dataset in cube.datasets():
+            counts = cube.total(dataset, args.freq[0])
+            frames[dataset] = pd.DataFrame(
+                {'date': counts.index, 'count': counts.to_numpy()}
+            )
+        plotter.create_plots(frames)
+        return
+
+    figures = {}
+    for freq in args.freq:
+        frames = {
+            dataset: cube.query(
+                dataset,
+                freq,
+                by=args.by if args.by in cube.dimensions(dataset) else None,
+            )
+            for dataset in cube.datasets()
+        }
+        figures[f"activity_{freq}"] = plotter.create_batch_figure(
+            frames, title=f"DAO activity per {freq} period"
+        )
+    if args.output_dir:
+        plotter.write_figures(figures, args.output_dir, args.image_format)
+    else:
+        for fig in figures.values():
+            fig.show()
+
+def format_metric(value: float, text: Optional[str]) -> str:
+    """A stored metric for display; '-' when the metric is absent"""
+    if text is not None:
+        return text
+    return '-' if value != value else f"{value:g}"
+
+def run_compare(args: argparse.Namespace) -> None:
+    from src.pipeline.analysis_store import AnalysisStore
+    try:
+        changes = AnalysisStore(ANALYSIS_STORE).diff(
+            args.old,
+            args.new,
+            name=args.dataset,
+            section=args.section,
+            metric=args.metric,
+        )
+    except KeyError as e:
+        print(f"\n{e.args[0]}")
+        return
+    print(f"\nChanges from version {changes.attrs['old']} to {changes.attrs['new']}:")
+    if changes.empty:
+        print("No metric changed")
+        return
+    for _, row in changes.iterrows():
+        old = format_metric(row['old_value'], row['old_text'])
+        new = format_metric(row['new_value'], row['new_text'])
+        change = (
+            f" ({row['pct_change']:+.1%})"
+            if row['pct_change'] == row['pct_change']
+            else ''
+        )
+        print(f"{row['name']} {row['section']} {row['metric']}: {old} -> {new}{change}")
+
+def run_history(args: argparse.Namespace) -> None:
+    from src.pipeline.analysis_store import AnalysisStore
+    history = AnalysisStore(ANALYSIS_STORE).history(
+        args.metric, name=args.dataset, section=args.section
+    )
+    if history.empty:
+        print(f"\nNo stored values of {args.metric}")
+        return
+    for name, rows in history.groupby('name', sort=False):
+        print(f"\n{name} {args.metric}:")
+        for _, row in rows.iterrows():
+            print(
+                f"version {row['version']}: {format_metric(row['value'], row['text'])}"
+            )
+
+def run_serve(args: argparse.Namespace) -> None:
+    from src.service.metrics_service import MetricsService
+    MetricsService(
+        args.snapshot_dir, host=args.host, port=args.port,
+        cache_size=args.cache_size, reload_interval=args.reload_interval
+    ).run()
+
+HANDLERS = {
+    'version': run_version,
+    'fetch': run_fetch,
+    'process': run_process,
+    'analyze': run_analyze,
+    'plot': run_plot,
+    'compare': run_compare,
+    'history': run_history,
+    'serve': run_serve
+}
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+
     # Set up logging
     setup_logging()
     logger = logging.getLogger(__name__)
 
-    try:
-        # Initialize components
-        provider = KaggleDatasetProvider(
-            dataset_path="daviddavo/dao-analyzer",
-            backup_dir=Path("data/backup")
+    profile_output = getattr(args, 'profile_output', None)
+    if profile_output:
+        from src.core.instrumentation import instrumentation
+        instrumentation.enable(
+            trace_memory=args.trace_memory, profile_stage=args.profile_stage
         )
-        
-        # Print dataset version info
-        version_info = provider.get_version_info()
-        print("\nDataset Information:")
-        for key, value in version_info.items():
-            print(f"{key}: {value}")
-            
-        # Get and process datasets
-        processor = DAODataProcessor()
-        analyzer = DAOAnalyzer()
-        
-        # Load datasets
-        datasets = provider.get_datasets()
-        logger.info(f"Loaded {len(datasets)} datasets")
-        
-        # Process each dataset
-        processed_data = {}
-        for name, df in datasets.items():
-            logger.info(f"Processing {name}")
-            processed_data[name] = processor.process(df, {'name': name})
-        
-        # Analyze processed data
-        analysis_results = analyzer.analyze(processed_data)
-        
-        # Display results
-        print("\nAnalysis Results:")
-        for dataset, metrics in analysis_results['dataset_metrics'].items():
-            print(f"\n{dataset}:")
-            print(f"Records: {metrics['record_count']}")
-            print(f"Completeness: {metrics['completeness']:.2%}")
-            
-            if dataset in analysis_results['temporal_metrics']:
-                temporal = analysis_results['temporal_metrics'][dataset]
-                print(f"Time span: {temporal['time_span']}")
-                if 'trend' in temporal['activity_trend']:
-                    print(f"Activity trend: {temporal['activity_trend']['trend']}")
 
+    try:
+        HANDLERS[args.command](args)
     except Exception as e:
         logger.error(f"Error in main execution: {str(e)}")
         raise
+    finally:
+        if profile_output:
+            instrumentation.export(profile_output, args.profile_format)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,308 @@
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+import logging
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Months summed on each side of the rolling growth rate
+GROWTH_WINDOW = 3
+
+# Lag of the year-over-year deltas, in months
+YEAR = 12
+
+# Relative slope (per month, against the median monthly count) below which
+# activity counts as stable rather than increasing or decreasing
+TREND_TOLERANCE = 0.01
+
+# Changepoints split log activity into segments of at least this many
+# months; each one costs PENALTY_SCALE * log(months) in the fit
+MIN_SEGMENT = 2
+PENALTY_SCALE = 2.0
+
+# Smallest noise level of log activity, so near-flat series with one step
+# still have a finite changepoint penalty
+NOISE_FLOOR = 0.1
+
+# Scales a median absolute deviation to a normal standard deviation
+MAD_SCALE = 1.4826
+
+
+class ActivityMatrix:
+    """Monthly activity of every dataset aligned into one (datasets x months) array.
+
+    Rows hold counts from each dataset's first to its last month (empty
+    months in between are 0) and NaN outside that span. Growth rates,
+    deltas, trend slopes and changepoints are computed for all datasets at
+    once with array operations along the month axis, so adding a dataset
+    adds a row, not a loop.
+    """
+
+    def __init__(self, names: List[str], periods: pd.PeriodIndex, values: np.ndarray):
+        """
+        Args:
+            names: Dataset name of each row
+            periods: Monthly periods of the columns, consecutive
+            values: Counts, shape (len(names), len(periods)), NaN outside
+                each dataset's span
+        """
+        self.names = list(names)
+        self.periods = periods
+        self.values = values.astype(np.float64)
+        self.valid = ~np.isnan(self.values)
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_series(
+        cls, series: Mapping[str, Tuple[pd.PeriodIndex, np.ndarray]]
+    ) -> 'ActivityMatrix':
+        """Align monthly (periods, counts) pairs on one month axis"""
+        series = {
+            name: (periods, counts)
+            for name, (periods, counts) in series.items()
+            if len(periods)
+        }
+        if not series:
+            return cls([], pd.PeriodIndex([], freq='M'), np.empty((0, 0)))
+        first = min(int(periods.asi8[0]) for periods, _ in series.values())
+        last = max(int(periods.asi8[-1]) for periods, _ in series.values())
+        values = np.full((len(series), last - first + 1), np.nan)
+        for row, (periods, counts) in enumerate(series.values()):
+            columns = periods.asi8 - first
+            values[row, columns[0]:columns[-1] + 1] = 0.0
+            values[row, columns] = counts
+        periods = pd.period_range(
+            pd.Period(ordinal=first, freq='M'), periods=values.shape[1], freq='M'
+        )
+        return cls(list(series), periods, values)
+
+    @classmethod
+    def from_processed(
+        cls, data: Mapping[str, Dict[str, Any]], cube=None
+    ) -> 'ActivityMatrix':
+        """Build from ``DAODataProcessor`` results: monthly totals from the
+        rollup cube where it has the dataset, else ``monthly_activity``"""
+        series = {}
+        for dataset, result in data.items():
+            if cube is not None and dataset in cube:
+                series[dataset] = cube.counts(dataset, 'M')
+                continue
+            monthly = result.get('time_series', {}).get('monthly_activity')
+            if monthly:
+                activity = pd.Series(monthly).sort_index()
+                series[dataset] = (
+                    pd.PeriodIndex(activity.index, freq='M'),
+                    activity.to_numpy(dtype=np.float64)
+                )
+        return cls.from_series(series)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def frame(self, values: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """A (months x datasets) DataFrame of ``values`` (the counts by
+        default), indexed by month start"""
+        values = self.values if values is None else values
+        return pd.DataFrame(
+            values.T,
+            index=self.periods[len(self.periods) - values.shape[1] :].to_timestamp(),
+            columns=self.names,
+        )
+
+    def deltas(self, lag: int = 1) -> np.ndarray:
+        """Change from ``lag`` months earlier; lag 1 is month over month,
+        YEAR is year over year. Aligned to the last ``months - lag`` months."""
+        return self.values[:, lag:] - self.values[:, :-lag]
+
+    def growth_rates(self, lag: int = 1) -> np.ndarray:
+        """Relative change from ``lag`` months earlier, NaN after an empty month"""
+        previous = self.values[:, :-lag]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(previous > 0, self.deltas(lag) / previous, np.nan)
+
+    def rolling_growth(self, window: int = GROWTH_WINDOW) -> np.ndarray:
+        """Growth of the last ``window`` months' total over the ``window``
+        months before them, aligned to the last ``months - 2 * window + 1`` months"""
+        sums = self._window_sums(window)
+        current, previous = sums[:, window:], sums[:, :-window]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(previous > 0, current / previous - 1, np.nan)
+
+    def _window_sums(self, window: int) -> np.ndarray:
+        """Sums over every run of ``window`` months, NaN unless all are in span"""
+        filled = np.where(self.valid, self.values, 0.0)
+        totals = np.cumsum(np.pad(filled, ((0, 0), (1, 0))), axis=1)
+        counts = np.cumsum(np.pad(self.valid, ((0, 0), (1, 0))), axis=1)
+        sums = totals[:, window:] - totals[:, :-window]
+        return np.where(
+            counts[:, window:] - counts[:, :-window] == window, sums, np.nan
+        )
+
+    def slopes(self) -> np.ndarray:
+        """Theil-Sen slope of each dataset's counts, per month.
+
+        The median of the slopes between every pair of months in span, so
+        single spikes barely move it. NaN with fewer than two months.
+        """
+        months = self.values.shape[1]
+        if months < 2:
+            return np.full(len(self), np.nan)
+        left, right = np.triu_indices(months, k=1)
+        pairwise = (self.values[:, right] - self.values[:, left]) / (right - left)
+        return self._nanmedian(pairwise)
+
+    def changepoints(self) -> List[List[Tuple[int, int]]]:
+        """Mean shifts in each dataset's log activity.
+
+        Fits piecewise-constant levels to log1p(counts) by optimal
+        partitioning (the exact search PELT prunes): a segment costs its
+        squared error in units of the series' noise level, estimated from
+        the median absolute month-over-month change, plus a
+        PENALTY_SCALE * log(months) penalty. Each step of the dynamic
+        program updates every dataset at once; months outside a dataset's
+        span cost nothing, so no changepoint is ever placed there.
+
+        Returns:
+            Per dataset, the (start, end) column ranges of its segments
+        """
+        rows, months = self.values.shape
+        if not rows:
+            return []
+        logs = np.log1p(np.where(self.valid, self.values, 0.0))
+        steps = np.where(
+            self.valid[:, 1:] & self.valid[:, :-1], np.diff(logs, axis=1), np.nan
+        )
+        deviation = np.abs(steps - self._nanmedian(steps)[:, np.newaxis])
+        noise = np.nan_to_num(
+            self._nanmedian(deviation) * MAD_SCALE / np.sqrt(2), nan=0.0
+        )
+        scaled = (
+            np.where(self.valid, logs, 0.0)
+            / np.maximum(noise, NOISE_FLOOR)[:, np.newaxis]
+        )
+
+        sums = np.cumsum(np.pad(scaled, ((0, 0), (1, 0))), axis=1)
+        squares = np.cumsum(np.pad(scaled ** 2, ((0, 0), (1, 0))), axis=1)
+        counts = np.cumsum(np.pad(self.valid, ((0, 0), (1, 0))), axis=1)
+        penalty = PENALTY_SCALE * np.log(np.maximum(counts[:, -1], 2))[:, np.newaxis]
+
+        # best[:, t]: cost of the best segmentation of the first t months;
+        # back[:, t]: where its last segment starts
+        best = np.full((rows, months + 1), np.inf)
+        best[:, 0] = -penalty[:, 0]
+        back = np.zeros((rows, months + 1), dtype=np.int64)
+        row_index = np.arange(rows)
+        for end in range(MIN_SEGMENT, months + 1):
+            starts = np.arange(end - MIN_SEGMENT + 1)
+            n = counts[:, end:end + 1] - counts[:, starts]
+            total = sums[:, end:end + 1] - sums[:, starts]
+            cost = (
+                squares[:, end : end + 1]
+                - squares[:, starts]
+                - total**2 / np.maximum(n, 1)
+            )
+            candidates = best[:, starts] + cost + penalty
+            choice = np.argmin(candidates, axis=1)
+            best[:, end] = candidates[row_index, choice]
+            back[:, end] = starts[choice]
+
+        segments: List[List[Tuple[int, int]]] = [[] for _ in range(rows)]
+        ends = np.full(rows, months)
+        while (ends > 0).any():
+            active = np.flatnonzero(ends > 0)
+            starts = back[active, ends[active]]
+            for row, start, end in zip(active, starts, ends[active]):
+                segments[row].insert(0, (int(start), int(end)))
+            ends[active] = starts
+        return segments
+
+    def trends(self) -> Dict[str, Dict[str, Any]]:
+        """Per dataset: trend direction and slope, peak month, latest
+        month-over-month, year-over-year and rolling growth, and changepoints"""
+        if not len(self):
+            return {}
+        months = self.values.shape[1]
+        last = months - 1 - np.argmax(self.valid[:, ::-1], axis=1)
+        peak = np.nanargmax(np.where(self.valid, self.values, -np.inf), axis=1)
+        slopes = self.slopes()
+        level = np.maximum(self._nanmedian(self.values), 1.0)
+        relative = slopes / level
+        direction = np.where(
+            relative > TREND_TOLERANCE,
+            'increasing',
+            np.where(relative < -TREND_TOLERANCE, 'decreasing', 'stable'),
+        )
+
+        latest = {
+            'mom_delta': self._at(self.deltas(1), last, 1),
+            'mom_growth': self._at(self.growth_rates(1), last, 1),
+            'yoy_delta': (
+                self._at(self.deltas(YEAR), last, YEAR) if months > YEAR else None
+            ),
+            'yoy_growth': (
+                self._at(self.growth_rates(YEAR), last, YEAR) if months > YEAR else None
+            ),
+            'rolling_growth': (
+                self._at(self.rolling_growth(), last, 2 * GROWTH_WINDOW - 1)
+                if months >= 2 * GROWTH_WINDOW
+                else None
+            ),
+        }
+        starts = self.periods.to_timestamp()
+        filled = np.where(self.valid, self.values, 0.0)
+        totals = np.cumsum(np.pad(filled, ((0, 0), (1, 0))), axis=1)
+        counts = np.cumsum(np.pad(self.valid, ((0, 0), (1, 0))), axis=1)
+
+        trends = {}
+        for row, (name, segments) in enumerate(zip(self.names, self.changepoints())):
+            levels = [
+                (totals[row, end] - totals[row, start])
+                / max(counts[row, end] - counts[row, start], 1)
+                for start, end in segments
+            ]
+            trends[name] = {
+                'trend': str(direction[row]),
+                'slope': self._float(slopes[row]),
+                'peak_month': starts[peak[row]].isoformat(),
+                'peak_value': float(self.values[row, peak[row]]),
+                **{
+                    key: None if values is None else self._float(values[row])
+                    for key, values in latest.items()
+                },
+                'changepoints': [
+                    {
+                        'month': starts[start].isoformat(),
+                        'before': float(before),
+                        'after': float(after),
+                    }
+                    for (start, _), before, after in zip(
+                        segments[1:], levels, levels[1:]
+                    )
+                ],
+            }
+        return trends
+
+    @staticmethod
+    def _at(values: np.ndarray, columns: np.ndarray, offset: int) -> np.ndarray:
+        """Each row's value of a lagged array at a month column, NaN when
+        the lag reaches before the first month"""
+        index = columns - offset
+        picked = (
+            values[np.arange(len(values)), np.clip(index, 0, None)]
+            if values.size
+            else np.full(len(values), np.nan)
+        )
+        return np.where(index >= 0, picked, np.nan)
+
+    @staticmethod
+    def _nanmedian(values: np.ndarray) -> np.ndarray:
+        """Row medians ignoring NaN, NaN for rows without values"""
+        if not values.shape[1]:
+            return np.full(len(values), np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return np.nanmedian(values, axis=1)
+
+    @staticmethod
+    def _float(value: float) -> Optional[float]:
+        return None if np.isnan(value) else float(value)
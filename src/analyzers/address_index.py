@@ -0,0 +1,225 @@
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Tuple, Union
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.data.schema import DatasetSchema
+
+# (dataset, column, group); group is None unless split by e.g. platform
+SetKey = Tuple[str, str, Optional[str]]
+
+
+class AddressIndex:
+    """Global interning table mapping addresses to compact integer ids.
+
+    Every address seen in any dataset gets one id, so the members of a
+    dataset column (optionally split by a group column such as platform)
+    are stored as sorted unique id arrays. Unions and intersections across
+    columns, datasets and platforms are then NumPy set operations on
+    integers instead of Python string sets.
+    """
+
+    def __init__(self):
+        self._lookup = pd.Index([], dtype=object)
+        self._size = 0
+        self.sets: Dict[SetKey, np.ndarray] = {}
+        # Fingerprint of the dataset files the index was built from
+        self.source: Optional[str] = None
+        self.logger = logging.getLogger(__name__)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def id_dtype(self) -> np.dtype:
+        return np.dtype(np.int32 if self._size < np.iinfo(np.int32).max else np.int64)
+
+    def intern(self, values: Iterable) -> np.ndarray:
+        """Ids for the given addresses, assigning new ids to unseen ones.
+
+        Addresses are lowercased so checksummed and plain spellings match.
+        Missing values are dropped.
+        """
+        series = pd.Series(values).dropna().astype(str).str.lower()
+        codes, uniques = pd.factorize(series)
+        ids = self._lookup.get_indexer(uniques)
+
+        new = ids == -1
+        if new.any():
+            new_addresses = np.asarray(uniques[new], dtype=object)
+            ids[new] = np.arange(self._size, self._size + len(new_addresses))
+            self._lookup = self._lookup.append(pd.Index(new_addresses))
+            self._size += len(new_addresses)
+
+        return ids.astype(self.id_dtype)[codes]
+
+    def addresses(self, ids: np.ndarray) -> np.ndarray:
+        """Addresses for the given ids"""
+        return np.asarray(self._lookup)[ids]
+
+    def add_dataset(self,
+                    name: str,
+                    df: pd.DataFrame,
+                    columns: Optional[List[str]] = None,
+                    group_column: Optional[str] = 'platform') -> List[str]:
+        """Intern the address columns of a dataset and record their members.
+
+        Args:
+            name: Dataset name
+            df: Dataset
+            columns: Address columns; those named like addresses if None
+            group_column: If present in ``df``, also record members per value
+
+        Returns:
+            The address columns that were indexed
+        """
+        columns = columns if columns is not None else self.detect_address_columns(df)
+        groups = (
+            df[group_column] if group_column and group_column in df.columns else None
+        )
+        for col in columns:
+            present = df[col].notna()
+            ids = self.intern(df.loc[present, col])
+            self.sets[(name, col, None)] = np.unique(ids)
+            if groups is not None:
+                group_values = groups[present].astype(str).to_numpy()
+                for group in pd.unique(group_values):
+                    self.sets[(name, col, group)] = np.unique(
+                        ids[group_values == group]
+                    )
+        return columns
+
+    @staticmethod
+    def detect_address_columns(df: pd.DataFrame) -> List[str]:
+        """Columns named like addresses, the columns the processor's
+        ``address_columns`` counts cover"""
+        return [col for col in df.columns if 'address' in str(col).lower()]
+
+    @staticmethod
+    def source_fingerprint(datasets: Mapping[str, pd.DataFrame]) -> str:
+        """Identifier of the files (size and mtime) and read options of a
+        ``LazyDatasets`` mapping, to tell whether a saved index is stale"""
+        sources = {}
+        for name in datasets:
+            stat = Path(datasets.path(name)).stat()
+            sources[name] = [stat.st_size, stat.st_mtime,
+                             DatasetSchema.for_dataset(name).fingerprint()]
+        return hashlib.md5(json.dumps(sources, sort_keys=True).encode()).hexdigest()
+
+    def ids(self,
+            dataset: Optional[str] = None,
+            column: Optional[str] = None,
+            group: Optional[str] = None) -> np.ndarray:
+        """Sorted unique ids of every recorded set matching the filters"""
+        matching = [
+            members
+            for (set_dataset, set_column, set_group), members in self.sets.items()
+            if (dataset is None or set_dataset == dataset)
+            and (column is None or set_column == column)
+            and set_group == group
+        ]
+        if not matching:
+            return np.empty(0, dtype=self.id_dtype)
+        if len(matching) == 1:
+            return matching[0]
+        return np.unique(np.concatenate(matching))
+
+    def union(self, *selections: Mapping[str, Any]) -> np.ndarray:
+        """Ids in any of the selections, each given as ``ids()`` keyword filters"""
+        if not selections:
+            return np.empty(0, dtype=self.id_dtype)
+        return np.unique(np.concatenate([self.ids(**s) for s in selections]))
+
+    def intersection(self, *selections: Mapping[str, Any]) -> np.ndarray:
+        """Ids in all of the selections, e.g. voters who are also proposers:
+
+        ``index.intersection({'dataset': 'votes', 'column': 'voter'},
+        {'dataset': 'proposals', 'column': 'proposer'})``
+        """
+        if not selections:
+            return np.empty(0, dtype=self.id_dtype)
+        result = self.ids(**selections[0])
+        for selection in selections[1:]:
+            result = np.intersect1d(result, self.ids(**selection), assume_unique=True)
+        return result
+
+    def overlap(self, a: Mapping[str, Any], b: Mapping[str, Any]) -> Dict[str, Any]:
+        """Sizes of two selections, their intersection and Jaccard similarity"""
+        ids_a, ids_b = self.ids(**a), self.ids(**b)
+        shared = len(np.intersect1d(ids_a, ids_b, assume_unique=True))
+        total = len(ids_a) + len(ids_b) - shared
+        return {
+            'left': len(ids_a),
+            'right': len(ids_b),
+            'shared': shared,
+            'jaccard': shared / total if total else 0.0
+        }
+
+    def groups(self) -> List[str]:
+        """Group values (e.g. platforms) seen in any dataset"""
+        return sorted({group for (_, _, group) in self.sets if group is not None})
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Persist the index as a compressed .npz file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        keys = list(self.sets)
+        arrays = {f"set_{i}": self.sets[key] for i, key in enumerate(keys)}
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                addresses=np.asarray(self._lookup, dtype=str),
+                keys=np.asarray(json.dumps([list(key) for key in keys])),
+                source=np.asarray(self.source or ''),
+                **arrays
+            )
+        self.logger.info(f"Saved address index with {len(self)} addresses to {path}")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'AddressIndex':
+        """Load an index written by ``save``"""
+        index = cls()
+        with np.load(path, allow_pickle=False) as data:
+            addresses = data['addresses'].astype(object)
+            index._lookup = pd.Index(addresses)
+            index._size = len(addresses)
+            keys = json.loads(str(data['keys']))
+            # Indexes saved without a source are treated as stale
+            if 'source' in data.files:
+                index.source = str(data['source']) or None
+            index.sets = {
+                tuple(key): data[f"set_{i}"].astype(index.id_dtype)
+                for i, key in enumerate(keys)
+            }
+        return index
+
+    @classmethod
+    def build(cls, datasets: Mapping[str, pd.DataFrame]) -> 'AddressIndex':
+        """Build the index from every dataset of a (lazy) mapping.
+
+        Datasets of a ``LazyDatasets`` mapping are read on a thread pool,
+        the next file while one is indexed, and released after indexing.
+        """
+        index = cls()
+        if hasattr(datasets, 'path'):
+            index.source = cls.source_fingerprint(datasets)
+        if hasattr(datasets, 'load_concurrently'):
+            frames = (
+                (name, future.result) for name, future in datasets.load_concurrently()
+            )
+        else:
+            frames = ((name, lambda name=name: datasets[name]) for name in datasets)
+        for name, load in frames:
+            try:
+                columns = index.add_dataset(name, load())
+                index.logger.info(f"Indexed address columns {columns} of {name}")
+            except Exception as e:
+                index.logger.error(f"Error indexing addresses of {name}: {str(e)}")
+            finally:
+                if hasattr(datasets, 'release'):
+                    datasets.release(name)
+        return index
@@ -1,17 +1,46 @@
 from src.core.base import Analyzer
-from typing import Dict, Any
-import pandas as pd
+from src.analyzers.activity_matrix import ActivityMatrix
+from src.analyzers.address_index import AddressIndex
+from src.analyzers.rollup_cube import RollupCube
+from src.utils.hyperloglog import HyperLogLog
+from itertools import combinations
+from typing import Dict, Any, List, Optional
+import logging
 
 class DAOAnalyzer(Analyzer):
+    def __init__(self, address_index: Optional[AddressIndex] = None):
+        """
+        Args:
+            address_index: Global address index; when given, unique address
+                counts and cross-dataset overlaps are exact
+        """
+        self.logger = logging.getLogger(__name__)
+        self.address_index = address_index
+        # Rollup of the daily counts and aligned monthly activity of the
+        # last analyzed data
+        self.rollup_cube: Optional[RollupCube] = None
+        self.activity_matrix: Optional[ActivityMatrix] = None
+
     def analyze(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze processed DAO data and compute metrics"""
+        """Analyze processed DAO data and compute metrics.
+
+        The result holds plain data only; the ``RollupCube`` of the daily
+        counts is kept as ``rollup_cube`` and the ``ActivityMatrix`` as
+        ``activity_matrix``. Its trend summaries (slopes, growth,
+        changepoints) are reported under ``temporal_metrics``.
+        """
+        cube = RollupCube.from_processed(data)
+        activity = ActivityMatrix.from_processed(data, cube)
+        self.rollup_cube = cube
+        self.activity_matrix = activity
+        trends = self._calculate_trends(activity)
         analysis = {
             'dataset_metrics': {},
             'temporal_metrics': {},
             'network_metrics': {},
             'cross_dataset_metrics': {}
         }
-        
+
         for dataset_name, dataset_data in data.items():
             # Dataset-specific metrics
             analysis['dataset_metrics'][dataset_name] = {
@@ -19,36 +48,73 @@ class DAOAnalyzer(Analyzer):
                 'column_count': len(dataset_data['columns']),
                 'completeness': self._calculate_completeness(dataset_data)
             }
-            
+            sampling = dataset_data.get('sampling')
+            if sampling:
+                # Quick-look results estimated from a sample carry their bounds
+                analysis['dataset_metrics'][dataset_name].update({
+                    'sampled_rows': sampling['sample_rows'],
+                    'record_count_bounds': sampling['record_count_bounds'],
+                    'completeness_bounds': sampling['completeness_bounds']
+                })
+
             # Temporal metrics if available
             if 'time_series' in dataset_data:
                 analysis['temporal_metrics'][dataset_name] = {
-                    'activity_trend': self._calculate_trend(dataset_data['time_series']),
+                    'activity_trend': trends.get(dataset_name, {}),
                     'time_span': self._calculate_timespan(dataset_data['time_series'])
                 }
-            
+                if sampling and 'monthly_activity_bounds' in sampling:
+                    analysis['temporal_metrics'][dataset_name][
+                        'monthly_activity_bounds'
+                    ] = sampling['monthly_activity_bounds']
+
             # Network metrics if available
             if dataset_data['network_stats']:
                 analysis['network_metrics'][dataset_name] = {
                     'network_distribution': dataset_data['network_stats'].get('networks', {}),
                     'unique_addresses': self._count_unique_addresses(dataset_data)
                 }
-        
+                if sampling and 'network_bounds' in sampling:
+                    analysis['network_metrics'][dataset_name][
+                        'network_distribution_bounds'
+                    ] = sampling['network_bounds']
+                sketches = self._address_sketches(dataset_data)
+                if sketches:
+                    analysis['network_metrics'][dataset_name][
+                        'unique_addresses_bounds'
+                    ] = list(HyperLogLog.union(sketches).bounds())
+
         # Add cross-dataset analysis
         analysis['cross_dataset_metrics'] = self._analyze_cross_dataset_relationships(data)
-        
+
         return analysis
-    
+
     def _count_unique_addresses(self, data: Dict) -> int:
-        """Count unique addresses across all address columns"""
+        """Count unique addresses across all address columns.
+
+        With an address index this is the exact size of the union; with
+        HyperLogLog sketches (approximate processing) it is the estimated
+        size of the union; otherwise per-column counts are summed.
+        """
         try:
+            dataset_name = data.get('dataset_name')
+            if self.address_index is not None and dataset_name:
+                return len(self.address_index.ids(dataset=dataset_name))
+            sketches = self._address_sketches(data)
+            if sketches:
+                return HyperLogLog.union(sketches).count()
             if 'network_stats' not in data or 'address_columns' not in data['network_stats']:
                 return 0
             return sum(data['network_stats']['address_columns'].values())
         except Exception as e:
             self.logger.error(f"Error counting addresses: {str(e)}")
             return 0
-        
+
+    def _address_sketches(self, data: Dict) -> List[HyperLogLog]:
+        """Deserialize the address sketches of a processed dataset, if any"""
+        encoded = data.get('network_stats', {}).get('address_sketches', {})
+        return [HyperLogLog.from_base64(sketch) for sketch in encoded.values()]
+
     def _calculate_timespan(self, time_series: Dict) -> str:
         """Calculate the timespan between start and end dates"""
         try:
@@ -63,28 +129,65 @@ class DAOAnalyzer(Analyzer):
         """Calculate data completeness score"""
         if 'summary' not in data:
             return 0.0
-        
+
         missing = sum(data['summary']['missing_values'].values())
         total = data['record_count'] * len(data['columns'])
         return 1 - (missing / total) if total > 0 else 0
-    
+
     def _analyze_cross_dataset_relationships(self, data: Dict) -> Dict[str, Any]:
         """Analyze relationships between datasets"""
-        return {
+        metrics = {
             'total_datasets': len(data),
             'datasets_with_temporal_data': sum(1 for d in data.values() if 'time_series' in d),
             'datasets_with_network_data': sum(1 for d in data.values() if d.get('network_stats'))
         }
 
-    def _calculate_trend(self, time_series: Dict) -> Dict[str, Any]:
-        """Calculate activity trends from time series data"""
-        if 'monthly_activity' not in time_series:
+        if self.address_index is not None:
+            metrics.update(self._address_overlap_metrics(list(data)))
+            return metrics
+
+        sketches = [
+            sketch for d in data.values() for sketch in self._address_sketches(d)
+        ]
+        if sketches:
+            try:
+                union = HyperLogLog.union(sketches)
+                metrics['unique_addresses'] = union.count()
+                metrics['unique_addresses_bounds'] = list(union.bounds())
+            except ValueError as e:
+                self.logger.error(f"Error merging address sketches: {str(e)}")
+        return metrics
+
+    def _address_overlap_metrics(self, dataset_names: List[str]) -> Dict[str, Any]:
+        """Exact address unions and overlaps from the address index"""
+        index = self.address_index
+        indexed = [name for name in dataset_names if len(index.ids(dataset=name))]
+        metrics = {
+            'unique_addresses': len(
+                index.union(*({'dataset': name} for name in indexed))
+            ),
+            'dataset_address_overlap': {
+                f"{a}&{b}": index.overlap({'dataset': a}, {'dataset': b})
+                for a, b in combinations(indexed, 2)
+            },
+        }
+
+        groups = index.groups()
+        if groups:
+            metrics['addresses_per_group'] = {
+                group: len(index.ids(group=group)) for group in groups
+            }
+            metrics['group_address_overlap'] = {
+                f"{a}&{b}": index.overlap({'group': a}, {'group': b})
+                for a, b in combinations(groups, 2)
+            }
+        return metrics
+
+    def _calculate_trends(self, activity: ActivityMatrix) -> Dict[str, Dict[str, Any]]:
+        """Trend, growth and changepoint metrics of every dataset's monthly
+        activity, computed over the aligned matrix in one pass"""
+        try:
+            return activity.trends()
+        except Exception as e:
+            self.logger.error(f"Error calculating activity trends: {str(e)}")
             return {}
-            
-        activity = pd.Series(time_series['monthly_activity'])
-        return {
-            'trend': 'increasing' if activity.is_monotonic_increasing else 
-                    'decreasing' if activity.is_monotonic_decreasing else 'varying',
-            'peak_month': activity.idxmax().isoformat(),
-            'peak_value': float(activity.max())
-        }
\ No newline at end of file
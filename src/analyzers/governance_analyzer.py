@@ -0,0 +1,324 @@
+from src.core.base import Analyzer
+from src.analyzers.relational import (
+    KeyIndex,
+    group_gini,
+    group_means,
+    group_member_max,
+    group_nunique,
+    group_sizes,
+    join,
+)
+from typing import Dict, Any, List, Mapping, Optional
+import numpy as np
+import pandas as pd
+import logging
+
+# Words in a dataset name that make it a table of DAOs, proposals or votes;
+# checked in this order, so 'daostack_votes' is a votes table
+TABLE_WORDS = (('votes', 'vote'), ('proposals', 'proposal'), ('daos', 'dao'))
+
+# Candidate column names per role, compared case-insensitively
+ID_COLUMNS = ('id',)
+DAO_COLUMNS = ('dao', 'dao_id', 'daoid', 'dao_address', 'organization', 'org')
+PROPOSAL_COLUMNS = ('proposal', 'proposal_id', 'proposalid')
+VOTER_COLUMNS = ('voter', 'voter_address', 'voteraddress')
+WEIGHT_COLUMNS = ('weight', 'voting_power', 'votingpower', 'balance', 'stake')
+OUTCOME_COLUMNS = ('executed', 'passed', 'approved', 'outcome', 'status')
+PLATFORM_COLUMNS = ('platform',)
+
+# Outcome strings counted as a passed proposal
+PASSED_VALUES = frozenset({'true', '1', 'yes', 'passed', 'executed', 'approved',
+                           'accepted', 'succeeded'})
+
+UNKNOWN_PLATFORM = 'unknown'
+
+
+def find_column(df: pd.DataFrame, candidates) -> Optional[str]:
+    """The first column of ``df`` named like one of ``candidates``"""
+    lowered = {str(col).lower(): col for col in df.columns}
+    for candidate in candidates:
+        if candidate in lowered:
+            return lowered[candidate]
+    return None
+
+
+def passed(values: pd.Series) -> np.ndarray:
+    """Proposal outcomes as 1.0 (passed), 0.0 (not passed) or NaN (unknown)"""
+    if pd.api.types.is_bool_dtype(values) or pd.api.types.is_numeric_dtype(values):
+        numeric = values.astype(np.float64).to_numpy()
+        return np.where(np.isnan(numeric), np.nan, (numeric > 0).astype(np.float64))
+    codes, uniques = pd.factorize(values)
+    outcome = np.array(
+        [str(value).strip().lower() in PASSED_VALUES for value in uniques],
+        dtype=np.float64,
+    )
+    return np.where(codes >= 0, outcome[codes] if len(outcome) else np.nan, np.nan)
+
+
+class GovernanceAnalyzer(Analyzer):
+    """Per-DAO and per-platform governance metrics from raw DAO, proposal
+    and vote tables.
+
+    Ids are hash-indexed into dense integer codes once (``KeyIndex``), so
+    votes -> proposals -> DAOs is a pair of array gathers and every metric
+    is a ``bincount``-style group-by on codes instead of a pandas merge on
+    string ids. Tables are found by dataset name and columns by role;
+    several tables of one kind (e.g. one per platform) are combined.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+
+    def analyze(self, data: Mapping[str, pd.DataFrame]) -> Dict[str, Any]:
+        """Governance metrics of the DAO, proposal and vote tables in ``data``.
+
+        Datasets of a ``LazyDatasets`` mapping are released once their key
+        columns are coded.
+
+        Returns:
+            ``summary`` totals, ``platform_metrics`` per platform and
+            ``dao_metrics`` per DAO id; empty if there are no vote or
+            proposal tables with DAO keys
+        """
+        tables = self.classify(data)
+        if not tables['proposals'] and not tables['votes']:
+            self.logger.warning(
+                "No proposal or vote tables to compute governance metrics from"
+            )
+            return {}
+
+        daos = KeyIndex()
+        dao_platforms: Dict[int, str] = {}
+        for name in tables['daos']:
+            df = self._table(data, name)
+            id_column, platform_column = find_column(df, ID_COLUMNS), find_column(
+                df, PLATFORM_COLUMNS
+            )
+            if id_column is None:
+                continue
+            codes = daos.add(df[id_column])
+            if platform_column is not None:
+                self._assign_platforms(dao_platforms, codes, df[platform_column])
+
+        proposals = KeyIndex()
+        proposal_dao, proposal_passed = [], []
+        for name in tables['proposals']:
+            df = self._table(data, name)
+            id_column, dao_column = find_column(df, ID_COLUMNS), find_column(
+                df, DAO_COLUMNS
+            )
+            if id_column is None or dao_column is None:
+                self.logger.warning(f"Skipping {name}: no proposal id or DAO column")
+                continue
+            codes = proposals.add(df[id_column])
+            dao_codes = daos.add(df[dao_column])
+            outcome_column = find_column(df, OUTCOME_COLUMNS)
+            platform_column = find_column(df, PLATFORM_COLUMNS)
+            if platform_column is not None:
+                self._assign_platforms(dao_platforms, dao_codes, df[platform_column])
+            proposal_dao.append(self._scatter(codes, dao_codes, len(proposals), -1))
+            proposal_passed.append(
+                self._scatter(
+                    codes,
+                    (
+                        passed(df[outcome_column])
+                        if outcome_column
+                        else np.full(len(df), np.nan)
+                    ),
+                    len(proposals),
+                    np.nan,
+                )
+            )
+        proposal_dao = self._combine(proposal_dao, len(proposals), -1)
+        proposal_passed = self._combine(proposal_passed, len(proposals), np.nan)
+
+        vote_dao, vote_proposal, vote_voter, vote_weight = [], [], [], []
+        voters = KeyIndex()
+        unmatched = 0
+        for name in tables['votes']:
+            df = self._table(data, name)
+            voter_column = find_column(df, VOTER_COLUMNS)
+            proposal_column, dao_column = find_column(
+                df, PROPOSAL_COLUMNS
+            ), find_column(df, DAO_COLUMNS)
+            if voter_column is None or (proposal_column is None and dao_column is None):
+                self.logger.warning(
+                    f"Skipping {name}: no voter, proposal or DAO column"
+                )
+                continue
+            proposal_codes = (proposals.lookup(df[proposal_column]) if proposal_column
+                              else np.full(len(df), -1, dtype=np.int64))
+            dao_codes = join(proposal_codes, proposal_dao)
+            missing = dao_codes < 0
+            if dao_column is not None and missing.any():
+                # Votes on proposals missing from the proposal tables keep their own DAO
+                dao_codes[missing] = daos.add(df[dao_column].to_numpy()[missing])
+            unmatched += int((dao_codes < 0).sum())
+            weight_column = find_column(df, WEIGHT_COLUMNS)
+            weights = (
+                pd.to_numeric(df[weight_column], errors='coerce').to_numpy(
+                    dtype=np.float64
+                )
+                if weight_column
+                else np.ones(len(df))
+            )
+            vote_dao.append(dao_codes)
+            vote_proposal.append(proposal_codes)
+            vote_voter.append(voters.add(df[voter_column]))
+            vote_weight.append(weights)
+
+        if not len(proposals) and not vote_dao:
+            self.logger.warning(
+                "No proposal or vote tables with DAO keys to compute governance "
+                "metrics from"
+            )
+            return {}
+
+        n_daos = len(daos)
+        vote_dao = np.concatenate(vote_dao) if vote_dao else np.empty(0, dtype=np.int64)
+        vote_proposal = (
+            np.concatenate(vote_proposal)
+            if vote_proposal
+            else np.empty(0, dtype=np.int64)
+        )
+        vote_voter = (
+            np.concatenate(vote_voter) if vote_voter else np.empty(0, dtype=np.int64)
+        )
+        vote_weight = np.concatenate(vote_weight) if vote_weight else np.empty(0)
+
+        platforms = KeyIndex()
+        dao_platform = platforms.add(
+            [dao_platforms.get(code, UNKNOWN_PLATFORM) for code in range(n_daos)]
+        )
+
+        # Voting power: a voter's largest vote weight in a DAO, and in a
+        # platform the largest over its DAOs
+        power_dao, power_voter, power = group_member_max(
+            vote_dao, vote_voter, vote_weight
+        )
+        platform_power_group, _, platform_power = group_member_max(
+            join(power_dao, dao_platform), power_voter, power
+        )
+        proposal_voters = group_nunique(vote_proposal, vote_voter, len(proposals))
+
+        dao_metrics = self._metrics(
+            n_daos, proposal_dao, proposal_passed, vote_dao, vote_voter,
+            proposal_voters, power_dao, power
+        )
+        platform_metrics = self._metrics(
+            len(platforms), join(proposal_dao, dao_platform), proposal_passed,
+            join(vote_dao, dao_platform), vote_voter, proposal_voters,
+            platform_power_group, platform_power
+        )
+        platform_metrics['daos'] = group_sizes(dao_platform, len(platforms))
+
+        return {
+            'summary': {
+                'daos': n_daos,
+                'proposals': int((proposal_dao >= 0).sum()),
+                'votes': len(vote_dao),
+                'voters': len(voters),
+                'unmatched_votes': unmatched
+            },
+            'platform_metrics': self._records(platform_metrics, platforms.keys()),
+            'dao_metrics': self._records(dao_metrics, daos.keys())
+        }
+
+    @staticmethod
+    def classify(data: Mapping[str, pd.DataFrame]) -> Dict[str, List[str]]:
+        """Dataset names of the DAO, proposal and vote tables"""
+        tables: Dict[str, List[str]] = {kind: [] for kind, _ in TABLE_WORDS}
+        for name in data:
+            lowered = name.lower()
+            for kind, word in TABLE_WORDS:
+                if word in lowered:
+                    tables[kind].append(name)
+                    break
+        return tables
+
+    def _table(self, data: Mapping[str, pd.DataFrame], name: str) -> pd.DataFrame:
+        df = data[name]
+        if hasattr(data, 'release'):
+            # The caller's reference is enough; codes are all that is kept
+            data.release(name)
+        return df
+
+    @staticmethod
+    def _assign_platforms(
+        platforms: Dict[int, str], dao_codes: np.ndarray, values: pd.Series
+    ) -> None:
+        """Record the first platform seen for each DAO code"""
+        frame = pd.DataFrame({'dao': dao_codes, 'platform': values.to_numpy()})
+        frame = frame[(frame['dao'] >= 0) & frame['platform'].notna()].drop_duplicates(
+            'dao'
+        )
+        for code, platform in zip(frame['dao'], frame['platform']):
+            platforms.setdefault(int(code), str(platform))
+
+    @staticmethod
+    def _scatter(
+        codes: np.ndarray, values: np.ndarray, size: int, missing
+    ) -> np.ndarray:
+        """Per-code array of ``values``, keyed by the row codes"""
+        result = np.full(
+            size,
+            missing,
+            dtype=np.result_type(values.dtype, np.min_scalar_type(missing)),
+        )
+        valid = codes >= 0
+        result[codes[valid]] = values[valid]
+        return result
+
+    @staticmethod
+    def _combine(arrays: List[np.ndarray], size: int, missing) -> np.ndarray:
+        """Merge per-table per-code arrays; later tables fill gaps only"""
+        dtype = np.int64 if isinstance(missing, int) else np.float64
+        result = np.full(size, missing, dtype=dtype)
+        for array in arrays:
+            array = np.pad(array, (0, size - len(array)), constant_values=missing)
+            fill = (result == missing) if isinstance(missing, int) else np.isnan(result)
+            result[fill] = array[fill]
+        return result
+
+    @staticmethod
+    def _metrics(n_groups: int,
+                 proposal_group: np.ndarray,
+                 proposal_passed: np.ndarray,
+                 vote_group: np.ndarray,
+                 vote_voter: np.ndarray,
+                 proposal_voters: np.ndarray,
+                 power_group: np.ndarray,
+                 power: np.ndarray) -> Dict[str, np.ndarray]:
+        """Governance metrics per group (DAO or platform) as arrays"""
+        voters = group_nunique(vote_group, vote_voter, n_groups)
+
+        # Participation: share of the group's voters that voted on each
+        # proposal, averaged over the group's proposals
+        group_voters = join(proposal_group, voters.astype(np.float64), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            participation = np.where(
+                group_voters > 0, proposal_voters / group_voters, np.nan
+            )
+
+        proposals = group_sizes(proposal_group, n_groups)
+        votes = group_sizes(vote_group, n_groups)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            votes_per_proposal = np.where(proposals > 0, votes / proposals, np.nan)
+        return {
+            'proposals': proposals,
+            'votes': votes,
+            'voters': voters,
+            'votes_per_proposal': votes_per_proposal,
+            'pass_rate': group_means(proposal_group, proposal_passed, n_groups),
+            'participation': group_means(proposal_group, participation, n_groups),
+            'voting_power_gini': group_gini(power_group, power, n_groups)
+        }
+
+    @staticmethod
+    def _records(
+        metrics: Dict[str, np.ndarray], keys: np.ndarray
+    ) -> Dict[str, Dict[str, Any]]:
+        """Metric arrays as {key: {metric: value}} with NaN as None"""
+        frame = pd.DataFrame(metrics, index=keys)
+        frame = frame.astype(object).where(frame.notna(), None)
+        return frame.to_dict(orient='index')
@@ -0,0 +1,148 @@
+from typing import Iterable, Optional, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+
+def normalize_keys(values: Iterable) -> pd.Index:
+    """Ids as lowercased strings, so checksummed and plain hex spellings match"""
+    return pd.Index(pd.Series(values, dtype=object).astype(str).str.strip().str.lower())
+
+
+class KeyIndex:
+    """Hash index assigning dense integer codes to the ids of a key column.
+
+    Lookups factorize the probed column first and normalize only its
+    distinct values, so joining millions of rows on string ids costs one
+    hash pass over the rows plus work proportional to the distinct ids.
+    """
+
+    def __init__(self, keys: Iterable = ()):
+        self._index = pd.Index([], dtype=object)
+        self.logger = logging.getLogger(__name__)
+        self.add(keys)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def add(self, keys: Iterable) -> np.ndarray:
+        """Codes of ``keys``, assigning new codes to unseen ones; missing
+        values get -1"""
+        codes, uniques = pd.factorize(pd.Series(keys, dtype=object))
+        if not len(uniques):
+            return np.full(len(codes), -1, dtype=np.int64)
+        normalized = normalize_keys(uniques)
+        unique_codes = self._index.get_indexer(normalized)
+        new = unique_codes == -1
+        if new.any():
+            # Distinct raw ids can normalize to the same key
+            added = pd.unique(np.asarray(normalized[new], dtype=object))
+            self._index = self._index.append(pd.Index(added, dtype=object))
+            unique_codes = self._index.get_indexer(normalized)
+        return self._gather(unique_codes, codes)
+
+    def lookup(self, values: Iterable) -> np.ndarray:
+        """Codes of ``values``; unknown and missing values get -1"""
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+        if not len(uniques):
+            return np.full(len(codes), -1, dtype=np.int64)
+        return self._gather(self._index.get_indexer(normalize_keys(uniques)), codes)
+
+    def keys(self, codes: Optional[np.ndarray] = None) -> np.ndarray:
+        """Ids of the given codes, or every id in code order"""
+        keys = np.asarray(self._index, dtype=object)
+        return keys if codes is None else keys[codes]
+
+    @staticmethod
+    def _gather(unique_codes: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        result = unique_codes.astype(np.int64)[codes]
+        result[codes < 0] = -1
+        return result
+
+
+def join(codes: np.ndarray, column: np.ndarray, missing=-1) -> np.ndarray:
+    """``column`` of the rows ``codes`` point at (a many-to-one join as a
+    gather); rows with code -1 get ``missing``"""
+    valid = codes >= 0
+    result = np.full(
+        len(codes),
+        missing,
+        dtype=np.result_type(column.dtype, np.min_scalar_type(missing)),
+    )
+    result[valid] = column[codes[valid]]
+    return result
+
+
+def group_sizes(groups: np.ndarray, n_groups: int) -> np.ndarray:
+    """Rows per group code, ignoring -1"""
+    return np.bincount(groups[groups >= 0], minlength=n_groups)
+
+
+def group_sums(groups: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """Sum of ``values`` per group code, ignoring -1"""
+    valid = groups >= 0
+    return np.bincount(groups[valid], weights=values[valid], minlength=n_groups)
+
+
+def group_means(groups: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """Mean of the non-NaN ``values`` per group code, NaN for empty groups"""
+    present = ~np.isnan(values)
+    sums = group_sums(groups[present], values[present], n_groups)
+    counts = group_sizes(groups[present], n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def _pairs(groups: np.ndarray, members: np.ndarray) -> Tuple[np.ndarray, int]:
+    """One int64 key per valid (group, member) row and the member count"""
+    valid = (groups >= 0) & (members >= 0)
+    width = int(members.max()) + 1 if valid.any() else 1
+    return groups[valid].astype(np.int64) * width + members[valid], width
+
+
+def group_nunique(groups: np.ndarray, members: np.ndarray, n_groups: int) -> np.ndarray:
+    """Distinct member codes per group code"""
+    keys, width = _pairs(groups, members)
+    return np.bincount(np.unique(keys) // width, minlength=n_groups)
+
+
+def group_member_max(groups: np.ndarray, members: np.ndarray,
+                     values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Largest value of every distinct (group, member) pair.
+
+    Returns:
+        Group code, member code and maximum value of each pair
+    """
+    valid = (groups >= 0) & (members >= 0)
+    keys, width = _pairs(groups, members)
+    values = values[valid]
+    if not len(keys):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    order = np.argsort(keys)
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    keys = keys[starts]
+    return keys // width, keys % width, np.maximum.reduceat(values[order], starts)
+
+
+def group_gini(groups: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """Gini coefficient of the non-negative ``values`` within each group.
+
+    0 when every member holds the same amount, approaching 1 when one
+    member holds everything; NaN for groups without a positive total.
+    """
+    valid = (groups >= 0) & ~np.isnan(values)
+    groups, values = groups[valid], values[valid]
+    # Sort by value, then stably by group: faster than lexsort on floats
+    order = np.argsort(values)
+    order = order[np.argsort(groups[order], kind='stable')]
+    groups, values = groups[order], values[order]
+    sizes = np.bincount(groups, minlength=n_groups)
+    starts = np.cumsum(sizes) - sizes
+    ranks = np.arange(len(groups)) - starts[groups] + 1
+    totals = np.bincount(groups, weights=values, minlength=n_groups)
+    weighted = np.bincount(groups, weights=ranks * values, minlength=n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gini = 2 * weighted / (sizes * totals) - (sizes + 1) / sizes
+    return np.where(totals > 0, gini, np.nan)
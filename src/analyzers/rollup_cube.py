@@ -0,0 +1,145 @@
+from typing import Dict, Any, List, Mapping, Optional, Tuple, Union
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.processors.stream_accumulators import DailyCounts, rollup
+
+# Grains of the cube, finest first, and the grain each one is summed from
+GRAINS = {'D': None, 'W': 'D', 'M': 'D', 'Q': 'M'}
+FREQ_ALIASES = {
+    'daily': 'D', 'day': 'D',
+    'weekly': 'W', 'week': 'W',
+    'monthly': 'M', 'month': 'M',
+    'quarterly': 'Q', 'quarter': 'Q'
+}
+TOTAL = 'total'
+
+DateLike = Union[str, pd.Timestamp, pd.Period, None]
+
+
+class RollupCube:
+    """Record counts per dataset at daily, weekly, monthly and quarterly
+    grains, in total and split by network, platform and platform_network.
+
+    Built once from the processors' daily counts; every coarser grain is
+    the sum of a finer one, so raw data is never read again. Each grain
+    stores one dense (keys x periods) array per dimension.
+    """
+
+    def __init__(self):
+        # dataset -> freq -> (periods, dimension -> (keys, counts))
+        self.grains: Dict[
+            str,
+            Dict[str, Tuple[pd.PeriodIndex, Dict[str, Tuple[List[str], np.ndarray]]]],
+        ] = {}
+        self.logger = logging.getLogger(__name__)
+
+    def __contains__(self, dataset: str) -> bool:
+        return dataset in self.grains
+
+    def datasets(self) -> List[str]:
+        return list(self.grains)
+
+    def dimensions(self, dataset: str) -> List[str]:
+        """Dimensions ``query`` accepts as ``by`` for a dataset"""
+        _, arrays = self.grains[dataset]['D']
+        return [dimension for dimension in arrays if dimension != TOTAL]
+
+    def add(self, dataset: str, daily: DailyCounts) -> None:
+        """Add a dataset from its daily counts, rolling up every grain"""
+        if daily.origin is None:
+            return
+        arrays = {TOTAL: (['count'], daily.total[np.newaxis, :])}
+        for dimension, values in daily.groups.items():
+            if not values:
+                continue
+            keys = sorted(values)
+            arrays[dimension] = (keys, np.vstack([values[key] for key in keys]))
+
+        grains = {'D': (daily.periods(), arrays)}
+        for freq, source in GRAINS.items():
+            if source is None:
+                continue
+            periods, source_arrays = grains[source]
+            rolled = {}
+            for dimension, (keys, counts) in source_arrays.items():
+                coarse, rolled_counts = rollup(periods, counts, freq)
+                rolled[dimension] = (keys, rolled_counts)
+            grains[freq] = (coarse, rolled)
+        self.grains[dataset] = grains
+
+    @classmethod
+    def from_processed(cls, data: Mapping[str, Dict[str, Any]]) -> 'RollupCube':
+        """Build a cube from ``DAODataProcessor`` results with daily counts"""
+        cube = cls()
+        for dataset, result in data.items():
+            daily = result.get('time_series', {}).get('daily_counts')
+            if daily is None:
+                continue
+            try:
+                cube.add(dataset, DailyCounts.from_dict(daily))
+            except Exception as e:
+                cube.logger.error(f"Error adding {dataset} to rollup cube: {str(e)}")
+        return cube
+
+    def query(self,
+              dataset: str,
+              freq: str = 'M',
+              by: Optional[str] = None,
+              start: DateLike = None,
+              end: DateLike = None) -> pd.DataFrame:
+        """Counts of a dataset per period.
+
+        Args:
+            dataset: Dataset name
+            freq: 'D', 'W', 'M' or 'Q' (or daily, weekly, monthly, quarterly)
+            by: None for a single ``count`` column, or 'network', 'platform'
+                or 'platform_network' for one column per value
+            start: First period to include (any date within it)
+            end: Last period to include (any date within it)
+
+        Returns:
+            DataFrame indexed by period start, empty periods included
+        """
+        freq = FREQ_ALIASES.get(freq, freq)
+        if freq not in GRAINS:
+            raise ValueError(
+                f"Unknown frequency {freq}; expected one of {list(GRAINS)}"
+            )
+        if dataset not in self.grains:
+            raise KeyError(f"No time series for dataset {dataset}")
+        periods, arrays = self.grains[dataset][freq]
+        dimension = TOTAL if by is None else by
+        if dimension not in arrays:
+            raise KeyError(f"Dataset {dataset} cannot be split by {by}")
+        keys, counts = arrays[dimension]
+
+        ordinals = periods.asi8
+        lo = (
+            0
+            if start is None
+            else np.searchsorted(ordinals, pd.Period(start, freq).ordinal, 'left')
+        )
+        hi = (
+            len(ordinals)
+            if end is None
+            else np.searchsorted(ordinals, pd.Period(end, freq).ordinal, 'right')
+        )
+        return pd.DataFrame(
+            counts[:, lo:hi].T,
+            index=periods[lo:hi].to_timestamp(),
+            columns=keys
+        )
+
+    def counts(
+        self, dataset: str, freq: str = 'M'
+    ) -> Tuple[pd.PeriodIndex, np.ndarray]:
+        """Periods and total counts of a dataset as arrays, without a frame"""
+        periods, arrays = self.grains[dataset][FREQ_ALIASES.get(freq, freq)]
+        return periods, arrays[TOTAL][1][0]
+
+    def total(self, dataset: str, freq: str = 'M', **kwargs) -> pd.Series:
+        """Total counts per period as a Series (see ``query``)"""
+        return self.query(dataset, freq, **kwargs)['count']
@@ -1,12 +1,56 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from collections.abc import Mapping as MappingABC
+from typing import Dict, Any, Mapping, Optional
+import functools
 import pandas as pd
 
-class DatasetProvider(ABC):
+from src.core.instrumentation import instrumentation, _describe_args
+
+
+def _timed(method, category: str):
+    """Wrap ``method`` in an instrumentation span named after its qualname"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not instrumentation.enabled:
+            return method(self, *args, **kwargs)
+        with instrumentation.span(
+            method.__qualname__, category, **_describe_args(args)
+        ) as span:
+            result = method(self, *args, **kwargs)
+            if isinstance(result, MappingABC):
+                span.set(results=len(result))
+            return result
+    wrapper._instrumented = True
+    return wrapper
+
+
+class _Instrumented:
+    """Times the methods named in ``_instrumented_methods`` of every subclass.
+
+    Overrides are wrapped when the subclass is defined, so custom
+    providers, processors and analyzers are instrumented without opting in.
+    """
+    _instrumented_methods = ()
+    _instrumented_category = 'pipeline'
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in cls._instrumented_methods:
+            method = cls.__dict__.get(name)
+            if (method is None or getattr(method, '__isabstractmethod__', False)
+                    or getattr(method, '_instrumented', False)):
+                continue
+            setattr(cls, name, _timed(method, cls._instrumented_category))
+
+
+class DatasetProvider(_Instrumented, ABC):
     """Abstract base class for dataset providers"""
+    _instrumented_methods = ('get_datasets', 'get_version_info', 'load_dataset')
+    _instrumented_category = 'provider'
+
     @abstractmethod
-    def get_datasets(self) -> Dict[str, pd.DataFrame]:
-        """Retrieve all datasets from the provider"""
+    def get_datasets(self) -> Mapping[str, pd.DataFrame]:
+        """Retrieve all datasets from the provider, possibly loaded lazily"""
         pass
 
     @abstractmethod
@@ -14,23 +58,32 @@ class DatasetProvider(ABC):
         """Get version information about the datasets"""
         pass
 
-class DataProcessor(ABC):
+class DataProcessor(_Instrumented, ABC):
     """Abstract base class for data processors"""
+    _instrumented_methods = ('process', 'process_stream', 'process_path')
+    _instrumented_category = 'processor'
+
     @abstractmethod
     def process(self, df: pd.DataFrame, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Process a dataset and return results"""
         pass
 
-class Analyzer(ABC):
+class Analyzer(_Instrumented, ABC):
     """Abstract base class for data analyzers"""
+    _instrumented_methods = ('analyze',)
+    _instrumented_category = 'analyzer'
+
     @abstractmethod
     def analyze(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze processed data and return results"""
         pass
 
-class Visualizer(ABC):
+class Visualizer(_Instrumented, ABC):
     """Abstract base class for data visualizers"""
+    _instrumented_methods = ('visualize',)
+    _instrumented_category = 'visualizer'
+
     @abstractmethod
     def visualize(self, data: Dict[str, Any]) -> Any:
         """Create visualization from analyzed data"""
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,311 @@
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Union
+import logging
+
+
+class Span:
+    """One timed pipeline stage"""
+
+    __slots__ = ('name', 'category', 'args', 'start', 'duration', 'pid', 'tid',
+                 '_traced_start', '_child_peak')
+
+    def __init__(self, name: str, category: str, args: Dict[str, Any]):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+        self.duration = 0.0
+        self.pid = os.getpid()
+        self.tid = threading.get_ident()
+        self._traced_start = 0
+        self._child_peak = 0
+
+    def set(self, **args) -> None:
+        """Attach extra values, e.g. row counts or bytes read"""
+        self.args.update(args)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'category': self.category,
+            'start': self.start,
+            'duration': self.duration,
+            'pid': self.pid,
+            'tid': self.tid,
+            'args': self.args
+        }
+
+
+class _NullSpan:
+    """Stand-in returned while instrumentation is disabled"""
+
+    def set(self, **args) -> None:
+        pass
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _current_rss() -> Optional[int]:
+    """Resident set size in bytes (Linux), falling back to the peak RSS"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return _peak_rss()
+
+
+def _peak_rss() -> Optional[int]:
+    """Peak resident set size in bytes, None where it is unavailable"""
+    try:
+        import resource
+    except ImportError:
+        # No resource module on Windows; psutil has the peak working set
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+class Instrumentation:
+    """Collects timing spans around pipeline stages.
+
+    Disabled by default; while disabled ``span`` returns a shared no-op
+    object so the hooks in the base classes cost one attribute check.
+    When enabled every span records wall time, RSS before/after and peak
+    RSS, plus tracemalloc deltas if ``trace_memory`` is on. One stage can
+    be profiled with cProfile by name.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self.profile_stage: Optional[str] = None
+        self._profiler: Optional[cProfile.Profile] = None
+        self._profiling = False
+        self.spans: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.logger = logging.getLogger(__name__)
+
+    def enable(
+        self, trace_memory: bool = False, profile_stage: Optional[str] = None
+    ) -> None:
+        """Start collecting spans"""
+        self.enabled = True
+        self.trace_memory = trace_memory
+        self.profile_stage = profile_stage
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self) -> None:
+        """Stop collecting spans (collected ones are kept)"""
+        self.enabled = False
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans = []
+        self._profiler = None
+        self._origin = time.perf_counter()
+
+    def span(self, name: str, category: str = 'pipeline', **args):
+        """Context manager timing one stage; ``args`` are stored with it"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, category, args)
+
+    @contextmanager
+    def _span(self, name: str, category: str, args: Dict[str, Any]) -> Iterator[Span]:
+        span = Span(name, category, args)
+        stack = self._stack()
+        if self.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]._child_peak = max(stack[-1]._child_peak, peak)
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            span._traced_start = current
+        rss_before = _current_rss()
+
+        # Every call of the chosen stage feeds one profile; nested or
+        # concurrent calls are skipped since only one profiler can run
+        profiling = name == self.profile_stage and not self._profiling
+        if profiling:
+            self._profiling = True
+            if self._profiler is None:
+                self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+        stack.append(span)
+        span.start = time.perf_counter()
+        try:
+            yield span
+        except Exception as e:
+            span.args['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration = time.perf_counter() - span.start
+            span.start -= self._origin
+            stack.pop()
+
+            if profiling:
+                self._profiler.disable()
+                self._profiling = False
+
+            span.args['rss_before'] = rss_before
+            span.args['rss_after'] = _current_rss()
+            span.args['peak_rss'] = _peak_rss()
+            if self.trace_memory and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                peak = max(peak, span._child_peak)
+                span.args['traced_delta'] = current - span._traced_start
+                span.args['traced_peak'] = peak - span._traced_start
+                if stack:
+                    stack[-1]._child_peak = max(stack[-1]._child_peak, peak)
+
+            with self._lock:
+                self.spans.append(span.to_dict())
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Remove and return the collected spans (used to ship them from workers)"""
+        with self._lock:
+            spans, self.spans = self.spans, []
+        return spans
+
+    def extend(self, spans: List[Dict[str, Any]]) -> None:
+        """Add spans collected elsewhere, e.g. in a worker process"""
+        with self._lock:
+            self.spans.extend(spans)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Total time and call count per span name"""
+        totals: Dict[str, Dict[str, float]] = {}
+        for span in self.spans:
+            total = totals.setdefault(span['name'], {'calls': 0, 'seconds': 0.0})
+            total['calls'] += 1
+            total['seconds'] += span['duration']
+        return totals
+
+    def profile_report(self, limit: int = 30) -> Optional[str]:
+        """cProfile statistics of the profiled stage, by cumulative time"""
+        if self._profiler is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(self._profiler, stream=out).sort_stats('cumulative').print_stats(
+            limit
+        )
+        return out.getvalue()
+
+    def export_json(self, path: Union[str, Path]) -> None:
+        """Write spans, per-stage totals and cProfile output as JSON"""
+        with open(path, 'w') as f:
+            json.dump({
+                'spans': self.spans,
+                'summary': self.summary(),
+                'profile_stage': self.profile_stage,
+                'profile': self.profile_report()
+            }, f, indent=2, default=str)
+
+    def export_chrome_trace(self, path: Union[str, Path]) -> None:
+        """Write spans in Chrome trace format (chrome://tracing, Perfetto)"""
+        events = [
+            {
+                'name': span['name'],
+                'cat': span['category'],
+                'ph': 'X',
+                'ts': span['start'] * 1e6,
+                'dur': span['duration'] * 1e6,
+                'pid': span['pid'],
+                'tid': span['tid'],
+                'args': span['args']
+            }
+            for span in self.spans
+        ]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+
+    def export(self, path: Union[str, Path], fmt: str = 'json') -> None:
+        """Export as 'json' or 'chrome' trace; the cProfile report of a
+        Chrome trace export goes next to it as ``<path>.prof.txt``"""
+        if fmt == 'chrome':
+            self.export_chrome_trace(path)
+            report = self.profile_report()
+            if report:
+                Path(f"{path}.prof.txt").write_text(report)
+        elif fmt == 'json':
+            self.export_json(path)
+        else:
+            raise ValueError(f"Unknown trace format: {fmt}")
+        self.logger.info(f"Wrote {len(self.spans)} spans to {path}")
+
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+
+instrumentation = Instrumentation()
+
+
+def traced(name: Optional[str] = None, category: str = 'stage'):
+    """Decorator timing a method or function as a span.
+
+    Rows are taken from a DataFrame argument and the dataset name from a
+    metadata dict with a ``name`` key, when present.
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not instrumentation.enabled:
+                return func(*args, **kwargs)
+            with instrumentation.span(span_name, category, **_describe_args(args)):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _describe_args(args: tuple) -> Dict[str, Any]:
+    """Row count, dataset name and file size from a stage's positional
+    arguments, e.g. ``(df, {'name': ...})`` or ``(name, path)``"""
+    described: Dict[str, Any] = {}
+    for position, arg in enumerate(args):
+        if (
+            hasattr(arg, 'shape')
+            and hasattr(arg, 'columns')
+            and 'rows' not in described
+        ):
+            described['rows'] = int(arg.shape[0])
+        elif isinstance(arg, dict) and isinstance(arg.get('name'), str):
+            described['dataset'] = arg['name']
+        elif isinstance(arg, str) and position == 0:
+            described['dataset'] = arg
+        elif isinstance(arg, Path) and arg.is_file():
+            described['bytes_read'] = arg.stat().st_size
+    return described
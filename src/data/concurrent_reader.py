@@ -0,0 +1,89 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Mapping, Tuple
+
+import pandas as pd
+
+# Default cap on the bytes of CSV files being parsed at the same time
+DEFAULT_INFLIGHT_BYTES = 1 << 30
+
+
+class ByteBudget:
+    """Blocks readers while the bytes in flight would exceed a budget.
+
+    A single reservation larger than the budget is admitted once nothing
+    else is in flight, so oversized files are read alone instead of never.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self, nbytes: int) -> None:
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.in_flight == 0 or self.in_flight + nbytes <= self.max_bytes
+            )
+            self.in_flight += nbytes
+
+    def release(self, nbytes: int) -> None:
+        with self._condition:
+            self.in_flight -= nbytes
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserve(self, nbytes: int) -> Iterator[None]:
+        self.acquire(nbytes)
+        try:
+            yield
+        finally:
+            self.release(nbytes)
+
+
+def read_concurrently(paths: Mapping[str, Path],
+                      loader: Callable[[str, Path], pd.DataFrame],
+                      sizes: Mapping[str, int],
+                      max_workers: int,
+                      max_bytes: int) -> Iterator[Tuple[str, Future]]:
+    """Load datasets on a thread pool, yielding ``(name, future)`` as they
+    finish.
+
+    Files are submitted in ``paths`` order, at most ``max_workers`` at a
+    time. A file's ``sizes`` bytes count against ``max_bytes`` from the
+    start of its read until the consumer asks for the next file, so
+    frames waiting to be consumed are bounded as well as reads in flight.
+    The futures are done; ``result()`` raises the loader's error.
+    """
+    budget = ByteBudget(max_bytes)
+    held: Dict[str, bool] = {}
+
+    def read(name: str) -> pd.DataFrame:
+        budget.acquire(sizes[name])
+        held[name] = True
+        try:
+            return loader(name, paths[name])
+        except Exception:
+            held[name] = False
+            budget.release(sizes[name])
+            raise
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(read, name): name for name in paths}
+        try:
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    yield name, future
+                finally:
+                    if held.pop(name, False):
+                        budget.release(sizes[name])
+        finally:
+            # A consumer that stops early must not leave readers blocked
+            for future in futures:
+                future.cancel()
+            for name in [name for name, holding in held.items() if holding]:
+                held.pop(name)
+                budget.release(sizes[name])
@@ -1,17 +1,28 @@
 import os
 import shutil
+import time
 import zipfile
-import kagglehub
 import pandas as pd
-from typing import Dict, Optional, List
+from typing import Dict, Any, Iterable, Iterator, Mapping, Optional, List, Tuple, Union
 from pathlib import Path
 import logging
 
+from src.core.instrumentation import instrumentation
+from src.data.concurrent_reader import (  # noqa: F401
+    DEFAULT_INFLIGHT_BYTES, ByteBudget, read_concurrently
+)
+from src.data.lazy_datasets import CSV_MEMORY_FACTOR, LazyDatasets
+from src.data.schema import CSVSource, DatasetSchema, format_memory_report
+from src.data.zip_source import ZipDatasetSource
+
 class DataLoader:
     def __init__(self, 
                  kaggle_dataset: str = "daviddavo/dao-analyzer", 
                  local_path: Optional[str] = None,
-                 data_dir: str = "data"):
+                 data_dir: str = "data",
+                 engine: str = 'pyarrow',
+                 max_workers: int = 4,
+                 max_inflight_bytes: int = DEFAULT_INFLIGHT_BYTES):
         """
         Initialize DataLoader with Kaggle dataset information.
         
@@ -19,12 +30,23 @@ class DataLoader:
             kaggle_dataset: Kaggle dataset path in format "username/dataset-name"
             local_path: Optional local path to use instead of downloading
             data_dir: Directory where data will be stored/extracted
+            engine: CSV parser, 'pyarrow' (multithreaded, falls back to the
+                C engine on files it cannot parse) or 'c'
+            max_workers: Files read at once by ``load_concurrently``
+            max_inflight_bytes: Cap on the on-disk bytes of files being
+                read at once by ``load_concurrently``
         """
         self.kaggle_dataset = kaggle_dataset
         self.local_path = local_path
         self.data_dir = data_dir
+        self.engine = engine
+        self.max_workers = max_workers
+        self.max_inflight_bytes = max_inflight_bytes
         self.logger = logging.getLogger(__name__)
         self.data_paths = {}
+        self.zip_sources: Dict[str, ZipDatasetSource] = {}
+        self.memory_reports: Dict[str, Dict[str, int]] = {}
+        self.throughput: Dict[str, Dict[str, Any]] = {}
 
     def extract_zip(self, zip_path: str, extract_path: str) -> None:
         """Extract zip file to specified path."""
@@ -37,7 +59,11 @@ class DataLoader:
             raise
 
     def setup_data_directory(self) -> str:
-        """Set up and return path to data directory."""
+        """Set up and return the path to the data directory or downloaded zip.
+
+        A zip download is returned as is; its CSVs are read from the archive
+        and only extracted on request with ``extract_members``.
+        """
         try:
             # If local path is specified and exists, use it
             if self.local_path and os.path.exists(self.local_path):
@@ -49,34 +75,45 @@ class DataLoader:
 
             # Download dataset from Kaggle
             self.logger.info("Downloading dataset from Kaggle...")
-            downloaded_path = kagglehub.dataset_download(self.kaggle_dataset)
-            
-            # Check if downloaded_path is a zip file
-            if os.path.isfile(downloaded_path) and downloaded_path.endswith('.zip'):
-                extract_dir = os.path.join(self.data_dir, 'extracted')
-                self.extract_zip(downloaded_path, extract_dir)
-                
-                # Find the main data directory in the extracted contents
-                extracted_contents = os.listdir(extract_dir)
-                if extracted_contents:
-                    # Use the first directory as the main data directory
-                    data_path = os.path.join(extract_dir, extracted_contents[0])
-                    self.logger.info(f"Using extracted data path: {data_path}")
-                    return data_path
-            else:
-                # If it's already a directory, use it directly
-                self.logger.info(f"Using downloaded data path: {downloaded_path}")
-                return downloaded_path
+            # Imported here so local runs don't pay for importing kagglehub
+            import kagglehub
+            with instrumentation.span('kagglehub.dataset_download', 'io',
+                                      dataset=self.kaggle_dataset):
+                downloaded_path = kagglehub.dataset_download(self.kaggle_dataset)
+
+            # A zip file is read in place, a directory used directly
+            self.logger.info(f"Using downloaded data path: {downloaded_path}")
+            return downloaded_path
 
         except Exception as e:
             self.logger.error(f"Error setting up data directory: {str(e)}")
             raise
 
+    def is_zip(self, path: Union[str, Path]) -> bool:
+        return os.path.isfile(path) and str(path).endswith('.zip')
+
+    def zip_source(self, zip_path: Union[str, Path]) -> ZipDatasetSource:
+        """The (cached) reader over a zip archive's CSV members"""
+        key = str(zip_path)
+        if key not in self.zip_sources:
+            self.zip_sources[key] = ZipDatasetSource(zip_path)
+        return self.zip_sources[key]
+
     def find_csv_files(self, directory: str) -> Dict[str, str]:
-        """Recursively find all CSV files in the directory and subdirectories."""
+        """Recursively find all CSV files in the directory and subdirectories.
+
+        For a zip archive, the CSV members are listed from its central
+        directory under the names the extracted files would get, all
+        mapped to the archive path.
+        """
         if directory in self.data_paths:
             return self.data_paths[directory]
 
+        if self.is_zip(directory):
+            members = self.zip_source(directory).csv_members()
+            self.data_paths[directory] = {name: directory for name in members}
+            return self.data_paths[directory]
+
         csv_files = {}
         try:
             for root, _, files in os.walk(directory):
@@ -95,35 +132,190 @@ class DataLoader:
             self.logger.error(f"Error scanning directory {directory}: {str(e)}")
             raise
 
-    def load_csv(self, filepath: str) -> pd.DataFrame:
-        """Load a CSV file and return as DataFrame."""
+    def load_csv(
+        self, filepath: str, dataset_name: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Load a CSV file and return as DataFrame.
+
+        Columns and dtypes follow the dataset's schema from DATASET_CONFIGS,
+        and the memory saved against a default read is logged and recorded
+        in ``memory_reports``.
+        """
+        name = dataset_name or Path(filepath).stem
+        return self._load(
+            filepath, Path(filepath).stem, name, os.path.getsize(filepath)
+        )
+
+    def load_zip_member(self, zip_path: Union[str, Path], name: str) -> pd.DataFrame:
+        """Load a dataset streamed from its zip member, like ``load_csv``"""
+        source = self.zip_source(zip_path)
+        member = source.csv_members()[name]
+        return self._load(
+            source.opener(name), Path(member).stem, name, source.file_size(name),
+            label=f"{zip_path}:{member}"
+        )
+
+    def _load(self, source: CSVSource, stem: str, name: str, size: int,
+              label: Optional[str] = None) -> pd.DataFrame:
+        label = label or str(source)
         try:
-            df = pd.read_csv(filepath, header=0)
-            self.logger.debug(f"Successfully loaded {filepath}")
+            schema = DatasetSchema.for_dataset(stem)
+            start = time.perf_counter()
+            with instrumentation.span(
+                'read_csv', 'io', dataset=name, bytes_read=size
+            ) as span:
+                df, report, engine = self._read(schema, source, label)
+                span.set(rows=len(df), engine=engine)
+            self._record_throughput(name, size, time.perf_counter() - start, engine)
+            self.memory_reports[name] = report
+            self.logger.debug(f"Successfully loaded {label}")
+            self.logger.info(format_memory_report(name, report))
             return df
         except Exception as e:
-            self.logger.error(f"Error loading {filepath}: {str(e)}")
+            self.logger.error(f"Error loading {label}: {str(e)}")
             raise
 
-    def get_available_datasets(self) -> Dict[str, pd.DataFrame]:
-        """Load all available CSV files and return them as a dictionary of DataFrames."""
+    def _read(self, schema: DatasetSchema, source: CSVSource,
+              label: str) -> Tuple[pd.DataFrame, Dict[str, int], str]:
+        """Read with the configured engine; returns the engine actually used"""
+        if self.engine == 'pyarrow':
+            try:
+                df, report = schema.read_csv(source, header=0, engine='pyarrow')
+                return df, report, 'pyarrow'
+            except Exception as e:
+                self.logger.warning(
+                    f"pyarrow could not parse {label}, falling back to the C engine: "
+                    f"{str(e)}"
+                )
+        df, report = schema.read_csv(source, header=0, engine='c')
+        return df, report, 'c'
+
+    def _record_throughput(
+        self, name: str, size: int, seconds: float, engine: str
+    ) -> None:
+        mb_per_s = size / 1e6 / seconds if seconds > 0 else float('inf')
+        self.throughput[name] = {
+            'bytes': size,
+            'seconds': seconds,
+            'mb_per_s': mb_per_s,
+            'engine': engine
+        }
+        self.logger.info(
+            f"Read {name}: {size / 1e6:.1f} MB in {seconds:.2f}s "
+            f"({mb_per_s:.1f} MB/s, {engine} engine)"
+        )
+
+    def load_concurrently(
+        self, paths: Optional[Mapping[str, str]] = None
+    ) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """Read several CSV files at once on a bounded thread pool.
+
+        Yields ``(name, DataFrame)`` as files finish, largest files first
+        in the queue. At most ``max_workers`` files are parsed at a time and
+        their combined size stays within ``max_inflight_bytes``. Files that
+        fail to load are logged and skipped.
+
+        Args:
+            paths: Dataset name to CSV path; defaults to every CSV found
+                in the data directory
+        """
+        if paths is None:
+            paths = self.find_csv_files(self.setup_data_directory())
+        sizes = {name: self.file_size(name, paths[name]) for name in paths}
+        ordered = {
+            name: paths[name] for name in sorted(paths, key=sizes.get, reverse=True)
+        }
+
+        start = time.perf_counter()
+        for name, future in read_concurrently(
+            ordered, self.load_dataset, sizes, self.max_workers, self.max_inflight_bytes
+        ):
+            try:
+                df = future.result()
+            except Exception as e:
+                self.logger.error(f"Skipping {name}: {str(e)}")
+                continue
+            yield name, df
+
+        elapsed = time.perf_counter() - start
+        total = sum(sizes.values())
+        self.logger.info(
+            f"Read {len(paths)} files, {total / 1e6:.1f} MB in {elapsed:.2f}s "
+            f"({total / 1e6 / elapsed if elapsed > 0 else 0:.1f} MB/s overall)"
+        )
+
+    def load_all_datasets(
+        self, paths: Optional[Mapping[str, str]] = None
+    ) -> Dict[str, pd.DataFrame]:
+        """Eagerly load every dataset with ``load_concurrently``, in path order"""
+        if paths is None:
+            paths = self.find_csv_files(self.setup_data_directory())
+        frames = dict(self.load_concurrently(paths))
+        return {name: frames[name] for name in paths if name in frames}
+
+    def get_available_datasets(self) -> LazyDatasets:
+        """Map all available CSV files to DataFrames that are loaded on first access."""
         # Set up data directory and get path
         data_path = self.setup_data_directory()
-        
+
         # Find all CSV files
         csv_files = self.find_csv_files(data_path)
-        
-        # Load each CSV file
-        datasets = {}
-        for name, path in csv_files.items():
-            try:
-                datasets[name] = self.load_csv(path)
-                self.logger.info(f"Successfully loaded dataset: {name}")
-            except Exception as e:
-                self.logger.warning(f"Skipping {name} due to error: {str(e)}")
-                continue
-                
-        return datasets
+        self.logger.info(f"Found {len(csv_files)} datasets in {data_path}")
+
+        return LazyDatasets(csv_files, self.load_dataset, self.estimate_bytes)
+
+    def load_dataset(self, name: str, path: Path) -> pd.DataFrame:
+        """Load a dataset by friendly name and path (the LazyDatasets loader)."""
+        if self.is_zip(path):
+            return self.load_zip_member(path, name)
+        return self.load_csv(str(path), name)
+
+    def file_size(self, name: str, path: Union[str, Path]) -> int:
+        """Uncompressed bytes of a dataset's CSV, on disk or in a zip"""
+        if self.is_zip(path):
+            return self.zip_source(path).file_size(name)
+        return os.path.getsize(path)
+
+    def estimate_bytes(self, name: str, path: Path) -> int:
+        """In-memory estimate of a dataset (the LazyDatasets size estimator).
+
+        Extrapolated from the schema applied to the file's first rows,
+        or the file size times CSV_MEMORY_FACTOR if that fails.
+        """
+        size = self.file_size(name, path)
+        if self.is_zip(path):
+            source = self.zip_source(path)
+            stem, opener = Path(source.csv_members()[name]).stem, source.opener(name)
+        else:
+            stem, opener = Path(path).stem, str(path)
+        try:
+            return DatasetSchema.for_dataset(stem).estimate_bytes(opener, size)
+        except Exception as e:
+            self.logger.debug(f"Schema estimate failed for {name}: {e}")
+            return int(size * CSV_MEMORY_FACTOR)
+
+    def extract_members(self, names: Iterable[str],
+                        zip_path: Optional[str] = None) -> Dict[str, str]:
+        """Extract only the named datasets from the downloaded zip.
+
+        Files land under ``<data_dir>/extracted`` with their archive paths,
+        for tools that need the CSVs on disk.
+
+        Returns:
+            Dataset name to extracted CSV path
+        """
+        zip_path = zip_path or self.setup_data_directory()
+        if not self.is_zip(zip_path):
+            raise ValueError(f"{zip_path} is not a zip archive")
+        try:
+            extracted = self.zip_source(zip_path).extract(
+                names, os.path.join(self.data_dir, 'extracted')
+            )
+        except Exception as e:
+            self.logger.error(f"Error extracting from {zip_path}: {str(e)}")
+            raise
+        return {name: str(path) for name, path in extracted.items()}
 
     def cleanup_downloaded_data(self):
         """Clean up downloaded and extracted data."""
@@ -132,4 +324,4 @@ class DataLoader:
                 shutil.rmtree(self.data_dir)
                 self.logger.info(f"Cleaned up {self.data_dir}")
         except Exception as e:
-            self.logger.error(f"Error cleaning up data directory: {str(e)}")
\ No newline at end of file
+            self.logger.error(f"Error cleaning up data directory: {str(e)}")
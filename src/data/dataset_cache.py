@@ -0,0 +1,268 @@
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Any, Optional
+import logging
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+
+class DatasetCache:
+    """Versioned columnar cache for CSV datasets.
+
+    Each CSV is converted once to Parquet or Arrow IPC (feather) under
+    ``cache_dir/<version>/`` and later loads are served from the columnar
+    file. Derived artifacts (e.g. an address index) can be stored next to
+    them with ``artifact_path`` and ``record_artifact``. Old versions are
+    evicted, artifacts included, least-recently-used first whenever the
+    cache grows beyond ``max_bytes``. Datasets may be loaded from several
+    threads at once; manifest updates are serialized.
+    """
+
+    FORMATS = {'parquet': '.parquet', 'feather': '.arrow'}
+    MANIFEST_FILE = 'cache_manifest.json'
+
+    def __init__(self,
+                 cache_dir: Path,
+                 fmt: str = 'parquet',
+                 max_bytes: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding one sub-directory per dataset version
+            fmt: Columnar format, either 'parquet' or 'feather' (Arrow IPC)
+            max_bytes: Disk budget for all cached versions, None for unlimited
+        """
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unsupported cache format: {fmt}")
+        self.cache_dir = Path(cache_dir)
+        self.fmt = fmt
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(__name__)
+        self._manifest = None
+        self._lock = threading.RLock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks cannot be pickled; worker processes get their own
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def load(self,
+             version: str,
+             name: str,
+             csv_path: Path,
+             reader: Optional[Callable[[Path], pd.DataFrame]] = None,
+             tag: str = '') -> pd.DataFrame:
+        """Return the dataset from the cache, converting the CSV on a miss.
+
+        ``reader`` parses the CSV on a miss (``pd.read_csv`` by default) and
+        ``tag`` identifies its options, so changing them invalidates the entry.
+        """
+        cached = self.get(version, name, csv_path, tag)
+        if cached is not None:
+            return cached
+
+        df = reader(csv_path) if reader is not None else pd.read_csv(csv_path)
+        try:
+            self.put(version, name, csv_path, df, tag)
+        except Exception as e:
+            self.logger.warning(f"Could not cache {name} for version {version}: {e}")
+        return df
+
+    def get(
+        self, version: str, name: str, csv_path: Path, tag: str = ''
+    ) -> Optional[pd.DataFrame]:
+        """Read a cached dataset, or return None if it is missing or stale."""
+        entry = self._entry(version, name)
+        if entry is None or not self._matches_source(entry, csv_path):
+            return None
+        if entry.get('tag', '') != tag:
+            return None
+
+        path = self._version_dir(version) / entry['file']
+        if not path.exists():
+            return None
+
+        try:
+            if entry['format'] == 'feather':
+                table = feather.read_table(str(path), memory_map=True)
+            else:
+                table = pq.read_table(str(path), memory_map=True)
+        except Exception as e:
+            self.logger.warning(f"Discarding unreadable cache file {path}: {e}")
+            return None
+
+        self._touch(version)
+        self.logger.debug(f"Cache hit for {name} (version {version})")
+        return table.to_pandas()
+
+    def put(
+        self, version: str, name: str, csv_path: Path, df: pd.DataFrame, tag: str = ''
+    ) -> Path:
+        """Write a dataset to the cache and enforce the disk budget."""
+        version_dir = self._version_dir(version)
+        version_dir.mkdir(parents=True, exist_ok=True)
+        path = version_dir / f"{name}{self.FORMATS[self.fmt]}"
+
+        # Write to a temporary file first so readers never see a partial file
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self.fmt == 'feather':
+            feather.write_feather(table, str(tmp_path), compression='uncompressed')
+        else:
+            pq.write_table(table, str(tmp_path))
+        os.replace(tmp_path, path)
+
+        stat = Path(csv_path).stat()
+        with self._lock:
+            # Re-read the manifest so entries written by other processes survive
+            self._manifest = None
+            manifest = self._load_manifest()
+            version_entry = manifest.setdefault(version, {'files': {}})
+            version_entry['files'][name] = {
+                'file': path.name,
+                'format': self.fmt,
+                'bytes': path.stat().st_size,
+                'source_size': stat.st_size,
+                'source_mtime': stat.st_mtime,
+                'tag': tag
+            }
+            version_entry['last_used'] = time.time()
+            self._save_manifest()
+            self.logger.info(f"Cached {name} for version {version} as {self.fmt}")
+
+            self.evict(keep_version=version)
+        return path
+
+    def evict(self, keep_version: Optional[str] = None) -> None:
+        """Remove least-recently-used versions until the budget is met."""
+        if self.max_bytes is None:
+            return
+
+        with self._lock:
+            manifest = self._load_manifest()
+            candidates = sorted(
+                (v for v in manifest if v != keep_version),
+                key=lambda v: manifest[v].get('last_used', 0)
+            )
+            while self.total_bytes() > self.max_bytes and candidates:
+                version = candidates.pop(0)
+                shutil.rmtree(self._version_dir(version), ignore_errors=True)
+                del manifest[version]
+                self.logger.info(f"Evicted cached dataset version {version}")
+            self._save_manifest()
+
+        if self.total_bytes() > self.max_bytes:
+            self.logger.warning(
+                f"Cache for version {keep_version} alone exceeds the "
+                f"{self.max_bytes} byte budget"
+            )
+
+    def estimate_bytes(self, version: str, name: str) -> Optional[int]:
+        """Estimate the in-memory size of a cached dataset from file metadata."""
+        entry = self._entry(version, name)
+        if entry is None:
+            return None
+
+        path = self._version_dir(version) / entry['file']
+        try:
+            if entry['format'] == 'feather':
+                # Uncompressed Arrow IPC maps one-to-one onto memory
+                return path.stat().st_size
+            metadata = pq.ParquetFile(str(path)).metadata
+            return sum(
+                metadata.row_group(i).total_byte_size
+                for i in range(metadata.num_row_groups)
+            )
+        except Exception as e:
+            self.logger.debug(f"Could not read cache metadata for {name}: {e}")
+            return None
+
+    def artifact_path(self, version: str, filename: str) -> Path:
+        """Location for a derived file stored (and evicted) with a cached version.
+
+        Call ``record_artifact`` once the file is written, so it counts
+        towards the disk budget.
+        """
+        return self._version_dir(version) / filename
+
+    def record_artifact(self, version: str, filename: str) -> None:
+        """Account for an artifact written to ``artifact_path`` and enforce
+        the disk budget."""
+        path = self.artifact_path(version, filename)
+        with self._lock:
+            self._manifest = None
+            manifest = self._load_manifest()
+            version_entry = manifest.setdefault(version, {'files': {}})
+            version_entry.setdefault('artifacts', {})[filename] = path.stat().st_size
+            version_entry['last_used'] = time.time()
+            self._save_manifest()
+            self.evict(keep_version=version)
+
+    def total_bytes(self) -> int:
+        """Total size of all cached files and artifacts according to the manifest."""
+        return sum(
+            sum(entry['bytes'] for entry in version['files'].values())
+            + sum(version.get('artifacts', {}).values())
+            for version in self._load_manifest().values()
+        )
+
+    def _entry(self, version: str, name: str) -> Optional[Dict[str, Any]]:
+        return self._load_manifest().get(version, {}).get('files', {}).get(name)
+
+    def _matches_source(self, entry: Dict[str, Any], csv_path: Path) -> bool:
+        try:
+            stat = Path(csv_path).stat()
+        except OSError:
+            # The source is gone, the cached copy is all we have
+            return True
+        return (entry['source_size'] == stat.st_size
+                and entry['source_mtime'] == stat.st_mtime)
+
+    def _touch(self, version: str) -> None:
+        with self._lock:
+            manifest = self._load_manifest()
+            if version in manifest:
+                manifest[version]['last_used'] = time.time()
+                self._save_manifest()
+
+    def _version_dir(self, version: str) -> Path:
+        return self.cache_dir / str(version)
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        with self._lock:
+            return self._read_manifest()
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        if self._manifest is None:
+            manifest_file = self.cache_dir / self.MANIFEST_FILE
+            if manifest_file.exists():
+                try:
+                    with open(manifest_file) as f:
+                        self._manifest = json.load(f)
+                except (OSError, ValueError) as e:
+                    self.logger.warning(f"Ignoring corrupt cache manifest: {e}")
+                    self._manifest = {}
+            else:
+                self._manifest = {}
+        return self._manifest
+
+    def _save_manifest(self) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        manifest_file = self.cache_dir / self.MANIFEST_FILE
+        tmp_file = manifest_file.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(self._manifest, f)
+        os.replace(tmp_file, manifest_file)
@@ -0,0 +1,127 @@
+import os
+from collections.abc import Mapping
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple, Union
+import logging
+
+import pandas as pd
+
+from src.data.concurrent_reader import DEFAULT_INFLIGHT_BYTES, read_concurrently
+
+# Rough ratio between the in-memory size of a parsed CSV and its size on disk.
+# Object columns holding strings such as hex addresses dominate DAO tables.
+CSV_MEMORY_FACTOR = 3.0
+
+
+class LazyDatasets(Mapping):
+    """Read-only mapping of dataset name to DataFrame, loaded on access.
+
+    Listing names and ``len()`` only touch the path table. A DataFrame is
+    read the first time it is accessed and kept until ``release`` is called,
+    so a caller that releases each dataset after using it never holds more
+    than one in memory.
+    """
+
+    def __init__(self,
+                 paths: Dict[str, Union[str, Path]],
+                 loader: Callable[[str, Path], pd.DataFrame],
+                 size_estimator: Optional[Callable[[str, Path], int]] = None):
+        """
+        Initialize the mapping.
+
+        Args:
+            paths: Dataset name to source file path
+            loader: Called with (name, path) to materialize a dataset
+            size_estimator: Called with (name, path) to estimate in-memory bytes
+        """
+        self._paths = {name: Path(path) for name, path in paths.items()}
+        self._loader = loader
+        self._size_estimator = size_estimator
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self.logger = logging.getLogger(__name__)
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        if name not in self._frames:
+            path = self._paths[name]
+            self._frames[name] = self._loader(name, path)
+            self.logger.info(f"Loaded dataset: {name}")
+        return self._frames[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __contains__(self, name: object) -> bool:
+        # Mapping's default would load the dataset through __getitem__
+        return name in self._paths
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __repr__(self) -> str:
+        loaded = ', '.join(self._frames) or 'none'
+        return f"LazyDatasets({len(self)} datasets, loaded: {loaded})"
+
+    @property
+    def loader(self) -> Callable[[str, Path], pd.DataFrame]:
+        """The (name, path) callable used to materialize datasets"""
+        return self._loader
+
+    def subset(self, names) -> 'LazyDatasets':
+        """A mapping over some of the datasets, sharing loader and estimator"""
+        return LazyDatasets(
+            {name: self._paths[name] for name in names},
+            self._loader,
+            self._size_estimator
+        )
+
+    def path(self, name: str) -> Path:
+        """Return the source file of a dataset."""
+        return self._paths[name]
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether the dataset is currently held in memory."""
+        return name in self._frames
+
+    def load_concurrently(
+        self,
+        names: Optional[Iterable[str]] = None,
+        max_workers: int = 2,
+        max_bytes: int = DEFAULT_INFLIGHT_BYTES
+    ) -> Iterator[Tuple[str, Future]]:
+        """Load datasets on a thread pool, yielding ``(name, future)`` as
+        each finishes, so the next file is read while one is being used.
+
+        Frames are not kept in the mapping. Their on-disk bytes count
+        against ``max_bytes`` until the next one is requested (see
+        ``read_concurrently``).
+        """
+        names = list(self) if names is None else names
+        paths = {name: self._paths[name] for name in names}
+        sizes = {name: os.path.getsize(path) for name, path in paths.items()}
+        return read_concurrently(paths, self._loader, sizes, max_workers, max_bytes)
+
+    def release(self, name: str) -> None:
+        """Drop the in-memory copy of a dataset; it is reloaded on next access."""
+        self._frames.pop(name, None)
+
+    def release_all(self) -> None:
+        """Drop every in-memory dataset."""
+        self._frames.clear()
+
+    def estimate_bytes(self, name: str) -> int:
+        """Estimate the in-memory size of a dataset without loading it."""
+        if name in self._frames:
+            return int(self._frames[name].memory_usage(deep=True).sum())
+
+        path = self._paths[name]
+        if self._size_estimator is not None:
+            try:
+                return int(self._size_estimator(name, path))
+            except Exception as e:
+                self.logger.debug(f"Size estimator failed for {name}: {e}")
+        return int(os.path.getsize(path) * CSV_MEMORY_FACTOR)
+
+    def estimated_sizes(self) -> Dict[str, int]:
+        """Byte estimates for every dataset, keyed by name."""
+        return {name: self.estimate_bytes(name) for name in self._paths}
@@ -0,0 +1,240 @@
+import hashlib
+import io
+import itertools
+import json
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Callable, IO, Iterator, List, Optional, Tuple, Union
+import logging
+
+import numpy as np
+import pandas as pd
+
+from config.dataset_config import DATASET_CONFIGS
+from src.utils.data_processing import DataProcessor
+
+# Columns holding repeated identifiers: hex addresses, networks, tokens, ids.
+# An id suffix must follow a separator or be camelCase (proposalId), so
+# columns like 'paid' or 'valid' are not mistaken for keys.
+KEY_COLUMN_PATTERN = re.compile(
+    r'(address|network|platform|token|voter|creator|proposer|dao'
+    r'|(^|_)id$|(?-i:[a-z0-9]Id$))',
+    re.IGNORECASE,
+)
+
+# Low-cardinality columns that can be read straight into a categorical
+CATEGORY_ON_READ = {'network', 'platform', 'token'}
+
+# Rows used to measure the footprint of a default (untyped) read
+BASELINE_SAMPLE_ROWS = 10000
+# Leading rows read to extrapolate the in-memory size of a whole file
+ESTIMATE_SAMPLE_ROWS = 5000
+
+# A CSV path, or a zero-argument callable opening a binary stream (a stream
+# or a context manager yielding one, e.g. ``ZipDatasetSource.opener``)
+CSVSource = Union[str, Path, Callable[[], Any]]
+
+
+class DatasetSchema:
+    """Column projection and compact dtypes for a dataset, fed by DATASET_CONFIGS"""
+
+    def __init__(self,
+                 name: str,
+                 required_columns: Optional[List[str]] = None,
+                 date_column: Optional[str] = None,
+                 category_threshold: float = 0.5):
+        """
+        Initialize the schema.
+
+        Args:
+            name: Dataset name
+            required_columns: Columns to read; all columns are read if None
+            date_column: Column parsed to datetime at read time
+            category_threshold: Maximum unique/total ratio for a key column
+                to be stored as categorical
+        """
+        self.name = name
+        self.required_columns = required_columns
+        self.date_column = date_column
+        self.category_threshold = category_threshold
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def for_dataset(
+        cls, name: str, configs: Optional[Dict[str, Dict]] = None
+    ) -> 'DatasetSchema':
+        """Build the schema for a dataset from its config entry, if any"""
+        config = (DATASET_CONFIGS if configs is None else configs).get(name, {})
+        return cls(
+            name,
+            required_columns=config.get('required_columns'),
+            date_column=config.get('date_column')
+        )
+
+    def fingerprint(self) -> str:
+        """Stable identifier of the read options, used to invalidate caches"""
+        options = {
+            'required_columns': self.required_columns,
+            'date_column': self.date_column,
+            'category_threshold': self.category_threshold,
+            'key_columns': KEY_COLUMN_PATTERN.pattern
+        }
+        return hashlib.md5(json.dumps(options, sort_keys=True).encode()).hexdigest()[
+            :12
+        ]
+
+    def read_kwargs(self, header: List[str]) -> Dict[str, Any]:
+        """Keyword arguments for pd.read_csv given the file's header"""
+        kwargs: Dict[str, Any] = {}
+        columns = header
+        if self.required_columns:
+            missing = [col for col in self.required_columns if col not in header]
+            if missing:
+                self.logger.warning(
+                    f"{self.name}: required columns {missing} not found, reading all "
+                    "columns"
+                )
+            else:
+                columns = self.required_columns
+                kwargs['usecols'] = columns
+
+        dtype = {col: 'category' for col in columns if col.lower() in CATEGORY_ON_READ}
+        if dtype:
+            kwargs['dtype'] = dtype
+        return kwargs
+
+    def read_csv(
+        self, filepath: CSVSource, **kwargs
+    ) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """Read a CSV with projection and compact dtypes.
+
+        ``filepath`` is a path or a callable returning a fresh binary
+        stream (e.g. a zip member), since the file is read more than once.
+
+        Returns the DataFrame and a memory report with the estimated bytes
+        of a default read, the bytes actually used and the difference.
+        """
+        with _opened(filepath) as source:
+            sample = pd.read_csv(source, nrows=BASELINE_SAMPLE_ROWS)
+        header = sample.columns.tolist()
+        baseline_per_row = (
+            sample.memory_usage(deep=True).sum() / len(sample) if len(sample) else 0.0
+        )
+
+        read_kwargs = self.read_kwargs(header)
+        read_kwargs.update(kwargs)
+        with _opened(filepath) as source:
+            df = self.compact(pd.read_csv(source, **read_kwargs))
+
+        used = int(df.memory_usage(deep=True).sum())
+        baseline = int(baseline_per_row * len(df))
+        report = {
+            'baseline_bytes': baseline,
+            'bytes': used,
+            'saved_bytes': baseline - used,
+            'columns_skipped': len(header) - len(df.columns)
+        }
+        return df, report
+
+    def estimate_bytes(self, filepath: CSVSource, file_size: int) -> int:
+        """In-memory size of the file read with this schema, without reading it.
+
+        The first ESTIMATE_SAMPLE_ROWS rows are read with the schema's
+        projection and dtypes, and their bytes per row are scaled by the
+        number of rows ``file_size`` bytes hold at the sample's row width.
+        """
+        with _binary(filepath) as stream:
+            head = b''.join(itertools.islice(stream, ESTIMATE_SAMPLE_ROWS + 1))
+        if not head:
+            return 0
+        header = pd.read_csv(io.BytesIO(head), nrows=0).columns.tolist()
+        sample = self.compact(pd.read_csv(io.BytesIO(head), **self.read_kwargs(header)))
+        if len(sample) == 0:
+            return 0
+        bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample)
+        rows = len(sample) * max(1.0, file_size / len(head))
+        return int(bytes_per_row * rows)
+
+    def compact(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Downcast numerics, categorize key columns and parse the date column"""
+        date_column = self.resolve_date_column(df)
+        for col in df.columns:
+            series = df[col]
+            if col == date_column:
+                df[col] = self._parse_dates(series)
+            elif pd.api.types.is_integer_dtype(
+                series
+            ) and not pd.api.types.is_bool_dtype(series):
+                df[col] = pd.to_numeric(series, downcast='integer')
+            elif pd.api.types.is_float_dtype(series):
+                df[col] = self._downcast_float(series)
+            elif series.dtype == object and KEY_COLUMN_PATTERN.search(col):
+                if (
+                    len(series)
+                    and series.nunique() / len(series) <= self.category_threshold
+                ):
+                    df[col] = series.astype('category')
+        return df
+
+    def resolve_date_column(self, df: pd.DataFrame) -> Optional[str]:
+        """The configured date column, or the first well-known one present"""
+        if self.date_column and self.date_column in df.columns:
+            return self.date_column
+        for col in DataProcessor.DATE_COLUMNS:
+            if col in df.columns:
+                return col
+        return None
+
+    def _parse_dates(self, series: pd.Series) -> pd.Series:
+        try:
+            if pd.api.types.is_datetime64_any_dtype(series):
+                return series
+            if pd.api.types.is_numeric_dtype(series):
+                return pd.to_datetime(series, unit='s')
+            return pd.to_datetime(series)
+        except Exception as e:
+            self.logger.debug(f"{self.name}: leaving {series.name} unparsed: {e}")
+            return series
+
+    @staticmethod
+    def _downcast_float(series: pd.Series) -> pd.Series:
+        # Only keep float32 when it round-trips, epoch seconds do not survive it
+        downcast = pd.to_numeric(series, downcast='float')
+        if downcast.dtype == series.dtype:
+            return series
+        values, original = downcast.to_numpy(dtype=np.float64), series.to_numpy()
+        same = (values == original) | (np.isnan(values) & np.isnan(original))
+        return downcast if same.all() else series
+
+
+@contextmanager
+def _opened(source: CSVSource) -> Iterator[Union[str, Path, IO[bytes]]]:
+    """A path as is, or a fresh stream from an opener that is closed after use"""
+    if callable(source):
+        with source() as stream:
+            yield stream
+    else:
+        yield source
+
+
+@contextmanager
+def _binary(source: CSVSource) -> Iterator[IO[bytes]]:
+    """A binary stream over a path or from an opener, closed after use"""
+    if callable(source):
+        with source() as stream:
+            yield stream
+    else:
+        with open(source, 'rb') as stream:
+            yield stream
+
+
+def format_memory_report(name: str, report: Dict[str, int]) -> str:
+    """One-line summary of a schema memory report"""
+    baseline = report['baseline_bytes']
+    saved_pct = report['saved_bytes'] / baseline if baseline else 0.0
+    return (
+        f"{name}: {report['bytes'] / 1e6:.1f} MB in memory, "
+        f"saved {report['saved_bytes'] / 1e6:.1f} MB ({saved_pct:.0%}) "
+        f"vs default dtypes, {report['columns_skipped']} columns skipped"
+    )
@@ -0,0 +1,119 @@
+import os
+import posixpath
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    Callable,
+    ContextManager,
+    Dict,
+    IO,
+    Iterable,
+    Iterator,
+    Optional,
+    Union,
+)
+import logging
+
+import pandas as pd
+
+
+class ZipDatasetSource:
+    """CSV datasets read straight from a zip archive, without extracting it.
+
+    Members are listed from the archive's central directory and named like
+    ``DataLoader.find_csv_files`` names the files of the extracted archive,
+    so both give the same dataset names. Each ``open`` uses its own
+    ``ZipFile`` handle, so members can be read from several threads at once.
+    """
+
+    def __init__(self, zip_path: Union[str, Path], root: Optional[str] = None):
+        """
+        Args:
+            zip_path: Path of the zip archive
+            root: Directory inside the archive that names are relative to;
+                by default the single top-level directory when every member
+                is under one, as with an extracted download
+        """
+        self.zip_path = Path(zip_path)
+        self.logger = logging.getLogger(__name__)
+        with zipfile.ZipFile(self.zip_path) as archive:
+            self._infos = {
+                info.filename: info for info in archive.infolist() if not info.is_dir()
+            }
+        self.root = self._common_root() if root is None else root.strip('/')
+        self._members = self._csv_members()
+
+    def _common_root(self) -> str:
+        tops = {name.split('/', 1)[0] for name in self._infos}
+        if len(tops) == 1 and all('/' in name for name in self._infos):
+            return tops.pop()
+        return ''
+
+    def _csv_members(self) -> Dict[str, str]:
+        members = {}
+        prefix = f"{self.root}/" if self.root else ''
+        for member in self._infos:
+            if not member.endswith('.csv') or not member.startswith(prefix):
+                continue
+            rel_dir, filename = posixpath.split(member[len(prefix):])
+            friendly_name = os.path.join(rel_dir or '.', Path(filename).stem).replace(
+                '/', '_'
+            )
+            members[friendly_name] = member
+        return members
+
+    def csv_members(self) -> Dict[str, str]:
+        """Dataset name to archive member for every CSV in the archive"""
+        return dict(self._members)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._members
+
+    def file_size(self, name: str) -> int:
+        """Uncompressed size of a dataset's member"""
+        return self._infos[self._members[name]].file_size
+
+    @contextmanager
+    def open(self, name: str) -> Iterator[IO[bytes]]:
+        """Binary stream of a dataset's member, decompressed on the fly"""
+        member = self._members[name]
+        with zipfile.ZipFile(self.zip_path) as archive, archive.open(member) as stream:
+            yield stream
+
+    def opener(self, name: str) -> Callable[[], ContextManager[IO[bytes]]]:
+        """Zero-argument callable opening the member, for ``DatasetSchema.read_csv``"""
+        if name not in self._members:
+            raise KeyError(f"No CSV named {name} in {self.zip_path}")
+        return lambda: self.open(name)
+
+    def iter_csv(self, name: str, chunksize: int, **kwargs) -> Iterator[pd.DataFrame]:
+        """Read a member in chunks of ``chunksize`` rows"""
+        with self.open(name) as stream:
+            for chunk in pd.read_csv(stream, chunksize=chunksize, **kwargs):
+                yield chunk
+
+    def extract(
+        self, names: Iterable[str], target_dir: Union[str, Path]
+    ) -> Dict[str, Path]:
+        """Extract only the given datasets, keeping their archive paths.
+
+        Members already extracted with the same size are left as they are.
+
+        Returns:
+            Dataset name to extracted file path
+        """
+        target_dir = Path(target_dir)
+        extracted = {}
+        with zipfile.ZipFile(self.zip_path) as archive:
+            for name in names:
+                member = self._members[name]
+                path = target_dir / member
+                if not (
+                    path.exists()
+                    and path.stat().st_size == self._infos[member].file_size
+                ):
+                    archive.extract(member, target_dir)
+                    self.logger.info(f"Extracted {member} to {target_dir}")
+                extracted[name] = path
+        return extracted
@@ -0,0 +1,295 @@
+import json
+import numbers
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
+import logging
+
+import numpy as np
+import pandas as pd
+
+# Sections of a DAOAnalyzer result that are stored, each keyed by dataset name
+DATASET_SECTIONS = ('dataset_metrics', 'temporal_metrics', 'network_metrics')
+CROSS_DATASET_SECTION = 'cross_dataset_metrics'
+
+# Dataset name the cross-dataset metrics are stored under
+ALL_DATASETS = '*'
+
+
+def flatten(value: Any, prefix: str = '') -> Iterator[Tuple[str, Any]]:
+    """(dotted path, scalar) pairs of a nested dict; list items are
+    numbered, e.g. ``activity_trend.changepoints.0.month``"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten(item, f"{prefix}.{key}" if prefix else str(key))
+    elif isinstance(value, (list, tuple)):
+        for i, item in enumerate(value):
+            yield from flatten(item, f"{prefix}.{i}" if prefix else str(i))
+    else:
+        yield prefix, value
+
+
+def _version_number(version: str) -> Optional[int]:
+    return int(version) if str(version).isdigit() else None
+
+
+class AnalysisStore:
+    """SQLite store of ``DAOAnalyzer`` results, one snapshot per dataset version.
+
+    Every scalar metric is one row keyed by version, dataset name, section
+    and dotted metric path, with numbers in ``value`` and strings in
+    ``text``. Diffs, histories and as-of lookups are indexed queries over
+    these rows, so they never touch the raw CSVs. Analyzing a version again
+    replaces its snapshot.
+    """
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS runs (
+            version TEXT PRIMARY KEY,
+            version_number INTEGER,
+            analyzed_at REAL NOT NULL,
+            version_info TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS metrics (
+            version TEXT NOT NULL,
+            name TEXT NOT NULL,
+            section TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            value REAL,
+            text TEXT,
+            PRIMARY KEY (version, name, section, metric)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_metrics_history
+            ON metrics (metric, name, version);
+    '''
+
+    # Versions oldest first: numbered Kaggle versions by number, others by
+    # when they were analyzed
+    VERSION_ORDER = '{0}version_number IS NULL, {0}version_number, {0}analyzed_at'
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def save(self, version_info: Dict[str, Any], analysis: Dict[str, Any]) -> int:
+        """Store the analysis of a dataset version, replacing an earlier one.
+
+        Args:
+            version_info: Provider ``get_version_info()``; its ``version``
+                keys the snapshot
+            analysis: ``DAOAnalyzer.analyze`` result
+
+        Returns:
+            Number of metric rows written
+        """
+        version = str(version_info['version'])
+        rows = []
+        for section in DATASET_SECTIONS:
+            for name, metrics in analysis.get(section, {}).items():
+                rows.extend(self._rows(version, name, section, metrics))
+        rows.extend(self._rows(version, ALL_DATASETS, CROSS_DATASET_SECTION,
+                               analysis.get(CROSS_DATASET_SECTION, {})))
+
+        with self._connect() as conn:
+            conn.execute('DELETE FROM metrics WHERE version = ?', (version,))
+            conn.execute(
+                'INSERT OR REPLACE INTO runs (version, version_number, analyzed_at, '
+                'version_info) '
+                'VALUES (?, ?, ?, ?)',
+                (
+                    version,
+                    _version_number(version),
+                    time.time(),
+                    json.dumps(version_info, default=str),
+                ),
+            )
+            conn.executemany(
+                'INSERT OR REPLACE INTO metrics (version, name, section, metric, '
+                'value, text) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                rows,
+            )
+        self.logger.info(
+            f"Stored {len(rows)} metrics for version {version} in {self.db_path}"
+        )
+        return len(rows)
+
+    @staticmethod
+    def _rows(
+        version: str, name: str, section: str, metrics: Dict[str, Any]
+    ) -> List[tuple]:
+        rows = []
+        for metric, value in flatten(metrics):
+            if isinstance(value, (numbers.Real, np.bool_)):
+                rows.append((version, name, section, metric, float(value), None))
+            elif value is None:
+                rows.append((version, name, section, metric, None, None))
+            else:
+                rows.append((version, name, section, metric, None, str(value)))
+        return rows
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """Stored versions, oldest first, with their version info"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT version, analyzed_at, version_info FROM runs '
+                f"ORDER BY {self.VERSION_ORDER.format('')}"
+            ).fetchall()
+        return [
+            {'version': row['version'], 'analyzed_at': row['analyzed_at'],
+             'version_info': json.loads(row['version_info'])}
+            for row in rows
+        ]
+
+    def resolve(self, version: Optional[str] = None) -> str:
+        """The stored version a query is answered from: ``version`` itself,
+        else the newest stored version not after it (time travel), else the
+        newest stored version when ``version`` is None.
+
+        Raises:
+            KeyError: No stored version is at or before ``version``
+        """
+        versions = [entry['version'] for entry in self.versions()]
+        if not versions:
+            raise KeyError(f"No analysis stored in {self.db_path}")
+        if version is None:
+            return versions[-1]
+        version = str(version)
+        if version in versions:
+            return version
+        number = _version_number(version)
+        earlier = [v for v in versions if number is not None
+                   and _version_number(v) is not None and _version_number(v) <= number]
+        if not earlier:
+            raise KeyError(f"No analysis stored for version {version} or earlier")
+        return earlier[-1]
+
+    def as_of(self,
+              version: Optional[str] = None,
+              name: Optional[str] = None,
+              section: Optional[str] = None,
+              metric: Optional[str] = None) -> pd.DataFrame:
+        """Metrics as they were at a version (see ``resolve``).
+
+        ``metric`` matches a dotted path or any path under it, so
+        'activity_trend' selects every trend metric. Returns one row per
+        metric with ``name``, ``section``, ``metric``, ``value`` and ``text``.
+        """
+        where, params = self._filters(name, section, metric)
+        query = (
+            'SELECT name, section, metric, value, text FROM metrics WHERE version = '
+            f'?{where} '
+            'ORDER BY name, section, metric'
+        )
+        return self._frame(query, (self.resolve(version), *params))
+
+    def diff(self,
+             old: Optional[str] = None,
+             new: Optional[str] = None,
+             name: Optional[str] = None,
+             section: Optional[str] = None,
+             metric: Optional[str] = None) -> pd.DataFrame:
+        """Metrics that differ between two versions.
+
+        Defaults to the two newest stored versions. Metrics only present in
+        one version are included with the other side empty. Numeric rows
+        get ``change`` and ``pct_change``.
+        """
+        versions = [entry['version'] for entry in self.versions()]
+        new = self.resolve(new)
+        if old is None:
+            earlier = versions[:versions.index(new)]
+            if not earlier:
+                raise KeyError(f"No version stored before {new} to compare with")
+            old = earlier[-1]
+        else:
+            old = self.resolve(old)
+
+        where, params = self._filters(name, section, metric, alias='a.')
+        # A full outer join written as two left joins, for SQLite < 3.39
+        query = f'''
+            SELECT a.name, a.section, a.metric,
+                   b.value AS old_value, a.value AS new_value,
+                   b.text AS old_text, a.text AS new_text
+            FROM metrics a LEFT JOIN metrics b
+              ON b.version = ? AND b.name = a.name
+                 AND b.section = a.section AND b.metric = a.metric
+            WHERE a.version = ?{where}
+              AND (b.metric IS NULL OR b.value IS NOT a.value OR b.text IS NOT a.text)
+            UNION ALL
+            SELECT a.name, a.section, a.metric, a.value, NULL, a.text, NULL
+            FROM metrics a LEFT JOIN metrics b
+              ON b.version = ? AND b.name = a.name
+                 AND b.section = a.section AND b.metric = a.metric
+            WHERE a.version = ?{where} AND b.metric IS NULL
+            ORDER BY 1, 2, 3
+        '''
+        frame = self._frame(query, (old, new, *params, new, old, *params))
+        frame[['old_value', 'new_value']] = frame[['old_value', 'new_value']].astype(
+            float
+        )
+        frame['change'] = frame['new_value'] - frame['old_value']
+        frame['pct_change'] = frame['change'] / frame['old_value'].where(
+            frame['old_value'] != 0
+        )
+        frame.attrs.update(old=old, new=new)
+        return frame
+
+    def history(self, metric: str, name: Optional[str] = None,
+                section: Optional[str] = None) -> pd.DataFrame:
+        """A metric's value in every stored version, oldest first, for one
+        dataset or every dataset that has it"""
+        where, params = self._filters(name, section, metric, alias='m.', exact=True)
+        query = f'''
+            SELECT r.version, m.name, m.section, m.value, m.text
+            FROM runs r JOIN metrics m ON m.version = r.version
+            WHERE 1 = 1{where}
+            ORDER BY m.name, {self.VERSION_ORDER.format('r.')}
+        '''
+        return self._frame(query, params)
+
+    @staticmethod
+    def _filters(name: Optional[str], section: Optional[str], metric: Optional[str],
+                 alias: str = '', exact: bool = False) -> Tuple[str, tuple]:
+        clauses, params = [], []
+        if name is not None:
+            clauses.append(f'{alias}name = ?')
+            params.append(name)
+        if section is not None:
+            clauses.append(f'{alias}section = ?')
+            params.append(section)
+        if metric is not None:
+            if exact:
+                clauses.append(f'{alias}metric = ?')
+                params.append(metric)
+            else:
+                # Range on the primary key instead of LIKE, which SQLite
+                # cannot use an index for by default
+                clauses.append(
+                    f'({alias}metric = ? OR ({alias}metric > ? AND {alias}metric < ?))'
+                )
+                params.extend([metric, f'{metric}.', f'{metric}/'])
+        return ''.join(f' AND {clause}' for clause in clauses), tuple(params)
+
+    def _frame(self, query: str, params: tuple) -> pd.DataFrame:
+        with self._connect() as conn:
+            cursor = conn.execute(query, params)
+            columns = [description[0] for description in cursor.description]
+            return pd.DataFrame(
+                [tuple(row) for row in cursor.fetchall()], columns=columns
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.db_path))
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
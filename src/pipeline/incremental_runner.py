@@ -0,0 +1,202 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, Optional
+import logging
+
+import pandas as pd
+
+from src.data.lazy_datasets import LazyDatasets
+from src.data.schema import DatasetSchema
+from src.pipeline.memory_scheduler import MemoryBudgetScheduler
+from src.pipeline.parallel_runner import ParallelPipelineRunner
+from src.pipeline.result_store import ResultStore, file_fingerprint, is_append_of
+from src.processors.dao_processor import DAODataProcessor
+
+# Tables that only ever grow between dataset versions
+APPEND_ONLY_DATASETS = ('votes', 'proposals')
+# Result key the streaming state travels under from worker to parent
+STATE_KEY = '_stream_state'
+
+
+def read_chunks(name: str, path: Path, chunksize: int,
+                offset: int = 0) -> Iterator[pd.DataFrame]:
+    """Chunks of a CSV from ``offset`` bytes on (a row boundary), read
+    with the dataset's schema"""
+    schema = DatasetSchema.for_dataset(name)
+    header = pd.read_csv(path, nrows=0).columns.tolist()
+    read_kwargs = schema.read_kwargs(header)
+    with open(path, 'rb') as f:
+        options: Dict[str, Any] = {}
+        if offset:
+            f.seek(offset)
+            options = {'header': None, 'names': header}
+        for chunk in pd.read_csv(f, chunksize=chunksize, **options, **read_kwargs):
+            yield schema.compact(chunk)
+
+
+class StateRecordingProcessor:
+    """Wraps a processor so results of append-only datasets carry the
+    streaming state of the same rows under ``STATE_KEY``.
+
+    In memory, the state is built from the DataFrame the result came
+    from. Backends that read files get a state streamed from chunks of
+    the file on a thread while the backend runs. Picklable, so it runs
+    on the worker processes of a ``ParallelPipelineRunner``.
+    """
+
+    def __init__(
+        self, processor: DAODataProcessor, names: Iterable[str], chunksize: int
+    ):
+        self.processor = processor
+        self.names = set(names)
+        self.chunksize = chunksize
+
+    @property
+    def reads_files(self) -> bool:
+        return self.processor.reads_files
+
+    def process(self, df: pd.DataFrame, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        result = self.processor.process(df, metadata)
+        if metadata.get('name') in self.names:
+            state = self.processor.new_stream_state(sketches=True)
+            self.processor.update_stream_state(state, df)
+            result[STATE_KEY] = state
+        return result
+
+    def process_path(self, path: Path, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        name = metadata.get('name')
+        if name not in self.names:
+            return self.processor.process_path(path, metadata)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            state = pool.submit(self._stream_state, name, Path(path))
+            result = self.processor.process_path(path, metadata)
+            result[STATE_KEY] = state.result()
+        return result
+
+    def _stream_state(self, name: str, path: Path):
+        state = self.processor.new_stream_state(sketches=True)
+        for chunk in read_chunks(name, path, self.chunksize):
+            self.processor.update_stream_state(state, chunk)
+        return state
+
+
+class IncrementalRunner:
+    """Skips datasets whose files were already processed and updates
+    append-only tables from their new rows only.
+
+    Unchanged files are recognized by path, size and mtime, or by content
+    hash when the same bytes appear at a new location (e.g. a new dataset
+    version). Everything else runs on ``runner`` like a regular run, so
+    the results match it. Append-only tables also record a mergeable
+    streaming state of their rows. Later appends are read with the same
+    schema and folded into that state; from then on unique counts are
+    HyperLogLog estimates and quartiles come from a sample.
+    """
+
+    def __init__(self,
+                 processor: DAODataProcessor,
+                 store: ResultStore,
+                 workers: int = 1,
+                 scheduler: Optional[MemoryBudgetScheduler] = None,
+                 append_only: Iterable[str] = APPEND_ONLY_DATASETS,
+                 chunksize: int = 500000,
+                 full_hash: bool = False):
+        """
+        Initialize the runner.
+
+        Args:
+            processor: Processor used for full and incremental processing
+            store: Result store holding previous results
+            workers: Worker processes for datasets that need processing
+            scheduler: Memory budget for those datasets, as in
+                ``ParallelPipelineRunner``
+            append_only: Dataset names eligible for incremental processing
+            chunksize: Rows per chunk when streaming rows into a state
+            full_hash: Hash whole files instead of sampled blocks
+        """
+        self.processor = processor
+        self.store = store
+        self.append_only = set(append_only)
+        self.runner = ParallelPipelineRunner(
+            StateRecordingProcessor(processor, self.append_only, chunksize),
+            workers=workers, scheduler=scheduler
+        )
+        self.chunksize = chunksize
+        self.full_hash = full_hash
+        self.logger = logging.getLogger(__name__)
+        self.outcomes: Dict[str, str] = {}
+
+    def process_all(self, datasets: LazyDatasets) -> Dict[str, Dict[str, Any]]:
+        """Process datasets, reusing stored results where possible.
+
+        ``outcomes`` records per dataset whether it was 'unchanged',
+        'appended' or fully 'processed'.
+        """
+        self.outcomes = {}
+        results = {}
+        pending = []
+        for name in datasets:
+            path = datasets.path(name)
+            try:
+                result = self._reuse_or_extend(name, path)
+            except Exception as e:
+                self.logger.warning(f"Incremental check failed for {name}: {str(e)}")
+                result = None
+
+            if result is not None:
+                results[name] = result
+            else:
+                pending.append(name)
+
+        if pending:
+            processed = self.runner.process_all(datasets.subset(pending))
+            for name, result in processed.items():
+                path = datasets.path(name)
+                state = result.pop(STATE_KEY, None)
+                self.store.save(name, self.processor.config_fingerprint(name), path,
+                                file_fingerprint(path, self.full_hash), result, state)
+                results[name] = result
+                self.outcomes[name] = 'processed'
+
+        return {name: results[name] for name in datasets if name in results}
+
+    def _reuse_or_extend(self, name: str, path: Path) -> Optional[Dict[str, Any]]:
+        config = self.processor.config_fingerprint(name)
+        entry = self.store.find_by_stat(name, config, path)
+        if entry is not None:
+            self.logger.info(f"Skipping unchanged dataset {name}")
+            self.outcomes[name] = 'unchanged'
+            return entry['result']
+
+        fingerprint = file_fingerprint(path, self.full_hash)
+        entry = self.store.find_by_hash(name, config, fingerprint)
+        if entry is not None:
+            self.logger.info(
+                f"Skipping dataset {name}, content identical to {entry['path']}"
+            )
+            self.store.touch(entry, path)
+            self.outcomes[name] = 'unchanged'
+            return entry['result']
+
+        if name not in self.append_only:
+            return None
+        previous = self.store.latest(name, config)
+        if (
+            previous is None
+            or previous['state'] is None
+            or not is_append_of(path, previous)
+        ):
+            return None
+
+        self.logger.info(
+            f"Processing {fingerprint['size'] - previous['size']} appended bytes of "
+            f"{name}"
+        )
+        state = copy.deepcopy(previous['state'])
+        for chunk in read_chunks(name, path, self.chunksize, previous['size']):
+            self.processor.update_stream_state(state, chunk)
+        result = self.processor.finalize_stream_state(state, {'name': name})
+        self.store.save(name, config, path, fingerprint, result, state)
+        self.outcomes[name] = 'appended'
+        return result
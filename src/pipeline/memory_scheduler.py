@@ -0,0 +1,199 @@
+import os
+import pickle
+import shutil
+import tempfile
+import weakref
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Union
+import logging
+
+from src.data.lazy_datasets import LazyDatasets
+
+# Peak memory of processing a dataset relative to its loaded frame: parsed
+# dates, group codes and describe() work on copies of columns
+PROCESS_PEAK_FACTOR = 2.0
+
+# Smallest memory_limit given to DuckDB; its CSV reader buffers alone need
+# tens of MiB, so lower limits fail instead of spilling
+DUCKDB_MIN_MEMORY = 128 << 20
+
+# Large intermediates of a processed result, spilled first when memory is tight
+SPILL_KEYS = (
+    ('time_series', 'daily_counts'),
+    ('time_series', 'monthly_activity'),
+    ('summary', 'numeric_stats'),
+)
+
+
+class SpilledMapping(Mapping):
+    """Read-only mapping pickled to disk and loaded again on each access.
+
+    Stands in for a dict in a processed result. Iterating, ``items()`` and
+    friends load the file once per call and keep nothing in memory
+    afterwards. Pickling materializes it back into a plain dict, so results
+    stored elsewhere never point at the spill directory.
+    """
+
+    def __init__(self, path: Path, owner: Any = None):
+        self.path = Path(path)
+        # Keeps the spill directory alive while this mapping is in use
+        self._owner = owner
+
+    def load(self) -> Dict[Any, Any]:
+        with open(self.path, 'rb') as f:
+            return pickle.load(f)
+
+    def __getitem__(self, key):
+        return self.load()[key]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.load())
+
+    def __len__(self) -> int:
+        return len(self.load())
+
+    def keys(self):
+        return self.load().keys()
+
+    def values(self):
+        return self.load().values()
+
+    def items(self):
+        return self.load().items()
+
+    def __reduce__(self):
+        return dict, (self.load(),)
+
+    def __repr__(self) -> str:
+        return f"SpilledMapping({self.path})"
+
+
+class MemoryBudgetScheduler:
+    """Orders and throttles dataset processing to stay under a memory budget.
+
+    Each dataset's peak is estimated from its ``LazyDatasets`` size estimate
+    (file size and schema) times PROCESS_PEAK_FACTOR. Datasets start
+    largest first, as long as their peak fits next to the running ones and
+    the results held so far. A dataset that does not fit even alone runs by
+    itself. Results whose large intermediates (SPILL_KEYS) would push the
+    total over the budget get them written to disk as ``SpilledMapping``.
+    """
+
+    def __init__(self,
+                 budget_bytes: int,
+                 spill_dir: Optional[Union[str, Path]] = None,
+                 peak_factor: float = PROCESS_PEAK_FACTOR):
+        """
+        Args:
+            budget_bytes: Memory the running datasets and held results may use
+            spill_dir: Parent directory of the spill files (defaults to the
+                system temp directory); they are removed once no spilled
+                result is referenced anymore
+            peak_factor: Peak processing memory relative to a loaded frame
+        """
+        self.budget_bytes = budget_bytes
+        self.peak_factor = peak_factor
+        self.logger = logging.getLogger(__name__)
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+        self.spill_dir = Path(tempfile.mkdtemp(prefix='spill_', dir=spill_dir))
+        weakref.finalize(self, shutil.rmtree, str(self.spill_dir), True)
+
+        self.running: Dict[str, int] = {}
+        self.retained_bytes = 0
+        self.spilled_bytes = 0
+
+    @property
+    def reserved_bytes(self) -> int:
+        return sum(self.running.values())
+
+    def estimate(self, datasets: LazyDatasets, reads_files: bool = False,
+                 workers: int = 1) -> Dict[str, int]:
+        """Peak bytes per dataset.
+
+        Processors that query files in place (``reads_files``) never load
+        them; each is given an equal share of the budget across workers.
+        """
+        if reads_files:
+            return {name: self.budget_bytes // max(1, workers) for name in datasets}
+        return {
+            name: int(datasets.estimate_bytes(name) * self.peak_factor)
+            for name in datasets
+        }
+
+    def order(self, estimates: Dict[str, int]) -> List[str]:
+        """Dataset names, largest estimate first"""
+        return sorted(estimates, key=estimates.get, reverse=True)
+
+    def fits(self, nbytes: int) -> bool:
+        return self.reserved_bytes + self.retained_bytes + nbytes <= self.budget_bytes
+
+    def next_ready(
+        self, pending: List[str], estimates: Dict[str, int]
+    ) -> Optional[str]:
+        """The first pending dataset that fits now, or the first one at all
+        when nothing is running; None means wait for a running one"""
+        for name in pending:
+            if self.fits(estimates[name]):
+                return name
+        return pending[0] if pending and not self.running else None
+
+    def start(self, name: str, nbytes: int) -> None:
+        if not self.fits(nbytes):
+            self.logger.warning(
+                f"{name} needs an estimated {nbytes / 2**20:.1f} MiB, over the "
+                f"{self.budget_bytes / 2**20:.1f} MiB budget with "
+                f"{self.retained_bytes / 2**20:.1f} MiB of results held; running it "
+                "alone"
+            )
+        self.running[name] = nbytes
+
+    def finish(self, name: str) -> None:
+        self.running.pop(name, None)
+
+    def retain(self, name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Hold a result, spilling its large intermediates when they would
+        not fit in the budget next to the running datasets"""
+        for section, key in SPILL_KEYS:
+            value = result.get(section, {}).get(key)
+            if not isinstance(value, dict) or not value:
+                continue
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            if self.fits(len(payload)):
+                self.retained_bytes += len(payload)
+                continue
+            path = self.spill_dir / f"{name}.{section}.{key}.pkl"
+            path.write_bytes(payload)
+            result[section][key] = SpilledMapping(path, owner=self)
+            self.spilled_bytes += len(payload)
+            self.logger.info(
+                f"Spilled {name} {section}.{key} ({len(payload) / 2**20:.1f} MiB) to "
+                f"{path}"
+            )
+        return result
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'budget_bytes': self.budget_bytes,
+            'retained_bytes': self.retained_bytes,
+            'spilled_bytes': self.spilled_bytes,
+            'spill_dir': str(self.spill_dir)
+        }
+
+
+def parse_size(value: str) -> int:
+    """Bytes from a size like '512M', '4G' or '1.5GiB' (binary units)"""
+    units = {'': 0, 'K': 1, 'M': 2, 'G': 3, 'T': 4}
+    text = value.strip().upper().replace('IB', '').rstrip('B')
+    number, unit = (text[:-1], text[-1]) if text and text[-1] in units else (text, '')
+    try:
+        return int(float(number) * 1024 ** units[unit])
+    except ValueError:
+        raise ValueError(f"Invalid size {value!r}; expected e.g. 512M or 4G")
+
+
+def duckdb_memory_limit(budget_bytes: int, workers: int) -> str:
+    """One worker's share of the budget as a DuckDB ``memory_limit``"""
+    share = max(DUCKDB_MIN_MEMORY, budget_bytes // max(1, workers))
+    return f"{share >> 20}MiB"
@@ -0,0 +1,293 @@
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+import logging
+
+import pandas as pd
+
+from src.core.base import DataProcessor
+from src.core.instrumentation import instrumentation
+from src.data.lazy_datasets import LazyDatasets
+from src.pipeline.memory_scheduler import MemoryBudgetScheduler
+
+# Threads reading files ahead of a single in-process worker
+READ_AHEAD_WORKERS = 2
+
+
+def _run_task(name: str,
+              path: Path,
+              loader: Callable[[str, Path], pd.DataFrame],
+              processor: DataProcessor,
+              collect_spans: bool = False) -> Dict[str, Any]:
+    """Load and process one dataset inside a worker process.
+
+    The worker reads its own file, so only the path and the (small)
+    result cross the process boundary. Failures are returned instead of
+    raised so one bad file cannot take the run down. With
+    ``collect_spans`` the worker's instrumentation spans are returned
+    under ``spans`` for the parent to merge.
+    """
+    if collect_spans:
+        # Forked workers inherit the parent's spans; drop them
+        instrumentation.drain()
+        if not instrumentation.enabled:
+            instrumentation.enable()
+    started = time.time()
+    task = {'name': name, 'pid': os.getpid(), 'started': started}
+    try:
+        if getattr(processor, 'reads_files', False):
+            # Out-of-core backends query the file instead of loading it
+            task['result'] = processor.process_path(path, {'name': name})
+            task['rows'] = task['result']['record_count']
+        else:
+            df = loader(name, path)
+            task['rows'] = len(df)
+            task['result'] = processor.process(df, {'name': name})
+            del df
+    except Exception as e:
+        task['error'] = f"{type(e).__name__}: {e}"
+        task['traceback'] = traceback.format_exc()
+    task['finished'] = time.time()
+    if collect_spans:
+        task['spans'] = instrumentation.drain()
+    return task
+
+
+class ParallelPipelineRunner:
+    """Fans datasets out to a process pool and streams results back"""
+
+    def __init__(self, processor: DataProcessor, workers: Optional[int] = None,
+                 scheduler: Optional[MemoryBudgetScheduler] = None):
+        """
+        Initialize the runner.
+
+        Args:
+            processor: Processor applied to every dataset; must be picklable
+            workers: Number of worker processes (defaults to the CPU count);
+                1 processes everything in the current process
+            scheduler: Memory budget to order and throttle datasets by, and
+                to spill held results under; datasets start in mapping
+                order, up to ``workers`` at once, if None
+        """
+        self.processor = processor
+        self.workers = workers or os.cpu_count() or 1
+        self.scheduler = scheduler
+        self.logger = logging.getLogger(__name__)
+        self.tasks: List[Dict[str, Any]] = []
+        self._wall_time = 0.0
+
+    def run(self, datasets: LazyDatasets) -> Iterator[Dict[str, Any]]:
+        """Yield one task record per dataset, in completion order.
+
+        Each record has ``name``, ``pid``, ``started``, ``finished`` and
+        either ``result`` or ``error``.
+        """
+        self.tasks = []
+        start = time.time()
+        try:
+            if self.scheduler is not None:
+                yield from self._run_budgeted(datasets)
+                return
+
+            if self.workers == 1:
+                yield from self._run_serial(datasets)
+                return
+
+            yield from self._run_pool(datasets, list(datasets))
+        finally:
+            self._wall_time = time.time() - start
+
+    def _run_serial(self, datasets: LazyDatasets) -> Iterator[Dict[str, Any]]:
+        """``run`` in the current process, reading the next files on a
+        thread pool while one is processed"""
+        if getattr(self.processor, 'reads_files', False):
+            for name in datasets:
+                yield self._record(_run_task(
+                    name, datasets.path(name), datasets.loader, self.processor
+                ))
+            return
+
+        for name, future in datasets.load_concurrently(max_workers=READ_AHEAD_WORKERS):
+            yield self._record(_run_task(
+                name, datasets.path(name), lambda *_: future.result(), self.processor
+            ))
+
+    def _run_budgeted(self, datasets: LazyDatasets) -> Iterator[Dict[str, Any]]:
+        """``run`` with datasets started largest first while their estimated
+        peak fits the scheduler's budget"""
+        scheduler = self.scheduler
+        estimates = scheduler.estimate(
+            datasets, getattr(self.processor, 'reads_files', False), self.workers
+        )
+        pending = scheduler.order(estimates)
+        self.logger.info(
+            f"Scheduling {len(pending)} datasets, "
+            f"{sum(estimates.values()) / 2**20:.1f} MiB "
+            f"estimated peak, within a {scheduler.budget_bytes / 2**20:.1f} MiB budget"
+        )
+
+        if self.workers == 1:
+            for name in pending:
+                scheduler.start(name, estimates[name])
+                task = _run_task(
+                    name, datasets.path(name), datasets.loader, self.processor
+                )
+                scheduler.finish(name)
+                datasets.release(name)
+                yield self._record(self._retain(task))
+            return
+
+        yield from self._run_pool(datasets, pending, estimates)
+
+    def _run_pool(
+        self,
+        datasets: LazyDatasets,
+        pending: List[str],
+        estimates: Optional[Dict[str, int]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Run ``pending`` on a process pool, up to ``workers`` at once.
+
+        With ``estimates``, datasets start when the scheduler admits them.
+        When a worker dies, the pool is broken and every task on it fails;
+        those tasks are resubmitted to a fresh pool. A task that breaks a
+        pool twice is run alone, so only the task at fault fails.
+        """
+        scheduler = self.scheduler if estimates is not None else None
+        crashes: Dict[str, int] = {}
+        running: Dict[Future, Tuple[str, float]] = {}
+        pool = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            while pending or running:
+                while pending and len(running) < self.workers:
+                    name = (
+                        scheduler.next_ready(pending, estimates)
+                        if scheduler
+                        else pending[0]
+                    )
+                    if name is None:
+                        break
+                    pending.remove(name)
+                    if scheduler:
+                        scheduler.start(name, estimates[name])
+                    running[self._submit(pool, datasets, name)] = (name, time.time())
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                if any(
+                    isinstance(future.exception(), BrokenProcessPool) for future in done
+                ):
+                    # Every other task on the pool fails too; collect them all
+                    done = set(running)
+                    wait(done)
+                    pool.shutdown(wait=True)
+                    pool = ProcessPoolExecutor(max_workers=self.workers)
+
+                for future in done:
+                    name, submitted = running.pop(future)
+                    if isinstance(future.exception(), BrokenProcessPool):
+                        crashes[name] = crashes.get(name, 0) + 1
+                        if crashes[name] == 1:
+                            self.logger.warning(
+                                f"Worker pool broke while processing {name}, retrying"
+                            )
+                            if scheduler:
+                                scheduler.finish(name)
+                            pending.insert(0, name)
+                            continue
+                        task = self._run_alone(datasets, name)
+                    else:
+                        task = self._outcome(future, name, submitted)
+                    if scheduler:
+                        scheduler.finish(name)
+                        datasets.release(name)
+                        task = self._retain(task)
+                    yield self._record(task)
+        finally:
+            pool.shutdown(wait=True)
+
+    def _submit(
+        self, pool: ProcessPoolExecutor, datasets: LazyDatasets, name: str
+    ) -> Future:
+        return pool.submit(_run_task, name, datasets.path(name), datasets.loader,
+                           self.processor, instrumentation.enabled)
+
+    def _run_alone(self, datasets: LazyDatasets, name: str) -> Dict[str, Any]:
+        """Run one task on a pool of its own, so a crash is its own"""
+        self.logger.warning(
+            f"Worker pool broke again while processing {name}, running it alone"
+        )
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            submitted = time.time()
+            return self._outcome(self._submit(pool, datasets, name), name, submitted)
+
+    def _retain(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        if 'result' in task:
+            task['result'] = self.scheduler.retain(task['name'], task['result'])
+        return task
+
+    @staticmethod
+    def _outcome(future: Future, name: str, submitted: float) -> Dict[str, Any]:
+        try:
+            return future.result()
+        except Exception as e:
+            # The worker itself died, e.g. BrokenProcessPool after an OOM kill.
+            # No worker reported its start, so no busy time is counted.
+            return {'name': name, 'pid': None, 'started': submitted,
+                    'finished': time.time(),
+                    'error': f"{type(e).__name__}: {e}"}
+
+    def process_all(self, datasets: LazyDatasets) -> Dict[str, Dict[str, Any]]:
+        """Process every dataset and return results in the mapping's order.
+
+        Failed datasets are logged and left out.
+        """
+        results = {}
+        for task in self.run(datasets):
+            if 'error' in task:
+                self.logger.error(f"Skipping {task['name']}: {task['error']}")
+                if task.get('traceback'):
+                    self.logger.debug(task['traceback'])
+                continue
+            results[task['name']] = task['result']
+            self.logger.info(
+                f"Processed {task['name']} in "
+                f"{task['finished'] - task['started']:.2f}s "
+                f"(worker {task['pid']})"
+            )
+        return {name: results[name] for name in datasets if name in results}
+
+    def utilization_report(self) -> Dict[str, Any]:
+        """Busy time per worker relative to the wall time of the last run"""
+        workers: Dict[str, Dict[str, Any]] = {}
+        for task in self.tasks:
+            if task['pid'] is None:
+                # Crashed before reporting back; its time is unknown
+                continue
+            worker = workers.setdefault(
+                str(task['pid']), {'tasks': 0, 'busy_seconds': 0.0}
+            )
+            worker['tasks'] += 1
+            worker['busy_seconds'] += task['finished'] - task['started']
+
+        wall = self._wall_time
+        for worker in workers.values():
+            worker['utilization'] = worker['busy_seconds'] / wall if wall > 0 else 0.0
+
+        busy = sum(worker['busy_seconds'] for worker in workers.values())
+        return {
+            'workers': self.workers,
+            'wall_seconds': wall,
+            'busy_seconds': busy,
+            'pool_utilization': busy / (wall * self.workers) if wall > 0 else 0.0,
+            'failed': [task['name'] for task in self.tasks if 'error' in task],
+            'per_worker': workers
+        }
+
+    def _record(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        if 'spans' in task:
+            instrumentation.extend(task.pop('spans'))
+        self.tasks.append({k: v for k, v in task.items() if k != 'result'})
+        return task
@@ -0,0 +1,234 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional, Union
+import logging
+
+# Bytes hashed from the start, middle and end of a file for the fast hash
+BLOCK_SIZE = 1 << 20
+# Bytes before the end of a file that must be unchanged for an append
+BOUNDARY_SIZE = 1 << 16
+
+
+def _hash_range(f, start: int, length: int) -> str:
+    f.seek(start)
+    digest = hashlib.blake2b(digest_size=16)
+    remaining = length
+    while remaining > 0:
+        chunk = f.read(min(remaining, BLOCK_SIZE))
+        if not chunk:
+            break
+        digest.update(chunk)
+        remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: Union[str, Path], full_hash: bool = False) -> Dict[str, Any]:
+    """Size, mtime and a fast content hash of a file.
+
+    The fast hash covers the size plus one block from the start, middle
+    and end of the file; ``full_hash`` hashes every byte instead. The
+    head and boundary hashes let a later, larger file be recognized as an
+    append to this one.
+    """
+    stat = os.stat(path)
+    size = stat.st_size
+    with open(path, 'rb') as f:
+        if full_hash or size <= 3 * BLOCK_SIZE:
+            content_hash = _hash_range(f, 0, size)
+        else:
+            content_hash = hashlib.blake2b(
+                '|'.join([
+                    str(size),
+                    _hash_range(f, 0, BLOCK_SIZE),
+                    _hash_range(f, size // 2, BLOCK_SIZE),
+                    _hash_range(f, size - BLOCK_SIZE, BLOCK_SIZE)
+                ]).encode(),
+                digest_size=16
+            ).hexdigest()
+        head_size = min(BLOCK_SIZE, size)
+        boundary_start = max(0, size - BOUNDARY_SIZE)
+        fingerprint = {
+            'size': size,
+            'mtime': stat.st_mtime,
+            'hash': content_hash,
+            'head_hash': _hash_range(f, 0, head_size),
+            'boundary_hash': _hash_range(f, boundary_start, size - boundary_start)
+        }
+        if size:
+            f.seek(size - 1)
+            fingerprint['ends_with_newline'] = f.read(1) == b'\n'
+        else:
+            fingerprint['ends_with_newline'] = True
+    return fingerprint
+
+
+def is_append_of(path: Union[str, Path], previous: Dict[str, Any]) -> bool:
+    """Whether the file at ``path`` is ``previous`` with rows appended."""
+    size = os.path.getsize(path)
+    old_size = previous['size']
+    if size <= old_size or not previous.get('ends_with_newline'):
+        return False
+    with open(path, 'rb') as f:
+        if _hash_range(f, 0, min(BLOCK_SIZE, old_size)) != previous['head_hash']:
+            return False
+        boundary_start = max(0, old_size - BOUNDARY_SIZE)
+        return (
+            _hash_range(f, boundary_start, old_size - boundary_start)
+            == previous['boundary_hash']
+        )
+
+
+class ResultStore:
+    """SQLite store mapping dataset file fingerprints to processing results.
+
+    Rows are keyed by dataset name, content hash and the fingerprint of
+    the processor configuration, so byte-identical files are recognized
+    across dataset versions and download locations, but never reuse a
+    result computed with other options (backend, sketches, schema).
+    Streaming states are stored alongside results so append-only tables
+    can be updated incrementally.
+    """
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS results (
+            name TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            config TEXT NOT NULL,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            head_hash TEXT NOT NULL,
+            boundary_hash TEXT NOT NULL,
+            ends_with_newline INTEGER NOT NULL,
+            processed_at REAL NOT NULL,
+            result BLOB NOT NULL,
+            state BLOB,
+            PRIMARY KEY (name, hash, config)
+        );
+        CREATE INDEX IF NOT EXISTS idx_results_path ON results (path, size, mtime);
+        CREATE INDEX IF NOT EXISTS idx_results_name
+            ON results (name, config, processed_at);
+    '''
+
+    COLUMNS = ('name', 'hash', 'config', 'path', 'size', 'mtime', 'head_hash',
+               'boundary_hash', 'ends_with_newline', 'processed_at', 'result', 'state')
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+        with self._connect() as conn:
+            columns = [
+                row['name'] for row in conn.execute('PRAGMA table_info(results)')
+            ]
+            if columns and 'config' not in columns:
+                # Entries of older stores can't be matched to a configuration
+                self.logger.info(
+                    f"Dropping results without a configuration from {self.db_path}"
+                )
+                conn.execute('DROP TABLE results')
+            conn.executescript(self.SCHEMA)
+
+    def find_by_stat(self, name: str, config: str,
+                     path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+        """Entry for the same file path, size and mtime (no hashing needed)"""
+        stat = os.stat(path)
+        return self._fetch_one(
+            'SELECT * FROM results WHERE name = ? AND config = ? AND path = ? '
+            'AND size = ? AND mtime = ?',
+            (name, config, str(path), stat.st_size, stat.st_mtime)
+        )
+
+    def find_by_hash(self, name: str, config: str,
+                     fingerprint: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Entry for byte-identical content, wherever it was stored from"""
+        return self._fetch_one(
+            'SELECT * FROM results WHERE name = ? AND config = ? AND hash = ? AND size '
+            '= ?',
+            (name, config, fingerprint['hash'], fingerprint['size']),
+        )
+
+    def latest(self, name: str, config: str) -> Optional[Dict[str, Any]]:
+        """Most recently processed entry for a dataset"""
+        return self._fetch_one(
+            'SELECT * FROM results WHERE name = ? AND config = ? '
+            'ORDER BY processed_at DESC LIMIT 1',
+            (name, config)
+        )
+
+    def save(self,
+             name: str,
+             config: str,
+             path: Union[str, Path],
+             fingerprint: Dict[str, Any],
+             result: Dict[str, Any],
+             state: Any = None) -> None:
+        """Store the result (and optional streaming state) for a file"""
+        row = (
+            name,
+            fingerprint['hash'],
+            config,
+            str(path),
+            fingerprint['size'],
+            fingerprint['mtime'],
+            fingerprint['head_hash'],
+            fingerprint['boundary_hash'],
+            int(fingerprint['ends_with_newline']),
+            time.time(),
+            pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL),
+            (
+                pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+                if state is not None
+                else None
+            ),
+        )
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO results ({', '.join(self.COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                row
+            )
+
+    def touch(self, entry: Dict[str, Any], path: Union[str, Path]) -> None:
+        """Point an existing entry at a new location of the same content"""
+        stat = os.stat(path)
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE results SET path = ?, mtime = ? '
+                'WHERE name = ? AND hash = ? AND config = ?',
+                (
+                    str(path),
+                    stat.st_mtime,
+                    entry['name'],
+                    entry['hash'],
+                    entry['config'],
+                ),
+            )
+
+    def _fetch_one(self, query: str, params: tuple) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute(query, params).fetchone()
+        if row is None:
+            return None
+        entry = dict(zip(self.COLUMNS, (row[col] for col in self.COLUMNS)))
+        entry['result'] = pickle.loads(entry['result'])
+        entry['state'] = (
+            pickle.loads(entry['state']) if entry['state'] is not None else None
+        )
+        entry['ends_with_newline'] = bool(entry['ends_with_newline'])
+        return entry
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.db_path))
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
@@ -0,0 +1,505 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from src.data.schema import DatasetSchema
+
+# Compute backends; 'pandas' loads each dataset into memory, the others
+# query the file in place
+BACKENDS = ('pandas', 'duckdb', 'polars')
+
+# Quantiles of DataFrame.describe, under its key names
+DESCRIBE_QUANTILES = {'25%': 0.25, '50%': 0.5, '75%': 0.75}
+
+# Where DuckDB spills intermediate results that do not fit its memory limit
+DEFAULT_SPILL_DIR = os.path.join(tempfile.gettempdir(), 'dao_analyzer_spill')
+
+# DuckDB column types DataFrame.select_dtypes(include=np.number) would keep
+DUCKDB_INTEGER_TYPES = {
+    'TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT',
+    'UTINYINT', 'USMALLINT', 'UINTEGER', 'UBIGINT'
+}
+DUCKDB_NUMERIC_TYPES = DUCKDB_INTEGER_TYPES | {'FLOAT', 'DOUBLE'}
+# Rows DuckDB's CSV sniffer samples by default
+DUCKDB_SNIFF_ROWS = 20480
+
+
+def _describe_row(count, mean, std, minimum, quantiles, maximum) -> Dict[str, float]:
+    """One column of ``DataFrame.describe().to_dict()`` from query results"""
+    stats = {'count': count, 'mean': mean, 'std': std, 'min': minimum}
+    stats.update(zip(DESCRIBE_QUANTILES, quantiles))
+    stats['max'] = maximum
+    return {
+        key: float('nan') if value is None else float(value)
+        for key, value in stats.items()
+    }
+
+
+def _bounds(
+    counts: pd.DataFrame,
+) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp], pd.DataFrame]:
+    """First and last timestamp from per-group ``first``/``last`` columns,
+    and the counts without them"""
+    if counts.empty:
+        return None, None, counts
+    return (
+        counts['first'].min(),
+        counts['last'].max(),
+        counts.drop(columns=['first', 'last']),
+    )
+
+
+def _projected_columns(schema: DatasetSchema, header: List[str]) -> List[str]:
+    """Columns a DatasetSchema read keeps, in file order like ``usecols``"""
+    usecols = schema.read_kwargs(header).get('usecols', header)
+    return [col for col in header if col in usecols]
+
+
+class BackendTable(ABC):
+    """A dataset file opened by a ``ComputeBackend``.
+
+    Columns are projected like ``DatasetSchema`` reads them, the schema's
+    date column is exposed as naive UTC timestamps and float NaN counts as
+    missing, so every query returns what pandas computes on the frame the
+    providers load.
+    """
+
+    def __init__(self, columns: List[str]):
+        self.columns = columns
+
+    @abstractmethod
+    def summary(self) -> Dict[str, Any]:
+        """``record_count`` plus ``numeric_stats`` (keyed like
+        ``DataFrame.describe().to_dict()``), ``missing_values`` and
+        ``unique_values`` (like ``nunique``), in one pass over the file"""
+        pass
+
+    @abstractmethod
+    def rows_at(self, positions: np.ndarray) -> pd.DataFrame:
+        """The rows at sorted positions, as a (small) DataFrame"""
+        pass
+
+    @abstractmethod
+    def numeric_columns(self) -> List[str]:
+        pass
+
+    def _summary(
+        self, numeric_columns: List[str], values: List[Any], width: int
+    ) -> Dict[str, Any]:
+        """Split the values of a summary query: the row count, ``width``
+        statistics per numeric column, then missing and unique counts"""
+        described = values[1:1 + width * len(numeric_columns)]
+        counts = values[1 + width * len(numeric_columns):]
+        numeric_stats = {}
+        for i, col in enumerate(numeric_columns):
+            row = described[width * i:width * (i + 1)]
+            numeric_stats[col] = _describe_row(
+                row[0], row[1], row[2], row[3], row[4:-1], row[-1]
+            )
+        n = len(self.columns)
+        return {
+            'record_count': int(values[0]),
+            'numeric_stats': numeric_stats,
+            'missing_values': {
+                col: int(value) for col, value in zip(self.columns, counts[:n])
+            },
+            'unique_values': {
+                col: int(value) for col, value in zip(self.columns, counts[n:])
+            },
+        }
+
+    @abstractmethod
+    def value_counts(self, column: str) -> Dict[str, int]:
+        """Rows per non-missing value, most frequent first"""
+        pass
+
+    @abstractmethod
+    def daily_counts(
+        self, date_column: str, dimensions: List[str]
+    ) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp], pd.DataFrame]:
+        """First and last timestamp of ``date_column`` and its rows per day.
+
+        The frame has a ``day`` column (days since the epoch), one column
+        per dimension holding its values as strings, and ``count``. Both
+        come from one grouped pass over the file.
+        """
+        pass
+
+
+class ComputeBackend(ABC):
+    """Runs ``DAODataProcessor`` metrics as queries over a CSV or Parquet file"""
+
+    name = ''
+
+    @abstractmethod
+    def open(
+        self, path: Union[str, Path], schema: DatasetSchema
+    ) -> Iterator[BackendTable]:
+        """Context manager yielding the file as a ``BackendTable``"""
+        pass
+
+
+class DuckDBBackend(ComputeBackend):
+    """DuckDB SQL over the file, with projection and filters pushed into the
+    scan and operators spilling to disk past ``memory_limit``."""
+
+    name = 'duckdb'
+
+    def __init__(self,
+                 memory_limit: Optional[str] = None,
+                 temp_directory: Optional[str] = None,
+                 threads: Optional[int] = None):
+        """
+        Args:
+            memory_limit: DuckDB memory limit, e.g. '4GB'; DuckDB's default
+                (80% of RAM) if None
+            temp_directory: Spill directory (defaults to DEFAULT_SPILL_DIR)
+            threads: Worker threads; DuckDB's default (all cores) if None
+        """
+        # Imported here so duckdb stays an optional dependency
+        import duckdb  # noqa: F401
+        self.memory_limit = memory_limit
+        self.temp_directory = temp_directory or DEFAULT_SPILL_DIR
+        self.threads = threads
+
+    @contextmanager
+    def open(
+        self, path: Union[str, Path], schema: DatasetSchema
+    ) -> Iterator[BackendTable]:
+        import duckdb
+        config = {'temp_directory': str(self.temp_directory)}
+        if self.memory_limit:
+            config['memory_limit'] = self.memory_limit
+        if self.threads:
+            config['threads'] = self.threads
+        connection = duckdb.connect(config=config)
+        try:
+            connection.execute("SET TimeZone = 'UTC'")
+        except duckdb.Error:
+            # Without the icu extension time zones are UTC already
+            pass
+        try:
+            yield _DuckDBTable(connection, Path(path), schema)
+        finally:
+            connection.close()
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+class _DuckDBTable(BackendTable):
+
+    def __init__(self, connection, path: Path, schema: DatasetSchema):
+        self.connection = connection
+        literal = _literal(str(path))
+        if path.suffix == '.parquet':
+            scan = f"read_parquet({literal})"
+        else:
+            scan = self._csv_scan(literal)
+        types = self._describe(scan)
+        super().__init__(_projected_columns(schema, list(types)))
+        date_column = schema.resolve_date_column(pd.DataFrame(columns=self.columns))
+
+        selected = []
+        for col in self.columns:
+            if col == date_column:
+                expression = self._date_expression(_quote(col), types[col])
+            elif types[col] in ('FLOAT', 'DOUBLE'):
+                expression = (
+                    f"CASE WHEN isnan({_quote(col)}) THEN NULL ELSE {_quote(col)} END"
+                )
+            else:
+                expression = _quote(col)
+            selected.append(f"{expression} AS {_quote(col)}")
+        connection.execute(
+            f"CREATE VIEW dataset AS SELECT {', '.join(selected)} FROM {scan}"
+        )
+        self.types = self._describe('dataset')
+
+    def _describe(self, relation: str) -> Dict[str, str]:
+        rows = self.connection.execute(f"DESCRIBE SELECT * FROM {relation}").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def _csv_scan(self, literal: str) -> str:
+        """``read_csv`` call keeping hex columns (addresses) as text.
+
+        DuckDB's sniffer reads '0x...' values as integers where pandas
+        keeps strings, so integer columns whose sniffed values look hex
+        are read as VARCHAR.
+        """
+        scan = f"read_csv_auto({literal}, header=true)"
+        integers = [col for col, column_type in self._describe(scan).items()
+                    if column_type in DUCKDB_INTEGER_TYPES]
+        if not integers:
+            return scan
+        checks = ', '.join(
+            f"bool_or(lower({_quote(col)}) LIKE '0x%')" for col in integers
+        )
+        sample = (
+            f"(SELECT * FROM read_csv_auto({literal}, header=true, all_varchar=true) "
+            f"LIMIT {DUCKDB_SNIFF_ROWS})"
+        )
+        hex_flags = self.connection.execute(f"SELECT {checks} FROM {sample}").fetchone()
+        hex_columns = [col for col, is_hex in zip(integers, hex_flags) if is_hex]
+        if not hex_columns:
+            return scan
+        overrides = ', '.join(f"{_literal(col)}: 'VARCHAR'" for col in hex_columns)
+        return f"read_csv_auto({literal}, header=true, types={{{overrides}}})"
+
+    @staticmethod
+    def _date_expression(column: str, column_type: str) -> str:
+        """SQL parsing a column like ``DataProcessor.to_datetime_column``:
+        numbers as epoch seconds, text as dates, both to naive UTC"""
+        epoch = "epoch_ms(CAST(round({} * 1000) AS BIGINT))"
+        if column_type in DUCKDB_NUMERIC_TYPES or column_type.startswith('DECIMAL'):
+            return epoch.format(f"CAST({column} AS DOUBLE)")
+        if column_type.startswith('TIMESTAMP') or column_type == 'DATE':
+            return f"CAST({column} AS TIMESTAMP)"
+        number = f"TRY_CAST({column} AS DOUBLE)"
+        return (f"CASE WHEN {number} IS NOT NULL THEN {epoch.format(number)} "
+                f"ELSE CAST(TRY_CAST({column} AS TIMESTAMPTZ) AS TIMESTAMP) END")
+
+    def _scalars(self, expressions: List[str]) -> List[Any]:
+        if not expressions:
+            return []
+        return list(self.connection.execute(
+            f"SELECT {', '.join(expressions)} FROM dataset"
+        ).fetchone())
+
+    def rows_at(self, positions: np.ndarray) -> pd.DataFrame:
+        self.connection.register(
+            'positions', pd.DataFrame({'_row': positions.astype(np.int64)})
+        )
+        try:
+            return self.connection.execute(
+                "SELECT * EXCLUDE (_row) FROM "
+                "(SELECT *, row_number() OVER () - 1 AS _row FROM dataset) "
+                "WHERE _row IN (SELECT _row FROM positions) ORDER BY _row"
+            ).df()
+        finally:
+            self.connection.unregister('positions')
+
+    def numeric_columns(self) -> List[str]:
+        return [
+            col
+            for col in self.columns
+            if self.types[col] in DUCKDB_NUMERIC_TYPES
+            or self.types[col].startswith('DECIMAL')
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        numeric_columns = self.numeric_columns()
+        expressions = ['count(*)']
+        for col in numeric_columns:
+            column = _quote(col)
+            expressions += [
+                f"count({column})",
+                f"avg({column})",
+                f"stddev_samp({column})",
+                f"min({column})",
+            ]
+            expressions += [
+                f"quantile_cont({column}, {q})" for q in DESCRIBE_QUANTILES.values()
+            ]
+            expressions.append(f"max({column})")
+        expressions += [f"count(*) - count({_quote(col)})" for col in self.columns]
+        expressions += [f"count(DISTINCT {_quote(col)})" for col in self.columns]
+        return self._summary(
+            numeric_columns, self._scalars(expressions), 5 + len(DESCRIBE_QUANTILES)
+        )
+
+    def value_counts(self, column: str) -> Dict[str, int]:
+        rows = self.connection.execute(
+            f"SELECT CAST({_quote(column)} AS VARCHAR), count(*) AS n FROM dataset "
+            f"WHERE {_quote(column)} IS NOT NULL GROUP BY 1 ORDER BY n DESC"
+        ).fetchall()
+        return {key: int(count) for key, count in rows}
+
+    def daily_counts(
+        self, date_column: str, dimensions: List[str]
+    ) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp], pd.DataFrame]:
+        parsed = self._date_expression(_quote(date_column), self.types[date_column])
+        keys = [
+            f"CAST({_quote(dim)} AS VARCHAR) AS {_quote(dim)}" for dim in dimensions
+        ]
+        counts = self.connection.execute(
+            f"SELECT datediff('day', DATE '1970-01-01', CAST(parsed AS DATE)) AS day, "
+            f"{''.join(key + ', ' for key in keys)}count(*) AS count, "
+            f"min(parsed) AS first, max(parsed) AS last "
+            f"FROM (SELECT *, {parsed} AS parsed FROM dataset) "
+            f"WHERE parsed IS NOT NULL GROUP BY ALL"
+        ).df()
+        return _bounds(counts)
+
+
+class PolarsBackend(ComputeBackend):
+    """Polars lazy queries over the file, run on the streaming engine so
+    tables larger than memory are processed in batches."""
+
+    name = 'polars'
+
+    def __init__(self, streaming: bool = True):
+        """
+        Args:
+            streaming: Collect queries with the streaming engine
+        """
+        # Imported here so polars stays an optional dependency
+        import polars  # noqa: F401
+        self.streaming = streaming
+
+    @contextmanager
+    def open(
+        self, path: Union[str, Path], schema: DatasetSchema
+    ) -> Iterator[BackendTable]:
+        yield _PolarsTable(Path(path), schema, self.streaming)
+
+
+class _PolarsTable(BackendTable):
+
+    def __init__(self, path: Path, schema: DatasetSchema, streaming: bool):
+        import polars as pl
+        self.pl = pl
+        self.streaming = streaming
+        frame = (pl.scan_parquet(path) if path.suffix == '.parquet'
+                 else pl.scan_csv(path, infer_schema_length=10000))
+        types = self._schema(frame)
+        super().__init__(_projected_columns(schema, list(types)))
+        date_column = schema.resolve_date_column(pd.DataFrame(columns=self.columns))
+
+        expressions = []
+        for col in self.columns:
+            if col == date_column:
+                expressions.append(self._date_expression(col, types[col]).alias(col))
+            elif types[col].is_float():
+                expressions.append(pl.col(col).fill_nan(None))
+            else:
+                expressions.append(pl.col(col))
+        self.frame = frame.select(expressions)
+        self.types = self._schema(self.frame)
+
+    @staticmethod
+    def _schema(frame) -> Dict[str, Any]:
+        schema = (
+            frame.collect_schema() if hasattr(frame, 'collect_schema') else frame.schema
+        )
+        return dict(schema.items())
+
+    def _date_expression(self, col: str, dtype):
+        """Expression parsing a column like ``DataProcessor.to_datetime_column``:
+        numbers as epoch seconds, text as dates, both to naive UTC"""
+        pl = self.pl
+        column = pl.col(col)
+
+        def epoch(values):
+            return pl.from_epoch(
+                (values.cast(pl.Float64) * 1000).round(0).cast(pl.Int64), time_unit='ms'
+            )
+
+        if dtype.is_numeric():
+            return epoch(column)
+        if dtype == pl.Date:
+            return column.cast(pl.Datetime('us'))
+        if dtype == pl.Datetime:
+            if getattr(dtype, 'time_zone', None):
+                return column.dt.convert_time_zone('UTC').dt.replace_time_zone(None)
+            return column
+        number = column.cast(pl.Float64, strict=False)
+        text = column.str.to_datetime(time_unit='us', time_zone='UTC', strict=False)
+        return (pl.when(number.is_not_null()).then(epoch(number))
+                .otherwise(text.dt.replace_time_zone(None)))
+
+    def _collect(self, frame):
+        if not self.streaming:
+            return frame.collect()
+        try:
+            return frame.collect(engine='streaming')
+        except TypeError:
+            # Polars before 1.0 selects the streaming engine with a flag
+            return frame.collect(streaming=True)
+
+    def _scalars(self, expressions: list) -> List[Any]:
+        if not expressions:
+            return []
+        return list(self._collect(self.frame.select(expressions)).row(0))
+
+    def rows_at(self, positions: np.ndarray) -> pd.DataFrame:
+        pl = self.pl
+        rows = (self.frame.with_row_index('_row')
+                .filter(pl.col('_row').is_in(positions.tolist()))
+                .sort('_row')
+                .drop('_row'))
+        return self._collect(rows).to_pandas()
+
+    def numeric_columns(self) -> List[str]:
+        return [col for col in self.columns if self.types[col].is_numeric()]
+
+    def summary(self) -> Dict[str, Any]:
+        pl = self.pl
+        numeric_columns = self.numeric_columns()
+        expressions = [pl.len()]
+        for col in numeric_columns:
+            column = pl.col(col)
+            expressions += [column.count(), column.mean(), column.std(), column.min()]
+            expressions += [column.quantile(q, interpolation='linear')
+                            for q in DESCRIBE_QUANTILES.values()]
+            expressions.append(column.max())
+        expressions += [pl.col(col).null_count() for col in self.columns]
+        expressions += [pl.col(col).drop_nulls().n_unique() for col in self.columns]
+        # Output names must be unique within one select
+        expressions = [
+            expression.alias(str(i)) for i, expression in enumerate(expressions)
+        ]
+        return self._summary(
+            numeric_columns, self._scalars(expressions), 5 + len(DESCRIBE_QUANTILES)
+        )
+
+    def value_counts(self, column: str) -> Dict[str, int]:
+        pl = self.pl
+        counts = self._collect(
+            self.frame.filter(pl.col(column).is_not_null())
+            .group_by(pl.col(column).cast(pl.Utf8))
+            .agg(pl.len().alias('count'))
+            .sort('count', descending=True)
+        )
+        return {key: int(count) for key, count in counts.iter_rows()}
+
+    def daily_counts(
+        self, date_column: str, dimensions: List[str]
+    ) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp], pd.DataFrame]:
+        pl = self.pl
+        parsed = self._date_expression(date_column, self.types[date_column])
+        counts = self._collect(
+            self.frame.with_columns(parsed.alias('_parsed'))
+            .filter(pl.col('_parsed').is_not_null())
+            .group_by([pl.col('_parsed').cast(pl.Date).cast(pl.Int32).alias('day')]
+                      + [pl.col(dim).cast(pl.Utf8) for dim in dimensions])
+            .agg(pl.len().alias('count'),
+                 pl.col('_parsed').min().alias('first'),
+                 pl.col('_parsed').max().alias('last'))
+        )
+        return _bounds(counts.to_pandas())
+
+
+def get_backend(name: str, **options) -> Optional[ComputeBackend]:
+    """The backend named ``name``, or None for the in-memory pandas path.
+
+    Raises ImportError when the backend's package is not installed.
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend {name}; expected one of {list(BACKENDS)}")
+    if name == 'duckdb':
+        return DuckDBBackend(**options)
+    if name == 'polars':
+        return PolarsBackend(**options)
+    return None
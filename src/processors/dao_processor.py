@@ -1,112 +1,537 @@
-from typing import Dict, Any
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
 
 # Assuming DataProcessor is defined in a module named data_processor_base
 from src.utils.data_processing import DataProcessor
+from src.core.base import DataProcessor as BaseDataProcessor
+from src.core.instrumentation import instrumentation, traced
+from src.data.schema import DatasetSchema
+from src.processors.backends import BackendTable, get_backend
+from src.processors.sampling import CONFIDENCE_LEVEL, CSVSample, CSVSampler
+from src.processors.stream_accumulators import (
+    GROUP_DIMENSIONS,
+    DailyCounts,
+    StreamState,
+)
+from src.utils.hyperloglog import HyperLogLog
 import pandas as pd
 from datetime import datetime
 import numpy as np
 import logging
+import re
 
+# Rows sampled when scoring candidate date columns
+DETECTION_SAMPLE_SIZE = 1000
+# Minimum share of date-like sampled values for a column to qualify
+DATE_SCORE_THRESHOLD = 0.9
+# Plausible epoch seconds: 2009-01-01 (first Bitcoin block) to 2050-01-01
+EPOCH_SECONDS_RANGE = (1230768000, 2524608000)
+ISO_DATE_PATTERN = re.compile(
+    r'^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?(Z|[+-]\d{2}:?\d{2})?$'
+)
+DATE_NAME_PATTERN = re.compile(r'(date|time|At$)', re.IGNORECASE)
 
-class DAODataProcessor(DataProcessor):
-    def __init__(self):
+class DAODataProcessor(DataProcessor, BaseDataProcessor):
+
+    def __init__(
+        self,
+        approximate: bool = False,
+        hll_precision: int = 14,
+        backend: str = 'pandas',
+        backend_options: Optional[Dict[str, Any]] = None,
+        sample_rows: Optional[int] = None,
+        sample_seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            approximate: Estimate distinct counts with HyperLogLog sketches
+                instead of exact ``nunique``
+            hll_precision: Sketch precision (index bits) in approximate mode
+            backend: Engine ``process_path`` computes metrics with: 'pandas'
+                (in memory), or 'duckdb' or 'polars' (queries over the file)
+            backend_options: Keyword arguments for the backend, e.g.
+                ``{'memory_limit': '4GB'}`` for duckdb
+            sample_rows: If set, ``process_path`` processes a stratified
+                sample of about this many rows and scales counts back up
+            sample_seed: Seed of the sample, for repeatable quick looks
+        """
         self.logger = logging.getLogger(__name__)
+        self.approximate = approximate
+        self.hll_precision = hll_precision
+        self.backend = backend
+        self.compute = get_backend(backend, **(backend_options or {}))
+        if self.compute is not None and approximate:
+            raise ValueError(
+                f"Approximate unique counts need the pandas backend, not {backend}"
+            )
+        if self.compute is not None and sample_rows:
+            raise ValueError(f"Sampling needs the pandas backend, not {backend}")
+        self.sample_rows = sample_rows
+        self.sample_seed = sample_seed
+        self._dates_cache: Dict[Tuple[int, str], pd.Series] = {}
+
     """Processes DAO-related datasets with various metrics"""
-    
+
     def process(self, df: pd.DataFrame, metadata: Dict[str, Any]) -> Dict[str, Any]:
         dataset_name = metadata.get('name', '')
+        sketches = self._build_sketches(df) if self.approximate else None
+        try:
+            results = {
+                'dataset_name': dataset_name,
+                'record_count': len(df),
+                'columns': df.columns.tolist(),
+                'summary': self._get_summary_stats(df, sketches),
+                'temporal_analysis': self._get_temporal_analysis(df),
+                'network_stats': self._get_network_stats(df, sketches)
+            }
+
+            if results['temporal_analysis'].get('has_temporal_data'):
+                results['time_series'] = self._get_time_series_analysis(
+                    df, 
+                    results['temporal_analysis']['date_column']
+                )
+        finally:
+            self._dates_cache.clear()
+
+        return results
+
+    @property
+    def reads_files(self) -> bool:
+        """Whether datasets should be handed over as paths (``process_path``)"""
+        return self.compute is not None or bool(self.sample_rows)
+
+    def config_fingerprint(self, name: str) -> str:
+        """Identifier of the options that shape a dataset's result, so
+        stored results are only reused by a processor configured alike"""
+        options = {
+            'approximate': self.approximate,
+            'hll_precision': self.hll_precision,
+            'backend': self.backend,
+            'sample_rows': self.sample_rows,
+            'schema': DatasetSchema.for_dataset(name).fingerprint()
+        }
+        return hashlib.md5(json.dumps(options, sort_keys=True).encode()).hexdigest()[
+            :12
+        ]
+
+    def process_path(
+        self, path: Union[str, Path], metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Process a CSV or Parquet file with the configured backend.
+
+        The pandas backend reads the file with the dataset's schema and
+        calls ``process``. DuckDB and Polars query the file in place, with
+        the schema's projection pushed into the scan, and never hold the
+        table in memory. Both return the same dict.
+
+        With ``sample_rows`` set, a CSV is sampled instead (``process_sample``).
+        """
+        path = Path(path)
+        schema = DatasetSchema.for_dataset(path.stem)
+        if self.sample_rows and path.suffix != '.parquet':
+            return self.process_sample(path, metadata, schema)
+        if self.compute is None:
+            if path.suffix == '.parquet':
+                df = schema.compact(pd.read_parquet(path))
+            else:
+                df, _ = schema.read_csv(path)
+            return self.process(df, metadata)
+        with self.compute.open(path, schema) as table:
+            return self._process_table(table, metadata)
+
+    def _process_table(
+        self, table: BackendTable, metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """``process`` computed by backend queries instead of pandas"""
+        summary = table.summary()
+        record_count = summary.pop('record_count')
+        # Score date columns on the same rows _score_date_columns samples
+        if record_count > DETECTION_SAMPLE_SIZE:
+            positions = np.linspace(0, record_count - 1, DETECTION_SAMPLE_SIZE).astype(
+                int
+            )
+        else:
+            positions = np.arange(record_count)
+        try:
+            temporal_analysis = self._get_temporal_analysis(table.rows_at(positions))
+        finally:
+            self._dates_cache.clear()
+
+        network_stats = {}
+        address_columns = [col for col in table.columns if 'address' in col.lower()]
+        if address_columns:
+            network_stats['address_columns'] = {
+                col: summary['unique_values'][col] for col in address_columns
+            }
+        if 'network' in table.columns:
+            network_stats['networks'] = table.value_counts('network')
+
         results = {
-            'dataset_name': dataset_name,
-            'record_count': len(df),
-            'columns': df.columns.tolist(),
-            'summary': self._get_summary_stats(df),
-            'temporal_analysis': self._get_temporal_analysis(df),
-            'network_stats': self._get_network_stats(df)
+            'dataset_name': metadata.get('name', ''),
+            'record_count': record_count,
+            'columns': list(table.columns),
+            'summary': summary,
+            'temporal_analysis': temporal_analysis,
+            'network_stats': network_stats
+        }
+        if temporal_analysis.get('has_temporal_data'):
+            results['time_series'] = self._get_table_time_series(
+                table, temporal_analysis['date_column']
+            )
+        return results
+
+    def process_sample(self, path: Union[str, Path], metadata: Dict[str, Any],
+                       schema: Optional[DatasetSchema] = None) -> Dict[str, Any]:
+        """Quick look at a CSV from a stratified sample of its rows.
+
+        ``CSVSampler`` reads a bounded number of bytes whatever the file
+        size, stratified by network and month. The sample goes through
+        ``process``; then record_count, missing values, network counts
+        and the monthly and daily activity are replaced by estimates of
+        the whole file. Their 95% bounds are under ``sampling``. Other
+        statistics (numeric summaries, unique counts) describe the sample.
+        """
+        path = Path(path)
+        schema = schema or DatasetSchema.for_dataset(path.stem)
+        date_column: List[Optional[str]] = []
+
+        def dates(block: pd.DataFrame) -> Optional[pd.Series]:
+            # The date column is detected on the first block read
+            try:
+                if not date_column:
+                    date_column.append(
+                        self._get_temporal_analysis(block).get('date_column')
+                    )
+                return (
+                    self._get_dates(block, date_column[0]) if date_column[0] else None
+                )
+            finally:
+                self._dates_cache.clear()
+
+        sampler = CSVSampler(self.sample_rows, seed=self.sample_seed)
+        with instrumentation.span(
+            'sample_csv', 'io', dataset=metadata.get('name', '')
+        ) as span:
+            sample = sampler.sample(path, schema, dates)
+            span.set(rows=len(sample.frame), bytes_read=sample.bytes_read)
+        results = self.process(sample.frame, metadata)
+        return self._scale_sample(results, sample)
+
+    def _scale_sample(
+        self, results: Dict[str, Any], sample: CSVSample
+    ) -> Dict[str, Any]:
+        """Replace the counts of a sample's ``process`` results with
+        estimates for the whole file and attach their bounds"""
+        record_count, record_count_bounds = sample.record_count()
+        _, completeness_bounds = sample.completeness()
+        results['record_count'] = int(round(record_count))
+        results['summary']['missing_values'] = {
+            col: int(round(count)) for col, count in sample.missing_values().items()
+            if col in results['columns']
+        }
+        sampling = {
+            'sample_rows': len(sample.frame),
+            'rows_read': sample.rows_read,
+            'blocks_read': sample.blocks_read,
+            'blocks': sample.blocks,
+            'bytes_read': sample.bytes_read,
+            'confidence': CONFIDENCE_LEVEL,
+            'record_count_bounds': record_count_bounds,
+            'completeness_bounds': completeness_bounds
+        }
+
+        networks = sample.network_counts()
+        if networks:
+            results['network_stats']['networks'] = {
+                network: int(round(count)) for network, (count, _) in networks.items()
+            }
+            sampling['network_bounds'] = {
+                network: bounds for network, (_, bounds) in networks.items()
+            }
+
+        time_series = results.get('time_series')
+        if time_series and 'error' not in time_series:
+            monthly, monthly_bounds = sample.monthly_counts()
+            time_series['monthly_activity'] = monthly.round().astype('int64').to_dict()
+            time_series['total_months'] = len(monthly)
+            time_series['daily_counts'] = sample.daily_counts().to_dict()
+            sampling['monthly_activity_bounds'] = monthly_bounds
+        results['sampling'] = sampling
+        return results
+
+    @traced()
+    def _get_table_time_series(
+        self, table: BackendTable, date_column: str
+    ) -> Dict[str, Any]:
+        """``_get_time_series_analysis`` from a backend's daily counts"""
+        try:
+            dimensions = [dim for dim in GROUP_DIMENSIONS if dim in table.columns]
+            start, end, counts = table.daily_counts(date_column, dimensions)
+            daily = DailyCounts()
+            daily.update_counts(counts)
+            monthly = daily.monthly_series()
+            return {
+                'monthly_activity': monthly.to_dict(),
+                'total_months': len(monthly),
+                'start_date': pd.Timestamp(start).isoformat(),
+                'end_date': pd.Timestamp(end).isoformat(),
+                'daily_counts': daily.to_dict()
+            }
+        except Exception as e:
+            self.logger.error(f"Error in time series analysis: {str(e)}")
+            return {'error': str(e)}
+
+    def process_stream(
+        self, chunks: Iterable[pd.DataFrame], metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Process a dataset delivered as an iterator of chunks
+        (e.g. ``pd.read_csv(path, chunksize=...)``) with bounded memory.
+
+        Returns a dict shaped like ``process``. Numeric quartiles are
+        estimated from a bounded sample of each column (exact for short
+        columns). Unique value counts need ``approximate=True``, since they
+        cannot be exact in bounded memory.
+        """
+        state = self.new_stream_state()
+        for chunk in chunks:
+            self.update_stream_state(state, chunk)
+        return self.finalize_stream_state(state, metadata)
+
+    def new_stream_state(self, sketches: Optional[bool] = None) -> StreamState:
+        """Empty streaming state matching this processor's settings.
+
+        Args:
+            sketches: Keep HyperLogLog sketches for unique counts; defaults
+                to ``approximate``
+        """
+        sketches = self.approximate if sketches is None else sketches
+        return StreamState(self.hll_precision if sketches else None)
+
+    def update_stream_state(self, state: StreamState, chunk: pd.DataFrame) -> None:
+        """Fold one chunk into a streaming state"""
+        if not state.temporal_analysis.get('has_temporal_data'):
+            state.temporal_analysis = self._get_temporal_analysis(chunk)
+
+        dates = None
+        date_column = state.temporal_analysis.get('date_column')
+        try:
+            if date_column in chunk.columns:
+                dates = self._get_dates(chunk, date_column)
+        except Exception as e:
+            self.logger.error(f"Error parsing dates in chunk: {str(e)}")
+        finally:
+            self._dates_cache.clear()
+        state.update(chunk, dates)
+
+    def finalize_stream_state(
+        self, state: StreamState, metadata: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build a ``process``-shaped result dict from a streaming state"""
+        summary = {
+            'numeric_stats': {col: acc.to_dict() for col, acc in state.numeric.items()},
+            'missing_values': {
+                col: int(state.missing_values[col]) for col in state.columns
+            },
+            'unique_values': {},
         }
-        
-        if 'date' in results['temporal_analysis']:
-            results['time_series'] = self._get_time_series_analysis(
-                df, 
-                results['temporal_analysis']['date_column']
+        network_stats = {}
+        if state.sketches is not None:
+            summary.update(self._sketch_summary(state.sketches))
+            network_stats.update(
+                self._address_sketch_stats(state.columns, state.sketches)
             )
-        
+        if state.networks:
+            network_stats['networks'] = dict(state.networks.most_common())
+
+        results = {
+            'dataset_name': metadata.get('name', ''),
+            'record_count': state.record_count,
+            'columns': list(state.columns),
+            'summary': summary,
+            'temporal_analysis': state.temporal_analysis,
+            'network_stats': network_stats
+        }
+
+        if (
+            state.temporal_analysis.get('has_temporal_data')
+            and state.monthly.start is not None
+        ):
+            monthly = state.monthly.to_series()
+            results['time_series'] = {
+                'monthly_activity': monthly.to_dict(),
+                'total_months': len(monthly),
+                'start_date': state.monthly.start.isoformat(),
+                'end_date': state.monthly.end.isoformat()
+            }
+            if state.daily is not None:
+                results['time_series']['daily_counts'] = state.daily.to_dict()
+
         return results
 
-    def _get_summary_stats(self, df: pd.DataFrame) -> Dict[str, Any]:
+    @traced()
+    def _get_summary_stats(
+        self, df: pd.DataFrame, sketches: Optional[Dict[str, HyperLogLog]] = None
+    ) -> Dict[str, Any]:
         """Get basic summary statistics for the dataset"""
         numeric_cols = df.select_dtypes(include=[np.number]).columns
-        return {
+        summary = {
             'numeric_stats': df[numeric_cols].describe().to_dict() if len(numeric_cols) > 0 else {},
-            'missing_values': df.isnull().sum().to_dict(),
-            'unique_values': {col: df[col].nunique() for col in df.columns}
+            'missing_values': df.isnull().sum().to_dict()
+        }
+        if sketches is not None:
+            summary.update(self._sketch_summary(sketches))
+        else:
+            summary['unique_values'] = {col: df[col].nunique() for col in df.columns}
+        return summary
+
+    @traced()
+    def _build_sketches(self, df: pd.DataFrame) -> Dict[str, HyperLogLog]:
+        """Build one HyperLogLog sketch per column"""
+        return {col: HyperLogLog(self.hll_precision).add(df[col]) for col in df.columns}
+
+    def _sketch_summary(self, sketches: Dict[str, HyperLogLog]) -> Dict[str, Any]:
+        """Approximate unique counts with 95% bounds from column sketches"""
+        return {
+            'unique_values': {col: sketch.count() for col, sketch in sketches.items()},
+            'unique_values_bounds': {
+                col: list(sketch.bounds()) for col, sketch in sketches.items()
+            },
+            'unique_values_error': HyperLogLog.standard_error(self.hll_precision),
         }
 
+    def _address_sketch_stats(self, columns: List[str],
+                              sketches: Dict[str, HyperLogLog]) -> Dict[str, Any]:
+        """Approximate address column counts plus serialized sketches for unions"""
+        address_columns = [col for col in columns if 'address' in col.lower()]
+        if not address_columns:
+            return {}
+        return {
+            'address_columns': {col: sketches[col].count() for col in address_columns},
+            'address_sketches': {
+                col: sketches[col].to_base64() for col in address_columns
+            },
+        }
+
+    @traced()
     def _get_temporal_analysis(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Identify and analyze temporal aspects of the data"""
-        date_columns = []
-        date_column = None
-        
+        """Identify and analyze temporal aspects of the data.
+
+        Candidate columns are scored on a small sample of rows, the best one
+        is parsed once and the parsed series is cached for later stages.
+        """
+        scores = self._score_date_columns(df)
+        if not scores:
+            return {'has_temporal_data': False}
+
+        date_columns = sorted(scores, key=scores.get, reverse=True)
+        date_column = date_columns[0]
+        self._get_dates(df, date_column)
+        return {
+            'has_temporal_data': True,
+            'date_columns': date_columns,
+            'date_column': date_column
+        }
+
+    def _score_date_columns(self, df: pd.DataFrame) -> Dict[str, float]:
+        """Score columns by how date-like a sample of their values is.
+
+        The score is the share of sampled values that are plausible epoch
+        seconds or ISO dates, plus a bonus for well-known date column names.
+        Columns below DATE_SCORE_THRESHOLD are left out.
+        """
+        if len(df) > DETECTION_SAMPLE_SIZE:
+            positions = np.linspace(0, len(df) - 1, DETECTION_SAMPLE_SIZE).astype(int)
+            sample = df.iloc[positions]
+        else:
+            sample = df
+
+        scores = {}
         for col in df.columns:
-            try:
-                # First try to convert numeric timestamps
-                if pd.api.types.is_numeric_dtype(df[col]):
-                    pd.to_datetime(df[col], unit='s')
-                    date_columns.append(col)
-                    date_column = col
-                    break
-                # Then try string dates
-                elif pd.api.types.is_string_dtype(df[col]):
-                    pd.to_datetime(df[col])
-                    date_columns.append(col)
-                    date_column = col
-                    break
-            except:
+            values = sample[col].dropna()
+            if len(values) == 0:
                 continue
-        
-        if date_column:
-            return {
-                'has_temporal_data': True,
-                'date_columns': date_columns,
-                'date_column': date_column
-            }
-        
-        return {'has_temporal_data': False}
+            score = self._date_likeness(values)
+            if score < DATE_SCORE_THRESHOLD:
+                continue
+            if col in self.DATE_COLUMNS:
+                score += (
+                    1 + (len(self.DATE_COLUMNS) - self.DATE_COLUMNS.index(col)) / 10
+                )
+            elif DATE_NAME_PATTERN.search(str(col)):
+                score += 0.5
+            scores[col] = score
+        return scores
+
+    def _date_likeness(self, values: pd.Series) -> float:
+        """Share of values that look like epoch seconds or ISO dates"""
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return 1.0
+        if pd.api.types.is_bool_dtype(values):
+            return 0.0
+        if pd.api.types.is_numeric_dtype(values):
+            numbers = values.astype(float)
+        else:
+            text = values.astype(str).str.strip()
+            iso = text.str.match(ISO_DATE_PATTERN)
+            numbers = pd.to_numeric(text[~iso], errors='coerce')
+            return (iso.sum() + numbers.between(*EPOCH_SECONDS_RANGE).sum()) / len(
+                values
+            )
+        return numbers.between(*EPOCH_SECONDS_RANGE).sum() / len(values)
 
-    def _get_network_stats(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _get_dates(self, df: pd.DataFrame, date_column: str) -> pd.Series:
+        """Parsed date column, computed once per DataFrame and column"""
+        key = (id(df), date_column)
+        if key not in self._dates_cache:
+            self._dates_cache[key] = self._parse_dates(df[date_column])
+        return self._dates_cache[key]
+
+    @traced()
+    def _get_network_stats(
+        self, df: pd.DataFrame, sketches: Optional[Dict[str, HyperLogLog]] = None
+    ) -> Dict[str, Any]:
         """Get network-related statistics if applicable"""
         network_stats = {}
-        
+
         # Check for network/address columns
         address_columns = [col for col in df.columns if 'address' in col.lower()]
-        if address_columns:
+        if sketches is not None:
+            network_stats.update(self._address_sketch_stats(df.columns, sketches))
+        elif address_columns:
             network_stats['address_columns'] = {
                 col: df[col].nunique() for col in address_columns
             }
-        
+
         # Check for network type if present
         if 'network' in df.columns:
             network_stats['networks'] = df['network'].value_counts().to_dict()
-            
+
         return network_stats
 
+    @traced()
     def _get_time_series_analysis(self, df: pd.DataFrame, date_column: str) -> Dict[str, Any]:
         """Perform time series analysis on temporal data"""
         try:
-            # Convert to datetime based on column type
-            if pd.api.types.is_numeric_dtype(df[date_column]):
-                dates = pd.to_datetime(df[date_column].astype(float), unit='s')
-            else:
-                dates = pd.to_datetime(df[date_column])
-            
-            # Group by month
-            monthly = pd.DataFrame({'date': dates}).resample('M', on='date').size()
-            
+            dates = self._get_dates(df, date_column)
+
+            # Count per day (and network/platform) once; months are sums of days
+            daily = DailyCounts()
+            daily.update(dates, df)
+            monthly = daily.monthly_series()
+
             return {
                 'monthly_activity': monthly.to_dict(),
                 'total_months': len(monthly),
                 'start_date': dates.min().isoformat(),
-                'end_date': dates.max().isoformat()
+                'end_date': dates.max().isoformat(),
+                'daily_counts': daily.to_dict()
             }
         except Exception as e:
             self.logger.error(f"Error in time series analysis: {str(e)}")
             return {'error': str(e)}
+
+    def _parse_dates(self, values: pd.Series) -> pd.Series:
+        """Convert a date column to datetime based on its type"""
+        return self.to_datetime_column(values)
@@ -0,0 +1,473 @@
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
+import io
+import logging
+import math
+
+import numpy as np
+import pandas as pd
+
+from src.data.schema import DatasetSchema
+from src.processors.stream_accumulators import GROUP_DIMENSIONS, DailyCounts
+
+# Byte ranges of a CSV read per sample; enough clusters for a stable
+# between-block variance, few enough to stay one short forward pass
+SAMPLE_BLOCKS = 64
+# Smallest block read, so files of short rows still come in useful runs
+MIN_BLOCK_BYTES = 64 * 1024
+# Leading bytes read to measure the average row width
+PROBE_BYTES = 64 * 1024
+# Rows read per sampled row, leaving the reservoir room to balance strata
+OVERSAMPLING = 4
+# Rows kept of every (network, month) stratum however many strata there are
+MIN_STRATUM_ROWS = 20
+# Two-sided 95% normal quantile
+CONFIDENCE_LEVEL = 0.95
+CONFIDENCE_Z = 1.959964
+# Stratum keys pack the network code above 32 bits of month ordinal;
+# 0 in the low bits means no parseable date
+MONTH_OFFSET = 2 ** 20
+MONTH_MASK = 2 ** 32 - 1
+
+# Helper columns carried by reservoir rows
+STRATUM_COLUMN = '__stratum'
+PRIORITY_COLUMN = '__priority'
+DAY_COLUMN = '__day'
+
+
+def estimate_totals(per_block: np.ndarray, certain: np.ndarray,
+                    blocks: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Horvitz-Thompson totals and variances from the per-block totals of
+    the blocks read (one column per quantity). Blocks read with certainty
+    add their totals as they are; the others are a simple random sample
+    of the remaining blocks."""
+    per_block = np.asarray(per_block, dtype=np.float64).reshape(len(certain), -1)
+    sampled = per_block[~certain]
+    m, population = len(sampled), blocks - int(certain.sum())
+    estimate = per_block[certain].sum(axis=0)
+    variance = np.zeros(per_block.shape[1])
+    if m:
+        estimate = estimate + population / m * sampled.sum(axis=0)
+        if m < population:
+            # With one sampled block there is no spread to measure
+            variance = (
+                population**2 * (1 - m / population) * sampled.var(axis=0, ddof=1) / m
+                if m > 1
+                else np.full(per_block.shape[1], np.nan)
+            )
+    return estimate, variance
+
+
+class CSVSample:
+    """Rows drawn by ``CSVSampler`` plus the tallies needed to scale them up.
+
+    Every row read belongs to exactly one block. The full blocks read are
+    a simple random sample of the file's full blocks and the last, partial
+    block is always read, so per-block tallies give Horvitz-Thompson
+    estimates of population totals and a between-block (cluster)
+    variance. Rows kept in ``frame`` carry the estimated size of their
+    stratum divided by the rows kept of it.
+    """
+
+    def __init__(self,
+                 frame: pd.DataFrame,
+                 weights: np.ndarray,
+                 days: np.ndarray,
+                 blocks: int,
+                 certain: np.ndarray,
+                 block_rows: np.ndarray,
+                 block_strata: np.ndarray,
+                 block_missing: pd.DataFrame,
+                 strata: np.ndarray,
+                 networks: List[str],
+                 bytes_read: int):
+        """
+        Args:
+            frame: Sampled rows
+            weights: Rows of the file each sampled row stands for
+            days: Days since the epoch of the sampled rows (int64 min if undated)
+            blocks: Blocks in the file
+            certain: Per block read, whether it was read with certainty
+            block_rows: Rows per block read
+            block_strata: Rows per (block read, stratum)
+            block_missing: Missing values per (block read, column)
+            strata: Stratum keys, packing network code and month
+            networks: Network of every network code
+            bytes_read: Bytes read from the file
+        """
+        self.frame = frame
+        self.weights = weights
+        self.days = days
+        self.blocks = blocks
+        self.certain = certain
+        self.block_rows = block_rows
+        self.block_strata = block_strata
+        self.block_missing = block_missing
+        self.strata = strata
+        self.networks = networks
+        self.bytes_read = bytes_read
+
+    @property
+    def blocks_read(self) -> int:
+        return len(self.block_rows)
+
+    @property
+    def rows_read(self) -> int:
+        return int(self.block_rows.sum())
+
+    def estimate(self, per_block: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Estimated population totals and their variances from per-block
+        totals (one column per quantity)"""
+        return estimate_totals(per_block, self.certain, self.blocks)
+
+    def totals(
+        self, per_block: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Estimated population totals with normal bounds. Bounds are
+        never below what the blocks read hold."""
+        per_block = np.asarray(per_block, dtype=np.float64).reshape(
+            self.blocks_read, -1
+        )
+        estimate, variance = self.estimate(per_block)
+        margin = CONFIDENCE_Z * np.sqrt(variance)
+        return (
+            estimate,
+            np.maximum(estimate - margin, per_block.sum(axis=0)),
+            estimate + margin,
+        )
+
+    def record_count(self) -> Tuple[float, List[float]]:
+        estimate, lower, upper = self.totals(self.block_rows)
+        return float(estimate[0]), [float(lower[0]), float(upper[0])]
+
+    def missing_values(self) -> Dict[str, float]:
+        """Estimated missing values per column"""
+        estimate, _ = self.estimate(self.block_missing.to_numpy(dtype=np.float64))
+        return dict(zip(self.block_missing.columns, estimate.tolist()))
+
+    def completeness(self) -> Tuple[float, List[float]]:
+        """Share of non-missing cells as a ratio estimate with bounds
+        (variance by linearization)"""
+        missing = self.block_missing.to_numpy(dtype=np.float64).sum(axis=1)
+        cells = self.block_rows.astype(np.float64) * self.block_missing.shape[1]
+        (missing_total, cells_total), _ = self.estimate(
+            np.column_stack([missing, cells])
+        )
+        if not cells_total:
+            return 0.0, [0.0, 0.0]
+        ratio = missing_total / cells_total
+        _, variance = self.estimate(missing - ratio * cells)
+        margin = CONFIDENCE_Z * math.sqrt(variance[0]) / cells_total
+        return 1 - ratio, [max(0.0, 1 - ratio - margin), min(1.0, 1 - ratio + margin)]
+
+    def network_counts(self) -> Dict[str, Tuple[float, List[float]]]:
+        """Estimated rows per network, largest first"""
+        codes = (self.strata >> 32) - 1
+        per_block = self._aggregate(codes, len(self.networks))
+        estimate, lower, upper = self.totals(per_block)
+        counts = {
+            self.networks[code]: (
+                float(estimate[code]),
+                [float(lower[code]), float(upper[code])],
+            )
+            for code in range(len(self.networks))
+            if estimate[code] > 0
+        }
+        return dict(sorted(counts.items(), key=lambda item: -item[1][0]))
+
+    def monthly_counts(self) -> Tuple[pd.Series, Dict[pd.Timestamp, List[float]]]:
+        """Estimated rows per month keyed by month-end timestamp, empty
+        months filled like ``monthly_series``, and their bounds"""
+        months = (self.strata & MONTH_MASK).astype(np.int64)
+        dated = months > 0
+        if not dated.any():
+            return pd.Series(dtype='float64'), {}
+        first = int(months[dated].min())
+        codes = np.where(dated, months - first, -1)
+        per_block = self._aggregate(codes, int(months.max()) - first + 1)
+        estimate, lower, upper = self.totals(per_block)
+        ordinals = np.arange(first, first + len(estimate)) - MONTH_OFFSET
+        index = pd.DatetimeIndex(
+            ordinals.astype('datetime64[M]')
+        ) + pd.offsets.MonthEnd(0)
+        bounds = {
+            month: [float(low), float(high)]
+            for month, low, high in zip(index, lower, upper)
+        }
+        return pd.Series(estimate, index=index), bounds
+
+    def daily_counts(self) -> DailyCounts:
+        """Weighted rows per day (and network/platform), rounded to counts"""
+        daily = DailyCounts()
+        dated = self.days != np.iinfo(np.int64).min
+        if not dated.any():
+            return daily
+        dimensions = [dim for dim in GROUP_DIMENSIONS if dim in self.frame.columns]
+        frame = pd.DataFrame({'day': self.days[dated], 'count': self.weights[dated]})
+        for dim in dimensions:
+            frame[dim] = self.frame[dim].to_numpy()[dated]
+        counts = frame.groupby(['day'] + dimensions, dropna=False, observed=True)[
+            'count'
+        ].sum()
+        counts = counts.round().astype(np.int64).reset_index()
+        daily.update_counts(counts[counts['count'] > 0])
+        return daily
+
+    def _aggregate(self, codes: np.ndarray, size: int) -> np.ndarray:
+        """Per-block totals of the strata grouped by ``codes`` (-1 dropped)"""
+        valid = codes >= 0
+        matrix = np.zeros((self.blocks_read, size))
+        np.add.at(matrix.T, codes[valid], self.block_strata[:, valid].T)
+        return matrix
+
+
+class CSVSampler:
+    """Stratified sample of a CSV in one forward pass over a bounded
+    number of bytes.
+
+    The file is cut into equal byte blocks and SAMPLE_BLOCKS of them are
+    picked at random and read in file order, each holding the rows that
+    start inside it. So the bytes read depend on ``sample_rows``, not on
+    the file size; files small enough are read whole and their estimates
+    are exact. Rows feed a reservoir keeping, per (network, month)
+    stratum, the rows with the smallest random priorities, which is a
+    uniform sample of the stratum. Strata share ``sample_rows``, but rare
+    ones keep up to MIN_STRATUM_ROWS so no network or month read is lost.
+
+    Assumes one record per line: a block starting inside a quoted field
+    with line breaks loses that record.
+    """
+
+    def __init__(
+        self, sample_rows: int, blocks: int = SAMPLE_BLOCKS, seed: Optional[int] = None
+    ):
+        """
+        Args:
+            sample_rows: Rows to keep for processing
+            blocks: Blocks read; a file with fewer blocks is read whole
+            seed: Seed of the block choice and reservoir priorities
+        """
+        if sample_rows <= 0:
+            raise ValueError(f"Sample size must be positive, not {sample_rows}")
+        self.sample_rows = sample_rows
+        self.max_blocks = blocks
+        self.seed = seed
+        self.logger = logging.getLogger(__name__)
+
+    def sample(
+        self,
+        path: Union[str, Path],
+        schema: Optional[DatasetSchema] = None,
+        dates: Optional[Callable[[pd.DataFrame], Optional[pd.Series]]] = None,
+    ) -> CSVSample:
+        """Sample a CSV file.
+
+        Args:
+            path: CSV file
+            schema: Projection to read with; rows are compacted with it
+            dates: Called with each block, returns its parsed dates (or
+                None) for the month strata
+        """
+        path = Path(path)
+        rng = np.random.default_rng(self.seed)
+        size = path.stat().st_size
+        with open(path, 'rb') as f:
+            header = f.readline()
+            data_start = f.tell()
+            probe = f.read(PROBE_BYTES)
+            rows = probe.count(b'\n')
+            row_bytes = len(probe) / rows if rows else max(len(probe), 1)
+            block_bytes = max(
+                MIN_BLOCK_BYTES,
+                math.ceil(self.sample_rows * OVERSAMPLING * row_bytes / self.max_blocks)
+            )
+            full_blocks, tail = divmod(max(size - data_start, 0), block_bytes)
+            blocks = full_blocks + (1 if tail else 0)
+            if blocks <= self.max_blocks:
+                chosen, certain = np.arange(blocks), np.ones(blocks, dtype=bool)
+            else:
+                # Full blocks are sampled; the partial last one is always read
+                picks = self.max_blocks - (1 if tail else 0)
+                chosen = np.sort(rng.choice(full_blocks, picks, replace=False))
+                certain = np.zeros(picks, dtype=bool)
+                if tail:
+                    chosen, certain = np.r_[chosen, full_blocks], np.r_[certain, True]
+
+            names = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+            read_kwargs = schema.read_kwargs(names) if schema is not None else {}
+            # Categories differ between blocks; compact() sets them once at the end
+            read_kwargs.pop('dtype', None)
+
+            state = _ReservoirState(self.sample_rows, rng)
+            bytes_read = len(header) + len(probe)
+            for block in chosen:
+                start = data_start + int(block) * block_bytes
+                end = min(start + block_bytes, size)
+                data = self._read_block(f, start, end, data_start)
+                bytes_read += len(data)
+                frame = self._parse(header, data, read_kwargs)
+                state.add(
+                    frame, dates(frame) if dates is not None and len(frame) else None
+                )
+
+        block_strata = state.block_strata()
+        stratum_sizes, _ = estimate_totals(block_strata, certain, blocks)
+        frame, weights, days = state.sample(stratum_sizes)
+        if schema is not None:
+            frame = schema.compact(frame)
+        self.logger.info(
+            f"Sampled {len(frame)} of {state.rows_read} rows read from "
+            f"{len(chosen)}/{blocks} "
+            f"blocks ({bytes_read / 2**20:.1f} MiB) of {path.name}"
+        )
+        return CSVSample(
+            frame,
+            weights,
+            days,
+            blocks,
+            certain,
+            np.asarray(state.block_rows),
+            block_strata,
+            state.missing_frame(),
+            np.asarray(state.strata, dtype=np.int64),
+            list(state.networks),
+            bytes_read,
+        )
+
+    @staticmethod
+    def _read_block(f, start: int, end: int, data_start: int) -> bytes:
+        """Bytes of the rows starting in [start, end)"""
+        if start > data_start:
+            # Skip the tail of the row that started in the previous block
+            f.seek(start - 1)
+            f.readline()
+        else:
+            f.seek(start)
+        position = f.tell()
+        if position >= end:
+            return b''
+        data = f.read(end - position)
+        if data and not data.endswith(b'\n'):
+            data += f.readline()
+        return data
+
+    @staticmethod
+    def _parse(header: bytes, data: bytes, read_kwargs: Dict[str, Any]) -> pd.DataFrame:
+        if not header.endswith(b'\n'):
+            header += b'\n'
+        return pd.read_csv(
+            io.BytesIO(header + data), on_bad_lines='skip', **read_kwargs
+        )
+
+
+class _ReservoirState:
+    """Per-block tallies and the stratified reservoir of a running sample"""
+
+    def __init__(self, sample_rows: int, rng: np.random.Generator):
+        self.sample_rows = sample_rows
+        self.rng = rng
+        self.kept: Optional[pd.DataFrame] = None
+        self.networks = pd.Index([], dtype=object)
+        self.strata: List[int] = []
+        self._stratum_index = pd.Index([], dtype=np.int64)
+        self.block_rows: List[int] = []
+        self.block_missing: List[pd.Series] = []
+        self._block_counts: List[np.ndarray] = []
+
+    @property
+    def rows_read(self) -> int:
+        return int(sum(self.block_rows))
+
+    def add(self, frame: pd.DataFrame, dates: Optional[pd.Series]) -> None:
+        self.block_rows.append(len(frame))
+        self.block_missing.append(frame.isnull().sum())
+        if not len(frame):
+            self._block_counts.append(np.zeros(0, dtype=np.int64))
+            return
+
+        strata, days = self._stratify(frame, dates)
+        self._block_counts.append(np.bincount(strata, minlength=len(self.strata)))
+        kept = frame.assign(**{
+            STRATUM_COLUMN: strata,
+            PRIORITY_COLUMN: self.rng.random(len(frame)),
+            DAY_COLUMN: days
+        })
+        if self.kept is not None:
+            kept = pd.concat([self.kept, kept], ignore_index=True)
+        self.kept = self._trim(kept)
+
+    def _stratify(
+        self, frame: pd.DataFrame, dates: Optional[pd.Series]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Stratum ids and days since the epoch of a block's rows"""
+        network_codes = np.full(len(frame), -1, dtype=np.int64)
+        if 'network' in frame.columns:
+            codes, uniques = pd.factorize(frame['network'].astype(object))
+            labels = pd.Index([str(value) for value in uniques], dtype=object)
+            new = labels[~labels.isin(self.networks)]
+            if len(new):
+                self.networks = self.networks.append(new)
+            unique_codes = self.networks.get_indexer(labels)
+            network_codes = np.where(
+                codes >= 0, unique_codes[codes] if len(labels) else -1, -1
+            )
+
+        no_date = np.iinfo(np.int64).min
+        days = np.full(len(frame), no_date, dtype=np.int64)
+        month_keys = np.zeros(len(frame), dtype=np.int64)
+        if dates is not None and pd.api.types.is_datetime64_any_dtype(dates):
+            values = dates.to_numpy(dtype='datetime64[ns]')
+            valid = ~np.isnat(values)
+            days[valid] = values[valid].astype('datetime64[D]').astype(np.int64)
+            month_keys[valid] = (
+                values[valid].astype('datetime64[M]').astype(np.int64) + MONTH_OFFSET
+            )
+
+        keys = ((network_codes + 1) << 32) | month_keys
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        ids = self._stratum_index.get_indexer(unique_keys)
+        new = ids == -1
+        if new.any():
+            self.strata.extend(unique_keys[new].tolist())
+            self._stratum_index = pd.Index(self.strata, dtype=np.int64)
+            ids = self._stratum_index.get_indexer(unique_keys)
+        return ids[inverse], days
+
+    def _trim(self, kept: pd.DataFrame) -> pd.DataFrame:
+        """Keep the rows of smallest priority in every stratum.
+
+        The per-stratum cap only shrinks as strata appear, so rows dropped
+        earlier would have been dropped now too.
+        """
+        cap = max(MIN_STRATUM_ROWS, self.sample_rows // max(1, len(self.strata)))
+        strata = kept[STRATUM_COLUMN].to_numpy()
+        order = np.lexsort((kept[PRIORITY_COLUMN].to_numpy(), strata))
+        sorted_strata = strata[order]
+        starts = np.flatnonzero(np.r_[True, sorted_strata[1:] != sorted_strata[:-1]])
+        run_starts = np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        keep = np.sort(order[np.arange(len(order)) - run_starts < cap])
+        return kept.iloc[keep].reset_index(drop=True) if len(keep) < len(kept) else kept
+
+    def block_strata(self) -> np.ndarray:
+        """Rows per (block, stratum)"""
+        matrix = np.zeros((len(self._block_counts), len(self.strata)), dtype=np.int64)
+        for block, counts in enumerate(self._block_counts):
+            matrix[block, :len(counts)] = counts
+        return matrix
+
+    def missing_frame(self) -> pd.DataFrame:
+        """Missing values per (block, column); columns absent from a block count 0"""
+        return pd.DataFrame(self.block_missing).fillna(0).reset_index(drop=True)
+
+    def sample(
+        self, stratum_sizes: np.ndarray
+    ) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+        """Kept rows, their weights and days since the epoch"""
+        if self.kept is None:
+            return pd.DataFrame(), np.zeros(0), np.zeros(0, dtype=np.int64)
+        strata = self.kept[STRATUM_COLUMN].to_numpy()
+        kept = np.bincount(strata, minlength=len(self.strata))
+        weights = stratum_sizes[strata] / kept[strata]
+        days = self.kept[DAY_COLUMN].to_numpy()
+        frame = self.kept.drop(columns=[STRATUM_COLUMN, PRIORITY_COLUMN, DAY_COLUMN])
+        return frame, weights, days
@@ -0,0 +1,412 @@
+from collections import Counter
+from typing import Dict, Any, List, Optional, Tuple
+import math
+
+import numpy as np
+import pandas as pd
+
+from src.utils.hyperloglog import HyperLogLog
+
+# Values kept per numeric column to estimate quartiles; below this many
+# values the quartiles are exact
+QUANTILE_SAMPLE_SIZE = 4096
+# Quartiles reported like DataFrame.describe
+QUANTILES = (0.25, 0.5, 0.75)
+
+# Columns daily counts are split by; platform_network combines the two
+# like the keys of PlotConfig.PLATFORM_STYLES
+GROUP_DIMENSIONS = ('network', 'platform')
+
+
+class NumericAccumulator:
+    """Running count, mean, variance, min, max and quartiles for one
+    numeric column.
+
+    Partial results are combined with Chan's parallel update, so chunks can
+    be accumulated in any order and accumulators can be merged. Quartiles
+    come from the QUANTILE_SAMPLE_SIZE values with the smallest random
+    priorities, a uniform sample that merges exactly.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sample: Optional[np.ndarray] = np.empty(0)
+        self.priorities: Optional[np.ndarray] = np.empty(0)
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # Accumulators stored before quartiles existed never sampled their
+        # earlier values, so they report no quartiles
+        state.setdefault('sample', None)
+        state.setdefault('priorities', None)
+        self.__dict__.update(state)
+
+    def update(self, series: pd.Series) -> None:
+        values = series.dropna().to_numpy(dtype=np.float64)
+        if len(values) == 0:
+            return
+        other = NumericAccumulator()
+        other.count = len(values)
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        # Seeded by the chunk, so results repeat but chunks of parallel
+        # states do not share priorities
+        seed = [
+            self.count,
+            len(values),
+            int(np.float64(values.sum()).view(np.int64)) & 0xFFFFFFFF,
+        ]
+        other.priorities = np.random.default_rng(seed).random(len(values))
+        other.sample = values
+        other._trim()
+        self.merge(other)
+
+    def merge(self, other: 'NumericAccumulator') -> None:
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if self.sample is None or other.sample is None:
+            self.sample = self.priorities = None
+        else:
+            self.sample = np.concatenate([self.sample, other.sample])
+            self.priorities = np.concatenate([self.priorities, other.priorities])
+            self._trim()
+
+    def _trim(self) -> None:
+        if len(self.sample) > QUANTILE_SAMPLE_SIZE:
+            keep = np.argpartition(self.priorities, QUANTILE_SAMPLE_SIZE)[
+                :QUANTILE_SAMPLE_SIZE
+            ]
+            self.sample, self.priorities = self.sample[keep], self.priorities[keep]
+
+    @property
+    def variance(self) -> float:
+        """Sample variance, matching pandas' ddof=1"""
+        return self.m2 / (self.count - 1) if self.count > 1 else float('nan')
+
+    def to_dict(self) -> Dict[str, float]:
+        """Statistics keyed like ``DataFrame.describe``"""
+        if self.count == 0:
+            return {'count': 0.0, 'mean': float('nan'), 'std': float('nan'),
+                    'min': float('nan'), 'max': float('nan')}
+        stats = {
+            'count': float(self.count),
+            'mean': self.mean,
+            'std': math.sqrt(self.variance),
+            'min': self.min
+        }
+        if self.sample is not None and len(self.sample):
+            for q, value in zip(QUANTILES, np.quantile(self.sample, QUANTILES)):
+                stats[f"{q:.0%}"] = float(value)
+        stats['max'] = self.max
+        return stats
+
+
+class MonthlyHistogram:
+    """Record counts per calendar month plus the first and last timestamp"""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.start: Optional[pd.Timestamp] = None
+        self.end: Optional[pd.Timestamp] = None
+
+    def update(self, dates: pd.Series) -> None:
+        dates = dates.dropna()
+        if len(dates) == 0:
+            return
+        months = dates.dt.to_period('M').value_counts()
+        self.counts.update({period: int(count) for period, count in months.items()})
+        self._extend(dates.min(), dates.max())
+
+    def merge(self, other: 'MonthlyHistogram') -> None:
+        self.counts.update(other.counts)
+        if other.start is not None:
+            self._extend(other.start, other.end)
+
+    def to_series(self) -> pd.Series:
+        """Counts keyed by month-end timestamp with empty months filled,
+        matching ``resample('M').size()``"""
+        if not self.counts:
+            return pd.Series(dtype='int64')
+        months = pd.period_range(min(self.counts), max(self.counts), freq='M')
+        counts = [self.counts.get(period, 0) for period in months]
+        index = months.to_timestamp(how='end').normalize()
+        return pd.Series(counts, index=index, dtype='int64')
+
+    def _extend(self, start: pd.Timestamp, end: pd.Timestamp) -> None:
+        self.start = start if self.start is None else min(self.start, start)
+        self.end = end if self.end is None else max(self.end, end)
+
+
+def rollup(
+    periods: pd.PeriodIndex, counts: np.ndarray, freq: str
+) -> Tuple[pd.PeriodIndex, np.ndarray]:
+    """Sum contiguous ``periods`` columns of ``counts`` into a coarser ``freq``.
+
+    ``periods`` must be consecutive (as daily or monthly grains are), so
+    each coarser period covers one run of columns.
+    """
+    coarse = periods.asfreq(freq)
+    ordinals = coarse.asi8
+    starts = np.flatnonzero(np.r_[True, ordinals[1:] != ordinals[:-1]])
+    return coarse[starts], np.add.reduceat(counts, starts, axis=-1)
+
+
+class DailyCounts:
+    """Dense record counts per day, in total and per value of the
+    ``GROUP_DIMENSIONS`` columns (and their platform_network combination).
+
+    Arrays share one day range starting at ``origin`` (days since the
+    epoch) and grow as earlier or later dates arrive.
+    """
+
+    def __init__(self):
+        self.origin: Optional[int] = None
+        self.total = np.zeros(0, dtype=np.int64)
+        self.groups: Dict[str, Dict[str, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.total)
+
+    def update(self, dates: pd.Series, frame: pd.DataFrame) -> None:
+        """Count the rows of ``frame`` by their (aligned) parsed ``dates``"""
+        valid = dates.notna().to_numpy()
+        days = (
+            dates.to_numpy(dtype='datetime64[ns]')[valid]
+            .astype('datetime64[D]')
+            .astype(np.int64)
+        )
+        self._count(days, frame, valid)
+
+    def update_counts(self, frame: pd.DataFrame) -> None:
+        """Add pre-aggregated counts, e.g. from a SQL ``GROUP BY``.
+
+        ``frame`` has a ``day`` column (days since the epoch), a ``count``
+        column and optionally ``GROUP_DIMENSIONS`` columns.
+        """
+        days = frame['day'].to_numpy(dtype=np.int64)
+        self._count(days, frame, slice(None), frame['count'].to_numpy(dtype=np.int64))
+
+    def _count(self, days: np.ndarray, frame: pd.DataFrame, rows,
+               weights: Optional[np.ndarray] = None) -> None:
+        """Add the ``rows`` of ``frame`` falling on ``days``, each counted
+        once or ``weights`` times"""
+        if len(days) == 0:
+            return
+        self._extend(int(days.min()), int(days.max()))
+        offsets = days - self.origin
+        n = len(self.total)
+        self.total += self._bincount(offsets, weights, n)
+
+        for dimension, (codes, keys) in self._group_codes(frame).items():
+            codes = codes[rows]
+            keep = codes >= 0
+            counts = self._bincount(
+                codes[keep] * n + offsets[keep],
+                None if weights is None else weights[keep],
+                len(keys) * n
+            ).reshape(len(keys), n)
+            self._add_group(dimension, keys, counts, 0)
+
+    @staticmethod
+    def _bincount(
+        indices: np.ndarray, weights: Optional[np.ndarray], length: int
+    ) -> np.ndarray:
+        counts = np.bincount(indices, weights, minlength=length)
+        # Weighted bincount returns floats; counts stay exact well past 2**50
+        return counts if weights is None else counts.astype(np.int64)
+
+    def merge(self, other: 'DailyCounts') -> None:
+        if other.origin is None:
+            return
+        self._extend(other.origin, other.origin + len(other) - 1)
+        offset = other.origin - self.origin
+        self.total[offset:offset + len(other)] += other.total
+        for dimension, values in other.groups.items():
+            if not values:
+                # e.g. a chunk whose network column was all missing
+                self.groups.setdefault(dimension, {})
+                continue
+            self._add_group(
+                dimension, list(values), np.vstack(list(values.values())), offset
+            )
+
+    def periods(self) -> pd.PeriodIndex:
+        """The day of every array position"""
+        if self.origin is None:
+            return pd.PeriodIndex([], freq='D')
+        return pd.period_range(
+            pd.Timestamp(self.origin, unit='D'), periods=len(self), freq='D'
+        )
+
+    def monthly_series(self) -> pd.Series:
+        """Total counts keyed by month-end timestamp with empty months
+        filled, matching ``resample('M').size()``"""
+        if self.origin is None:
+            return pd.Series(dtype='int64')
+        months, counts = rollup(self.periods(), self.total, 'M')
+        return pd.Series(
+            counts, index=months.to_timestamp(how='end').normalize(), dtype='int64'
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'origin': (pd.Timestamp(self.origin, unit='D').date().isoformat()
+                       if self.origin is not None else None),
+            'total': self.total,
+            'groups': self.groups
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DailyCounts':
+        counts = cls()
+        if data.get('origin') is None:
+            return counts
+        counts.origin = int(np.datetime64(data['origin'], 'D').astype(np.int64))
+        counts.total = np.asarray(data['total'], dtype=np.int64)
+        counts.groups = {
+            dimension: {
+                key: np.asarray(row, dtype=np.int64) for key, row in values.items()
+            }
+            for dimension, values in data['groups'].items()
+        }
+        return counts
+
+    @staticmethod
+    def _group_codes(frame: pd.DataFrame) -> Dict[str, Tuple[np.ndarray, List[str]]]:
+        """Integer codes (-1 for missing) and their labels per dimension"""
+        factorized = {}
+        for dimension in GROUP_DIMENSIONS:
+            if dimension in frame.columns:
+                codes, uniques = pd.factorize(frame[dimension])
+                factorized[dimension] = (codes, [str(value) for value in uniques])
+        if 'platform' in factorized and 'network' in factorized:
+            platform_codes, platforms = factorized['platform']
+            network_codes, networks = factorized['network']
+            codes = np.where(
+                (platform_codes >= 0) & (network_codes >= 0),
+                platform_codes * len(networks) + network_codes, -1
+            )
+            keys = [
+                f"{platform}_{network}"
+                for platform in platforms
+                for network in networks
+            ]
+            factorized['platform_network'] = (codes, keys)
+        return factorized
+
+    def _add_group(
+        self, dimension: str, keys: List[str], counts: np.ndarray, offset: int
+    ) -> None:
+        target = self.groups.setdefault(dimension, {})
+        width = counts.shape[1]
+        for key, row in zip(keys, counts):
+            if key not in target:
+                if not row.any():
+                    continue
+                target[key] = np.zeros(len(self), dtype=np.int64)
+            target[key][offset:offset + width] += row
+
+    def _extend(self, first: int, last: int) -> None:
+        if self.origin is None:
+            self.origin = first
+            self.total = np.zeros(last - first + 1, dtype=np.int64)
+            return
+        before = max(0, self.origin - first)
+        after = max(0, last - (self.origin + len(self) - 1))
+        if before or after:
+            self.origin -= before
+            self.total = np.pad(self.total, (before, after))
+            for values in self.groups.values():
+                for key in values:
+                    values[key] = np.pad(values[key], (before, after))
+
+
+class StreamState:
+    """Mergeable partial results of ``DAODataProcessor.process`` over chunks"""
+
+    def __init__(self, sketch_precision: Optional[int] = None):
+        """
+        Args:
+            sketch_precision: If set, keep a HyperLogLog sketch per column
+                for approximate unique counts
+        """
+        self.sketch_precision = sketch_precision
+        self.sketches: Optional[Dict[str, HyperLogLog]] = (
+            {} if sketch_precision is not None else None
+        )
+        self.columns: list = []
+        self.record_count = 0
+        self.missing_values: Counter = Counter()
+        self.numeric: Dict[str, NumericAccumulator] = {}
+        self.networks: Counter = Counter()
+        self.temporal_analysis: Dict[str, Any] = {'has_temporal_data': False}
+        self.monthly = MonthlyHistogram()
+        self.daily: Optional[DailyCounts] = DailyCounts()
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        # States stored before daily counts existed cannot be extended
+        # with them, since their earlier rows were never counted
+        state.setdefault('daily', None)
+        self.__dict__.update(state)
+
+    def update(self, chunk: pd.DataFrame, dates: Optional[pd.Series] = None) -> None:
+        """Fold one chunk (and its parsed date column, if any) into the state"""
+        for col in chunk.columns:
+            if col not in self.missing_values:
+                self.columns.append(col)
+                self.missing_values[col] = 0
+        self.record_count += len(chunk)
+        self.missing_values.update(chunk.isnull().sum().to_dict())
+
+        for col in chunk.select_dtypes(include=[np.number]).columns:
+            self.numeric.setdefault(col, NumericAccumulator()).update(chunk[col])
+
+        if 'network' in chunk.columns:
+            self.networks.update(chunk['network'].value_counts().to_dict())
+
+        if self.sketches is not None:
+            for col in chunk.columns:
+                self.sketches.setdefault(col, HyperLogLog(self.sketch_precision)).add(
+                    chunk[col]
+                )
+
+        if dates is not None:
+            self.monthly.update(dates)
+            if self.daily is not None:
+                self.daily.update(dates, chunk)
+
+    def merge(self, other: 'StreamState') -> None:
+        """Combine with the state of another chunk sequence"""
+        for col in other.columns:
+            if col not in self.missing_values:
+                self.columns.append(col)
+                self.missing_values[col] = 0
+        self.record_count += other.record_count
+        self.missing_values.update(other.missing_values)
+        for col, acc in other.numeric.items():
+            self.numeric.setdefault(col, NumericAccumulator()).merge(acc)
+        self.networks.update(other.networks)
+        if self.sketches is not None and other.sketches is not None:
+            for col, sketch in other.sketches.items():
+                self.sketches.setdefault(col, HyperLogLog(self.sketch_precision)).merge(
+                    sketch
+                )
+        if not self.temporal_analysis.get('has_temporal_data'):
+            self.temporal_analysis = other.temporal_analysis
+        self.monthly.merge(other.monthly)
+        if self.daily is not None and other.daily is not None:
+            self.daily.merge(other.daily)
+        else:
+            self.daily = None
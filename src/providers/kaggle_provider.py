@@ -1,52 +1,125 @@
 from src.core.base import DatasetProvider
-import kagglehub
+from src.core.instrumentation import instrumentation
+from src.data.dataset_cache import DatasetCache
+from src.data.lazy_datasets import LazyDatasets, CSV_MEMORY_FACTOR
+from src.data.schema import DatasetSchema, format_memory_report
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import pandas as pd
 import logging
 import json
 
 class KaggleDatasetProvider(DatasetProvider):
-    def __init__(self, dataset_path: str, backup_dir: Path):
+    def __init__(self,
+                 dataset_path: str,
+                 backup_dir: Path,
+                 use_cache: bool = True,
+                 cache_format: str = 'parquet',
+                 cache_max_bytes: Optional[int] = None):
         self.dataset_path = dataset_path
         self.backup_dir = backup_dir
         self.logger = logging.getLogger(__name__)
         self._version_info = None
-        
+        self.memory_reports: Dict[str, Dict[str, int]] = {}
+        self.cache = DatasetCache(
+            Path(backup_dir) / 'cache',
+            fmt=cache_format,
+            max_bytes=cache_max_bytes
+        ) if use_cache else None
+
     def get_version_info(self) -> Dict[str, Any]:
         if not self._version_info:
             try:
-                path = kagglehub.dataset_download(self.dataset_path)
-                version = path.split('versions/')[-1]
-                self._version_info = {
-                    'source': 'kaggle',
-                    'dataset': self.dataset_path,
-                    'version': version,
-                    'download_date': datetime.now().isoformat(),
-                    'path': path
-                }
-                self._save_version_info()
+                self._version_info = self._download_version_info()
             except Exception as e:
                 self.logger.warning(f"Failed to get Kaggle version: {e}")
                 self._version_info = self._load_backup_version()
-        
+
         return self._version_info
 
-    def get_datasets(self) -> Dict[str, pd.DataFrame]:
+    def _download_version_info(self) -> Dict[str, Any]:
+        """Download (or cache-check) the dataset and record its version"""
+        # Imported here so offline runs don't pay for importing kagglehub
+        import kagglehub
+
+        with instrumentation.span('kagglehub.dataset_download', 'io',
+                                  dataset=self.dataset_path):
+            path = kagglehub.dataset_download(self.dataset_path)
+        version = path.split('versions/')[-1]
+        self._version_info = {
+            'source': 'kaggle',
+            'dataset': self.dataset_path,
+            'version': version,
+            'download_date': datetime.now().isoformat(),
+            'path': path
+        }
+        self._save_version_info()
+        return self._version_info
+
+    def get_datasets(self) -> LazyDatasets:
+        """Map every CSV of the current version to a lazily loaded DataFrame"""
         version_info = self.get_version_info()
         data_path = Path(version_info['path'])
-        
-        datasets = {}
-        for csv_file in data_path.rglob('*.csv'):
-            try:
-                dataset_name = csv_file.stem
-                datasets[dataset_name] = pd.read_csv(csv_file)
-                self.logger.info(f"Loaded dataset: {dataset_name}")
-            except Exception as e:
-                self.logger.error(f"Error loading {csv_file}: {e}")
-        
-        return datasets
+
+        paths = {csv_file.stem: csv_file for csv_file in data_path.rglob('*.csv')}
+        self.logger.info(f"Found {len(paths)} datasets in {data_path}")
+        return LazyDatasets(paths, self.load_dataset, self.estimate_dataset_bytes)
+
+    def load_dataset(self, dataset_name: str, csv_file: Path) -> pd.DataFrame:
+        """Load a single dataset, going through the columnar cache if enabled"""
+        version = self.get_version_info().get('version')
+        schema = DatasetSchema.for_dataset(dataset_name)
+
+        def read(path: Path) -> pd.DataFrame:
+            with instrumentation.span('read_csv', 'io', dataset=dataset_name,
+                                      bytes_read=Path(path).stat().st_size) as span:
+                df, report = schema.read_csv(path)
+                span.set(rows=len(df))
+            self.memory_reports[dataset_name] = report
+            self.logger.info(format_memory_report(dataset_name, report))
+            return df
+
+        try:
+            if self.cache is not None and version:
+                return self.cache.load(
+                    version, dataset_name, csv_file,
+                    reader=read, tag=schema.fingerprint()
+                )
+            return read(csv_file)
+        except Exception as e:
+            self.logger.error(f"Error loading {csv_file}: {e}")
+            raise
+
+    def estimate_dataset_bytes(self, dataset_name: str, csv_file: Path) -> int:
+        """Estimate in-memory size from cache metadata, falling back to the
+        schema applied to the first rows of the CSV, then to its size"""
+        version = self.get_version_info().get('version')
+        if self.cache is not None and version:
+            estimate = self.cache.estimate_bytes(version, dataset_name)
+            if estimate is not None:
+                return estimate
+        size = csv_file.stat().st_size
+        try:
+            return DatasetSchema.for_dataset(dataset_name).estimate_bytes(
+                csv_file, size
+            )
+        except Exception as e:
+            self.logger.debug(f"Schema estimate failed for {dataset_name}: {e}")
+            return int(size * CSV_MEMORY_FACTOR)
+
+    def artifact_path(self, filename: str) -> Path:
+        """Where to persist a file derived from the current dataset version"""
+        version = self.get_version_info().get('version', 'unknown')
+        if self.cache is not None:
+            return self.cache.artifact_path(version, filename)
+        return Path(self.backup_dir) / str(version) / filename
+
+    def record_artifact(self, filename: str) -> None:
+        """Count a written ``artifact_path`` file towards the cache budget"""
+        version = self.get_version_info().get('version', 'unknown')
+        if self.cache is not None:
+            self.cache.record_artifact(version, filename)
 
     def _save_version_info(self):
         version_file = self.backup_dir / 'version_info.json'
@@ -0,0 +1,105 @@
+from src.providers.kaggle_provider import KaggleDatasetProvider
+from src.providers.mirror_manifest import (
+    MANIFEST_NAME, add_checksums, build_manifest, mirror_manifest_path, resolve_backup,
+    resolve_mirror, verify_manifest, write_manifest
+)
+from src.data.lazy_datasets import LazyDatasets
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+class LocalMirrorProvider(KaggleDatasetProvider):
+    """Offline-first provider resolving the dataset version locally.
+
+    The version comes from a mirror directory standing in for Kaggle
+    (e.g. a copied ``kagglehub`` ``versions/<n>`` folder) or from the
+    backup ``version_info.json`` of an earlier download. Files are checked
+    against a manifest of sizes (and checksums, with ``verify_checksums``)
+    recorded in the backup directory before they are used. Kaggle
+    is only contacted when ``remote`` is set, which downloads the latest
+    version and records its manifest.
+    """
+
+    def __init__(self,
+                 dataset_path: str,
+                 backup_dir: Path,
+                 mirror_dir: Optional[Path] = None,
+                 remote: bool = False,
+                 verify_checksums: bool = False,
+                 **kwargs):
+        """
+        Initialize the provider.
+
+        Args:
+            dataset_path: Kaggle dataset handle, used with ``remote``
+            backup_dir: Directory holding version_info.json and the cache
+            mirror_dir: Local directory with the dataset's CSV files
+            remote: Download from Kaggle instead of resolving locally
+            verify_checksums: Compare checksums as well as sizes
+            **kwargs: Passed to KaggleDatasetProvider (cache settings)
+        """
+        super().__init__(dataset_path, Path(backup_dir), **kwargs)
+        self.mirror_dir = Path(mirror_dir) if mirror_dir else None
+        self.remote = remote
+        self.verify_checksums = verify_checksums
+        self.manifest: Optional[Dict[str, Any]] = None
+        # Where a manifest recorded by this tool is kept (None if shipped)
+        self.manifest_path: Optional[Path] = None
+
+    def get_version_info(self) -> Dict[str, Any]:
+        if not self._version_info:
+            if self.remote:
+                self._version_info = self._fetch_remote()
+            elif self.mirror_dir is not None:
+                self._version_info = self._resolve_mirror()
+            else:
+                self._version_info = self._resolve_backup()
+        return self._version_info
+
+    def get_datasets(self) -> LazyDatasets:
+        """Validate the local files against the manifest, then map them lazily"""
+        problems = self.validate()
+        if problems:
+            raise ValueError(
+                f"Local dataset files do not match the manifest: {'; '.join(problems)}"
+            )
+        return super().get_datasets()
+
+    def validate(self, checksums: Optional[bool] = None) -> List[str]:
+        """Problems with the resolved version's files (empty if none)"""
+        version_info = self.get_version_info()
+        if self.manifest is None:
+            self.logger.warning(
+                "No manifest for the dataset files, skipping validation"
+            )
+            return []
+        checksums = self.verify_checksums if checksums is None else checksums
+        problems = verify_manifest(version_info['path'], self.manifest, checksums)
+        # Checksums missing from the manifest are recorded once the files pass
+        if checksums and not problems and self.manifest_path is not None:
+            if add_checksums(version_info['path'], self.manifest):
+                write_manifest(self.manifest_path, self.manifest)
+        return problems
+
+    def _fetch_remote(self) -> Dict[str, Any]:
+        version_info = self._download_version_info()
+        self.manifest = build_manifest(
+            version_info['path'], version_info['version'], self.dataset_path,
+            self.verify_checksums
+        )
+        self.manifest_path = self.backup_dir / MANIFEST_NAME
+        write_manifest(self.manifest_path, self.manifest)
+        return version_info
+
+    def _resolve_mirror(self) -> Dict[str, Any]:
+        version_info, self.manifest = resolve_mirror(
+            self.mirror_dir, self.dataset_path, self.backup_dir, self.verify_checksums
+        )
+        if not (self.mirror_dir / MANIFEST_NAME).exists():
+            self.manifest_path = mirror_manifest_path(self.backup_dir, self.mirror_dir)
+        return version_info
+
+    def _resolve_backup(self) -> Dict[str, Any]:
+        version_info, self.manifest = resolve_backup(self.backup_dir, self.dataset_path)
+        if self.manifest is not None:
+            self.manifest_path = self.backup_dir / MANIFEST_NAME
+        return version_info
@@ -0,0 +1,179 @@
+"""Dataset manifests and local version resolution.
+
+Kept free of pandas and kagglehub imports so the version of a local
+dataset copy can be resolved without paying for them.
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Union
+import hashlib
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'mirror_manifest.json'
+# Directory below the backup dir holding the manifests recorded for mirrors
+MIRROR_MANIFEST_DIR = 'mirror_manifests'
+CHECKSUM_BLOCK_SIZE = 1 << 20
+VERSION_PATTERN = re.compile(r'versions/(\d+)')
+
+
+def file_checksum(path: Union[str, Path]) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHECKSUM_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_manifest(directory: Union[str, Path], version: str, dataset: str,
+                   checksums: bool = False) -> Dict[str, Any]:
+    """Sizes and mtimes of every CSV below ``directory``, and their
+    checksums if ``checksums`` is set, since those read every byte"""
+    directory = Path(directory)
+    files = {}
+    for csv_file in sorted(directory.rglob('*.csv')):
+        stat = csv_file.stat()
+        entry = {'size': stat.st_size, 'mtime': stat.st_mtime}
+        if checksums:
+            entry['sha256'] = file_checksum(csv_file)
+        files[csv_file.relative_to(directory).as_posix()] = entry
+    return {
+        'dataset': dataset,
+        'version': version,
+        'created': datetime.now().isoformat(),
+        'files': files
+    }
+
+
+def verify_manifest(directory: Union[str, Path],
+                    manifest: Dict[str, Any],
+                    checksums: bool = False) -> List[str]:
+    """Problems found comparing ``directory`` with a manifest.
+
+    Sizes are always compared; checksums only if ``checksums`` is set,
+    since they require reading every byte, and only for files the
+    manifest has a checksum of. A changed mtime is logged, not reported,
+    since copying a mirror usually resets it.
+    """
+    directory = Path(directory)
+    problems = []
+    for relpath, expected in manifest.get('files', {}).items():
+        path = directory / relpath
+        if not path.is_file():
+            problems.append(f"{relpath}: missing")
+            continue
+        stat = path.stat()
+        if stat.st_size != expected['size']:
+            problems.append(f"{relpath}: size {stat.st_size} != {expected['size']}")
+        elif checksums and 'sha256' in expected:
+            if file_checksum(path) != expected['sha256']:
+                problems.append(f"{relpath}: checksum mismatch")
+        elif 'mtime' in expected and stat.st_mtime != expected['mtime']:
+            logger.info(f"{relpath} was modified after its manifest was recorded")
+    known = set(manifest.get('files', {}))
+    for csv_file in directory.rglob('*.csv'):
+        relpath = csv_file.relative_to(directory).as_posix()
+        if relpath not in known:
+            problems.append(f"{relpath}: not in manifest")
+    return problems
+
+
+def add_checksums(directory: Union[str, Path], manifest: Dict[str, Any]) -> bool:
+    """Record the checksums a manifest lacks; returns whether any were added"""
+    directory = Path(directory)
+    added = False
+    for relpath, entry in manifest.get('files', {}).items():
+        path = directory / relpath
+        if 'sha256' not in entry and path.is_file():
+            entry['sha256'] = file_checksum(path)
+            added = True
+    return added
+
+
+def mirror_manifest_path(
+    backup_dir: Union[str, Path], mirror_dir: Union[str, Path]
+) -> Path:
+    """Where the manifest recorded for a mirror directory is kept"""
+    key = hashlib.sha256(Path(mirror_dir).resolve().as_posix().encode()).hexdigest()[
+        :16
+    ]
+    return Path(backup_dir) / MIRROR_MANIFEST_DIR / f"{key}.json"
+
+
+def write_manifest(path: Union[str, Path], manifest: Dict[str, Any]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def resolve_mirror(mirror_dir: Union[str, Path],
+                   dataset: str,
+                   backup_dir: Union[str, Path],
+                   checksums: bool = False) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Version info and manifest of a local mirror directory.
+
+    A manifest shipped in the mirror is used as is. Otherwise one is
+    recorded under ``backup_dir`` from the mirror's current files (with
+    checksums if ``checksums`` is set), with the version taken from a
+    ``versions/<n>`` path or the directory name. The mirror itself is
+    never written to.
+    """
+    mirror_dir = Path(mirror_dir)
+    if not mirror_dir.is_dir():
+        raise FileNotFoundError(f"Mirror directory {mirror_dir} does not exist")
+    manifest_path = mirror_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        manifest_path = mirror_manifest_path(backup_dir, mirror_dir)
+    if manifest_path.exists():
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    else:
+        match = VERSION_PATTERN.search(mirror_dir.resolve().as_posix())
+        version = match.group(1) if match else mirror_dir.name
+        logger.info(
+            f"No manifest for {mirror_dir}, recording one for version {version}"
+        )
+        manifest = build_manifest(mirror_dir, version, dataset, checksums)
+        try:
+            write_manifest(manifest_path, manifest)
+        except OSError as e:
+            logger.warning(f"Could not write manifest to {manifest_path}: {e}")
+
+    version_info = {
+        'source': 'local',
+        'dataset': manifest.get('dataset', dataset),
+        'version': str(manifest['version']),
+        'path': str(mirror_dir),
+        'manifest_created': manifest.get('created')
+    }
+    return version_info, manifest
+
+
+def resolve_backup(backup_dir: Union[str, Path],
+                   dataset: str) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Version info of the last download recorded in ``backup_dir`` and its
+    manifest, if one was recorded for that version"""
+    backup_dir = Path(backup_dir)
+    version_file = backup_dir / 'version_info.json'
+    version_info: Dict[str, Any] = {}
+    if version_file.exists():
+        with open(version_file) as f:
+            version_info = json.load(f)
+    if not version_info.get('path') or not Path(version_info['path']).is_dir():
+        raise FileNotFoundError(
+            f"No local copy of {dataset} recorded in {backup_dir}; "
+            "fetch it from Kaggle first or point to a mirror directory"
+        )
+    manifest = None
+    manifest_path = backup_dir / MANIFEST_NAME
+    if manifest_path.exists():
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if str(manifest.get('version')) != str(version_info.get('version')):
+            manifest = None
+    return version_info, manifest
@@ -0,0 +1,327 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from pathlib import Path
+from typing import Dict, Any, Hashable, Optional, Tuple, Union
+from urllib.parse import parse_qs, unquote, urlsplit
+import logging
+
+from src.service.snapshot import Snapshot, latest_snapshot
+
+# Largest request line or header line accepted, in bytes
+MAX_LINE = 8192
+MAX_HEADERS = 100
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return self._entries[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self._entries), 'maxsize': self.maxsize,
+                'hits': self.hits, 'misses': self.misses}
+
+
+class MetricsService:
+    """Local HTTP service answering JSON queries from the newest analysis snapshot.
+
+    The snapshot is loaded once and swapped when a newer one appears in
+    ``snapshot_dir``. Responses are cached in an LRU keyed by snapshot and
+    request target. Each response carries an ETag derived from the same
+    key, so a client revalidating with ``If-None-Match`` gets a 304 until
+    the dataset version (or snapshot) changes.
+
+    Endpoints:
+        /health, /version, /stats
+        /datasets: dataset names and record counts
+        /datasets/<name>: every metric of a dataset
+        /datasets/<name>/timeseries?freq=M&by=network&start=...&end=...
+        /summary: cross-dataset metrics
+    """
+
+    def __init__(self,
+                 snapshot_dir: Union[str, Path],
+                 host: str = '127.0.0.1',
+                 port: int = 8050,
+                 cache_size: int = 256,
+                 reload_interval: float = 2.0):
+        """
+        Args:
+            snapshot_dir: Directory ``write_snapshot`` writes to
+            host: Interface to listen on; loopback by default
+            port: Port to listen on (0 picks a free one)
+            cache_size: Responses kept in the LRU cache
+            reload_interval: Seconds between checks for a newer snapshot
+        """
+        self.snapshot_dir = Path(snapshot_dir)
+        self.host = host
+        self.port = port
+        self.reload_interval = reload_interval
+        self.cache = LRUCache(cache_size)
+        self.snapshot: Optional[Snapshot] = None
+        self.loaded_at: Optional[float] = None
+        self._watcher: Optional[asyncio.Future] = None
+        self.logger = logging.getLogger(__name__)
+
+    def reload(self) -> bool:
+        """Load the newest snapshot if it differs from the served one.
+
+        Returns:
+            Whether a new snapshot was loaded
+        """
+        snapshot = self._load_newer()
+        if snapshot is None:
+            return False
+        self._swap(snapshot)
+        return True
+
+    def _load_newer(self) -> Optional[Snapshot]:
+        """The newest snapshot if it differs from the served one, else None.
+
+        Only reads service state, so it can run on an executor thread.
+        """
+        path = latest_snapshot(self.snapshot_dir)
+        if path is None:
+            if self.snapshot is None:
+                raise FileNotFoundError(f"No analysis snapshot in {self.snapshot_dir}")
+            return None
+        current = self.snapshot
+        if current is not None and current.path == path and \
+                current.mtime_ns == path.stat().st_mtime_ns:
+            return None
+        return Snapshot(path)
+
+    def _swap(self, snapshot: Snapshot) -> None:
+        """Serve ``snapshot``; called on the event loop thread, so no
+        request is between a cache lookup and its store meanwhile"""
+        # One assignment, so requests see either the old or the new snapshot
+        self.snapshot = snapshot
+        self.loaded_at = time.time()
+        self.cache.clear()
+        self.logger.info(f"Serving version {snapshot.version} from {snapshot.path}")
+
+    async def _watch(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                # Parse off the loop, swap on it
+                snapshot = await loop.run_in_executor(None, self._load_newer)
+                if snapshot is not None:
+                    self._swap(snapshot)
+            except Exception as e:
+                self.logger.error(f"Error reloading snapshot: {str(e)}")
+
+    async def start(self) -> asyncio.AbstractServer:
+        """Load the snapshot, start listening and watching for new snapshots"""
+        self.reload()
+        server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=MAX_LINE
+        )
+        self.port = server.sockets[0].getsockname()[1]
+        self._watcher = asyncio.ensure_future(self._watch())
+        self.logger.info(f"Metrics service listening on http://{self.host}:{self.port}")
+        return server
+
+    async def serve_forever(self) -> None:
+        server = await self.start()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._watcher.cancel()
+
+    def run(self) -> None:
+        try:
+            asyncio.run(self.serve_forever())
+        except KeyboardInterrupt:
+            self.logger.info("Metrics service stopped")
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve requests on one connection until the client closes it"""
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, keep_alive = request
+                status, body, etag = self.respond(
+                    method, target, headers.get('if-none-match')
+                )
+                head = [
+                    f"HTTP/1.1 {status.value} {status.phrase}",
+                    'Content-Type: application/json',
+                    f"Content-Length: {len(body)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}"
+                ]
+                if etag:
+                    head += [f"ETag: {etag}", 'Cache-Control: no-cache']
+                writer.write('\r\n'.join(head).encode('latin-1') + b'\r\n\r\n')
+                if method != 'HEAD' and status is not HTTPStatus.NOT_MODIFIED:
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader
+                            ) -> Optional[Tuple[str, str, Dict[str, str], bool]]:
+        """Method, target, lower-cased headers and keep-alive of the next
+        request; None when the connection is closed or malformed"""
+        try:
+            line = await reader.readline()
+            if not line.strip():
+                return None
+            method, target, version = line.decode('latin-1').split()
+            headers = {}
+            for _ in range(MAX_HEADERS):
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+        except (ValueError, asyncio.LimitOverrunError):
+            return None
+        connection = headers.get('connection', '').lower()
+        keep_alive = (
+            connection != 'close'
+            if version == 'HTTP/1.1'
+            else connection == 'keep-alive'
+        )
+        return method.upper(), target, headers, keep_alive
+
+    def respond(
+        self, method: str, target: str, if_none_match: Optional[str] = None
+    ) -> Tuple[HTTPStatus, bytes, Optional[str]]:
+        """Status, JSON body and ETag for a request"""
+        if method not in ('GET', 'HEAD'):
+            return self._error(
+                HTTPStatus.METHOD_NOT_ALLOWED, f"{method} is not supported"
+            )
+        snapshot = self.snapshot
+        url = urlsplit(target)
+        path = unquote(url.path).rstrip('/') or '/'
+        if path == '/health':
+            return HTTPStatus.OK, self._json({
+                'status': 'ok', 'version': snapshot.version, 'loaded_at': self.loaded_at
+            }), None
+        if path == '/stats':
+            return HTTPStatus.OK, self._json({'version': snapshot.version,
+                                              'cache': self.cache.stats()}), None
+
+        key = (snapshot.tag, path, url.query)
+        etag = '"{}"'.format(
+            hashlib.blake2b(repr(key).encode(), digest_size=12).hexdigest()
+        )
+        if if_none_match and etag in (tag.strip() for tag in if_none_match.split(',')):
+            return HTTPStatus.NOT_MODIFIED, b'', etag
+
+        body = self.cache.get(key)
+        if body is None:
+            try:
+                body = self._json(self._query(snapshot, path, parse_qs(url.query)))
+            except KeyError as e:
+                return self._error(HTTPStatus.NOT_FOUND, e.args[0])
+            except ValueError as e:
+                return self._error(HTTPStatus.BAD_REQUEST, str(e))
+            self.cache.put(key, body)
+        return HTTPStatus.OK, body, etag
+
+    def _query(self, snapshot: Snapshot, path: str, params: Dict[str, list]) -> Any:
+        """The payload of a cacheable endpoint"""
+        parts = path.strip('/').split('/')
+        if path == '/version':
+            return snapshot.version_info
+        if path == '/summary':
+            return {'version': snapshot.version,
+                    **snapshot.analysis['cross_dataset_metrics']}
+        if parts[0] == 'datasets' and len(parts) == 1:
+            return {
+                'version': snapshot.version,
+                'datasets': {
+                    name: metrics.get('record_count')
+                    for name, metrics in snapshot.analysis['dataset_metrics'].items()
+                }
+            }
+        if parts[0] == 'datasets' and len(parts) == 2:
+            return {
+                'version': snapshot.version,
+                'dataset': parts[1],
+                **snapshot.dataset(parts[1]),
+            }
+        if parts[0] == 'datasets' and len(parts) == 3 and parts[2] == 'timeseries':
+            return self._time_series(snapshot, parts[1], params)
+        raise KeyError(f"No endpoint {path}")
+
+    @staticmethod
+    def _time_series(
+        snapshot: Snapshot, dataset: str, params: Dict[str, list]
+    ) -> Dict[str, Any]:
+        """Counts per period from the snapshot's rollup cube"""
+        param = {name: values[-1] for name, values in params.items()}
+        if dataset not in snapshot.cube:
+            raise KeyError(f"No time series for dataset {dataset}")
+        freq = param.get('freq', 'M')
+        try:
+            counts = snapshot.cube.query(
+                dataset,
+                freq,
+                by=param.get('by'),
+                start=param.get('start'),
+                end=param.get('end'),
+            )
+        except KeyError as e:
+            # Unknown split dimensions are a bad request, not a missing resource
+            raise ValueError(e.args[0])
+        return {
+            'version': snapshot.version,
+            'dataset': dataset,
+            'freq': freq,
+            'by': param.get('by'),
+            'periods': [period.date().isoformat() for period in counts.index],
+            'series': {
+                str(column): counts[column].tolist() for column in counts.columns
+            },
+        }
+
+    @staticmethod
+    def _json(payload: Any) -> bytes:
+        return json.dumps(payload, separators=(',', ':')).encode()
+
+    def _error(
+        self, status: HTTPStatus, message: str
+    ) -> Tuple[HTTPStatus, bytes, None]:
+        return status, self._json({'error': message}), None
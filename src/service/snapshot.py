@@ -0,0 +1,114 @@
+import json
+import math
+import os
+import re
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+import logging
+
+import numpy as np
+
+from src.analyzers.rollup_cube import RollupCube
+from src.processors.stream_accumulators import DailyCounts
+
+# Sections of a DAOAnalyzer result written to a snapshot
+SNAPSHOT_SECTIONS = ('dataset_metrics', 'temporal_metrics', 'network_metrics',
+                     'cross_dataset_metrics')
+
+SNAPSHOT_PATTERN = 'analysis_*.json'
+
+logger = logging.getLogger(__name__)
+
+
+def to_json_safe(value: Any) -> Any:
+    """Plain JSON types for nested results: numpy values become Python
+    numbers or lists and NaN becomes None"""
+    if isinstance(value, Mapping):
+        return {str(key): to_json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json_safe(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return to_json_safe(value.tolist())
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def write_snapshot(snapshot_dir: Union[str, Path],
+                   version_info: Dict[str, Any],
+                   analysis: Dict[str, Any],
+                   processed: Dict[str, Dict[str, Any]]) -> Path:
+    """Write the analysis and daily counts of a dataset version as JSON.
+
+    The file is written next to its final name and renamed into place, so
+    a service watching the directory never reads a partial snapshot.
+
+    Returns:
+        Path of the snapshot
+    """
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    version = str(version_info.get('version'))
+    snapshot = {
+        'version': version,
+        'version_info': to_json_safe(version_info),
+        'created_at': time.time(),
+        'analysis': {section: to_json_safe(analysis.get(section, {}))
+                     for section in SNAPSHOT_SECTIONS},
+        'daily_counts': {
+            name: to_json_safe(result['time_series']['daily_counts'])
+            for name, result in processed.items()
+            if result.get('time_series', {}).get('daily_counts') is not None
+        }
+    }
+    path = snapshot_dir / f"analysis_{re.sub(r'[^A-Za-z0-9_.-]', '_', version)}.json"
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+    logger.info(f"Wrote analysis snapshot of version {version} to {path}")
+    return path
+
+
+def latest_snapshot(snapshot_dir: Union[str, Path]) -> Optional[Path]:
+    """The most recently written snapshot in a directory, if any"""
+    paths = list(Path(snapshot_dir).glob(SNAPSHOT_PATTERN))
+    return max(paths, key=lambda path: path.stat().st_mtime_ns) if paths else None
+
+
+class Snapshot:
+    """A loaded snapshot: analysis sections plus a rollup cube of its
+    daily counts for time series queries"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.mtime_ns = self.path.stat().st_mtime_ns
+        with open(self.path) as f:
+            data = json.load(f)
+        self.version = data['version']
+        self.version_info = data['version_info']
+        self.created_at = data['created_at']
+        self.analysis = data['analysis']
+        self.cube = RollupCube()
+        for name, daily in data['daily_counts'].items():
+            self.cube.add(name, DailyCounts.from_dict(daily))
+        # Changes whenever a new snapshot is written, even of the same version
+        self.tag = f"{self.version}-{self.mtime_ns}"
+
+    def datasets(self) -> List[str]:
+        return list(self.analysis['dataset_metrics'])
+
+    def dataset(self, name: str) -> Dict[str, Any]:
+        """Every stored metric of one dataset, by section"""
+        if name not in self.analysis['dataset_metrics']:
+            raise KeyError(f"Unknown dataset {name}")
+        return {
+            section: self.analysis[section][name]
+            for section in SNAPSHOT_SECTIONS if name in self.analysis.get(section, {})
+        }
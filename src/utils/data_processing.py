@@ -1,12 +1,14 @@
 import logging
+import numpy as np
 import pandas as pd
 from datetime import date
-from pandas.tseries.offsets import DateOffset
 from typing import List, Optional, Dict
 
+PANDAS_MAJOR = int(pd.__version__.split('.')[0])
+
 class DataProcessor:
     DATE_COLUMNS = ['createdAt', 'date', 'startDate', 'executedAt']
-    
+
     def __init__(self):
         self.logger = logging.getLogger(__name__)
 
@@ -38,36 +40,92 @@ class DataProcessor:
             self.logger.error(f"Error processing dataset {dataset_name}: {str(e)}")
             return None
 
+    def to_datetime_column(self, values: pd.Series, unit: str = 's') -> pd.Series:
+        """Convert a whole column of mixed epoch numbers and date strings to datetime.
+
+        Numeric values (including numeric strings) are read as epochs in
+        ``unit``, everything else is parsed as a date string. Unparseable
+        values become NaT. Time zones are normalized to naive UTC.
+        """
+        if pd.api.types.is_datetime64_any_dtype(values):
+            if getattr(values.dt, 'tz', None) is not None:
+                return values.dt.tz_convert('UTC').dt.tz_localize(None)
+            return values
+
+        numeric = pd.to_numeric(values, errors='coerce')
+        if (
+            pd.api.types.is_numeric_dtype(values)
+            or numeric.notna().sum() == values.notna().sum()
+        ):
+            return pd.to_datetime(numeric, unit=unit, errors='coerce')
+
+        result = pd.Series(pd.NaT, index=values.index, dtype='datetime64[ns]')
+        is_epoch = numeric.notna()
+        if is_epoch.any():
+            result[is_epoch] = pd.to_datetime(
+                numeric[is_epoch], unit=unit, errors='coerce'
+            )
+        is_text = values.notna() & ~is_epoch
+        if is_text.any():
+            result[is_text] = self._parse_date_strings(values[is_text].astype(str))
+        return result
+
+    @staticmethod
+    def _parse_date_strings(values: pd.Series) -> pd.Series:
+        """Parse date strings that may not share a single format."""
+        if PANDAS_MAJOR >= 2:
+            # Otherwise pandas 2 infers one format from the first value
+            parsed = pd.to_datetime(values, errors='coerce', utc=True, format='mixed')
+        else:
+            parsed = pd.to_datetime(values, errors='coerce', utc=True)
+        return parsed.dt.tz_localize(None)
+
+    def monthly_counts(self, df: pd.DataFrame, date_keys: List[str],
+                       end: Optional[date] = None) -> pd.DataFrame:
+        """Count records per month for one or more date columns at once.
+
+        Returns a DataFrame indexed by the first day of each month, with one
+        count column per date key. The months cover a single contiguous
+        range from the earliest observed month to ``end`` (default: the
+        current month), so missing months appear with a count of 0.
+        """
+        months = {}
+        for key in date_keys:
+            dates = self.to_datetime_column(df[key]).dropna()
+            # Months since the epoch, via numpy month truncation
+            months[key] = (
+                dates.to_numpy(dtype='datetime64[ns]')
+                .astype('datetime64[M]')
+                .astype(np.int64)
+            )
+
+        end_month = np.datetime64(end or date.today(), 'M').astype(np.int64)
+        observed = [m for m in months.values() if len(m)]
+        if not observed:
+            return pd.DataFrame(columns=list(date_keys), dtype='int64')
+        first = min(m.min() for m in observed)
+        last = max(end_month, max(m.max() for m in observed))
+
+        index = pd.DatetimeIndex(
+            np.arange(first, last + 1).astype('datetime64[M]').astype('datetime64[ns]')
+        )
+        counts = {
+            key: np.bincount(m - first, minlength=last - first + 1) if len(m)
+            else np.zeros(last - first + 1, dtype=np.int64)
+            for key, m in months.items()
+        }
+        return pd.DataFrame(counts, index=index)
+
     def process_new_daos(self, df: pd.DataFrame, date_key: str) -> pd.DataFrame:
         """Process DAO data to get new DAOs per month."""
-        dff = df.copy()
-        
-        # Convert timestamp to datetime
-        dff[date_key] = dff[date_key].apply(lambda x: self.convert_timestamp(x))
-        dff = dff.dropna(subset=[date_key])
-        
-        # Convert to date and set to first of month
-        dff[date_key] = dff[date_key].dt.date
-        dff[date_key] = dff[date_key].apply(lambda d: d.replace(day=1))
-
-        # Group by date and count
-        dff = dff.groupby([date_key]).size().reset_index(name='count')
-
-        # Generate complete time series
-        today = date.today().replace(day=1)
-        start = dff[date_key].min()
-        idx = pd.date_range(start=start, end=today, freq=DateOffset(months=1))
-
-        # Create complete timeline
-        df_complete = pd.DataFrame({
-            date_key: idx.date,
-            'count': 0
+        monthly = self.monthly_counts(df, [date_key])
+        if monthly.empty:
+            return pd.DataFrame({date_key: [], 'count': []})
+        return pd.DataFrame({
+            date_key: monthly.index.date,
+            'count': monthly[date_key].to_numpy()
         })
 
-        # Merge with actual data
-        dff = pd.concat([dff, df_complete]).drop_duplicates(subset=date_key, keep="first")
-        return dff.sort_values(date_key)
-
     def calculate_cumulative_total(self, values: List[float]) -> List[float]:
         """Calculate cumulative total from a list of values."""
-        return [sum(values[:i+1]) for i in range(len(values))]
+        return np.cumsum(values).tolist()
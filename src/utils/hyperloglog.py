@@ -0,0 +1,150 @@
+import base64
+import math
+from typing import Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+# z-score used for the reported confidence interval (95%)
+CONFIDENCE_Z = 1.96
+
+
+class HyperLogLog:
+    """Mergeable HyperLogLog sketch for approximate distinct counts.
+
+    Values are hashed with pandas' 64-bit hashing, so categorical and
+    object columns holding the same strings produce the same sketch.
+    Sketches of equal precision can be merged to count true unions
+    across chunks, columns, datasets and dataset versions.
+    """
+
+    MIN_PRECISION = 4
+    MAX_PRECISION = 18
+
+    def __init__(self, precision: int = 14):
+        """
+        Initialize an empty sketch.
+
+        Args:
+            precision: Number of index bits; uses 2**precision one-byte
+                registers with a relative standard error of 1.04/sqrt(2**precision)
+        """
+        if not self.MIN_PRECISION <= precision <= self.MAX_PRECISION:
+            raise ValueError(
+                f"Precision must be between {self.MIN_PRECISION} and "
+                f"{self.MAX_PRECISION}"
+            )
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def num_registers(self) -> int:
+        return len(self.registers)
+
+    @property
+    def relative_error(self) -> float:
+        """Relative standard error of the estimate"""
+        return self.standard_error(self.precision)
+
+    @staticmethod
+    def standard_error(precision: int) -> float:
+        """Relative standard error of a sketch with the given precision"""
+        return 1.04 / math.sqrt(1 << precision)
+
+    def add(self, values) -> 'HyperLogLog':
+        """Add a Series or array of values, ignoring missing ones"""
+        series = values if isinstance(values, pd.Series) else pd.Series(values)
+        series = series.dropna()
+        if len(series) == 0:
+            return self
+        hashes = pd.util.hash_pandas_object(series, index=False).to_numpy(
+            dtype=np.uint64
+        )
+        self.add_hashes(hashes)
+        return self
+
+    def add_hashes(self, hashes: np.ndarray) -> None:
+        """Add precomputed 64-bit hashes"""
+        p = self.precision
+        index = (hashes >> np.uint64(64 - p)).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - p)) - 1)
+        # Rank of the first set bit in the remaining 64 - p bits
+        rank = (64 - p) - _bit_length(rest) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """Fold another sketch into this one (in place)"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    @classmethod
+    def union(cls, sketches: Iterable['HyperLogLog']) -> 'HyperLogLog':
+        """New sketch counting the union of the given sketches"""
+        sketches = list(sketches)
+        if not sketches:
+            return cls()
+        result = cls(sketches[0].precision)
+        for sketch in sketches:
+            result.merge(sketch)
+        return result
+
+    def estimate(self) -> float:
+        """Estimated number of distinct values"""
+        m = self.num_registers
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros > 0:
+            # Linear counting is more accurate for small cardinalities
+            return m * math.log(m / zeros)
+        return float(raw)
+
+    def count(self) -> int:
+        """Estimated number of distinct values, rounded"""
+        return int(round(self.estimate()))
+
+    def bounds(self, z: float = CONFIDENCE_Z) -> Tuple[int, int]:
+        """Confidence interval for the distinct count"""
+        estimate = self.estimate()
+        margin = z * self.relative_error * estimate
+        return max(0, int(math.floor(estimate - margin))), int(
+            math.ceil(estimate + margin)
+        )
+
+    def to_bytes(self) -> bytes:
+        return bytes([self.precision]) + self.registers.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'HyperLogLog':
+        sketch = cls(data[0])
+        registers = np.frombuffer(data[1:], dtype=np.uint8)
+        if len(registers) != sketch.num_registers:
+            raise ValueError("Serialized sketch does not match its precision")
+        sketch.registers = registers.copy()
+        return sketch
+
+    def to_base64(self) -> str:
+        """JSON-friendly serialization"""
+        return base64.b64encode(self.to_bytes()).decode('ascii')
+
+    @classmethod
+    def from_base64(cls, data: str) -> 'HyperLogLog':
+        return cls.from_bytes(base64.b64decode(data))
+
+    def __repr__(self) -> str:
+        return f"HyperLogLog(precision={self.precision}, estimate={self.count()})"
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Vectorized int.bit_length for uint64 arrays.
+
+    Each 32-bit half is exactly representable as float64, so frexp gives
+    its bit length without rounding.
+    """
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    high_bits = np.frexp(high)[1]
+    low_bits = np.frexp(low)[1]
+    return np.where(high_bits > 0, high_bits + 32, low_bits)
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last point and, from each of ``threshold - 2``
+    equal buckets in between, the point forming the largest triangle with
+    the previously kept point and the mean of the next bucket. Peaks and
+    troughs survive, unlike with plain decimation.
+
+    Args:
+        x: Increasing x values (numeric)
+        y: y values
+        threshold: Number of points to keep
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Bucket edges over the points between the first and the last
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[end:next_end].mean() if next_end > end else x[-1]
+        next_y = y[end:next_end].mean() if next_end > end else y[-1]
+
+        # Twice the triangle areas; the constant factor doesn't change the argmax
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        kept[i + 1] = previous
+    return kept
+
+
+def downsample_series(series: pd.Series, threshold: int) -> pd.Series:
+    """LTTB-downsample a Series with a numeric or datetime index"""
+    if len(series) <= threshold:
+        return series
+    index = series.index
+    x = (
+        index.asi8
+        if isinstance(index, pd.DatetimeIndex)
+        else np.asarray(index, dtype=np.float64)
+    )
+    return series.iloc[lttb(x, series.to_numpy(dtype=np.float64), threshold)]
@@ -1,10 +1,27 @@
 import plotly.graph_objects as go
-from typing import Dict
+import plotly.io as pio
+from plotly.subplots import make_subplots
+from pathlib import Path
+from typing import Dict, List, Mapping, Union
 import logging
 
+import pandas as pd
+
+from src.visualization.downsampling import downsample_series
+from src.visualization.plot_config import PlotConfig
+
+# Points kept per trace when downsampling in batch mode
+DEFAULT_POINT_BUDGET = 2000
+
 class DAOPlotter:
-    def __init__(self):
+    def __init__(self, point_budget: int = DEFAULT_POINT_BUDGET):
+        """
+        Args:
+            point_budget: Maximum points per trace in batch figures; longer
+                series are downsampled with LTTB
+        """
         self.logger = logging.getLogger(__name__)
+        self.point_budget = point_budget
 
     def create_scatter_trace(self, x_data, y_data, name: str) -> go.Scatter:
         return go.Scatter(
@@ -24,15 +41,90 @@ class DAOPlotter:
                         dataset_name
                     )]
                 )
-                
+
                 fig.update_layout(
                     title=f"Data Analysis for {dataset_name}",
                     xaxis_title="Date",
                     yaxis_title="Count"
                 )
-                
+
                 fig.show()
-                
+
         except Exception as e:
             self.logger.error(f"Error creating plots: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    def create_batch_figure(self, frames: Mapping[str, pd.DataFrame],
+                            title: str = "DAO Activity") -> go.Figure:
+        """Compose every dataset into one WebGL figure, one row per dataset.
+
+        Each frame is indexed by date with one column per series (e.g.
+        ``RollupCube.query(..., by='platform_network')``). Columns named like
+        a ``PlotConfig.PLATFORM_STYLES`` key get that color and symbol, and
+        share one legend entry across rows.
+        """
+        names = list(frames)
+        fig = make_subplots(
+            rows=max(1, len(names)), cols=1, shared_xaxes=True,
+            subplot_titles=names, vertical_spacing=0.04
+        )
+        shown = set()
+        for row, dataset_name in enumerate(names, start=1):
+            for column in frames[dataset_name].columns:
+                series = downsample_series(
+                    frames[dataset_name][column], self.point_budget
+                )
+                key = str(column)
+                style = PlotConfig.PLATFORM_STYLES.get(key, {})
+                fig.add_trace(
+                    go.Scattergl(
+                        x=series.index,
+                        y=series.to_numpy(),
+                        name=key,
+                        legendgroup=key,
+                        showlegend=key not in shown,
+                        mode='lines+markers' if len(series) <= 200 else 'lines',
+                        line={'color': style['color']} if 'color' in style else None,
+                        marker=style or None
+                    ),
+                    row=row, col=1
+                )
+                shown.add(key)
+
+        layout = PlotConfig.get_base_layout([])
+        fig.update_layout(
+            title=title,
+            plot_bgcolor=layout['plot_bgcolor'],
+            legend=layout['legend'],
+            height=max(400, 250 * len(names))
+        )
+        fig.update_yaxes(showgrid=True, gridcolor=layout['yaxis']['gridcolor'])
+        return fig
+
+    def write_figures(self, figures: Mapping[str, go.Figure],
+                      output_dir: Union[str, Path],
+                      fmt: str = 'html') -> List[Path]:
+        """Write figures as ``<name>.<fmt>`` files in bulk.
+
+        HTML files reference one plotly.min.js written next to them instead
+        of embedding the bundle in each file. Image formats (png, svg, pdf)
+        need the optional kaleido package.
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        paths = [output_dir / f"{name}.{fmt}" for name in figures]
+        try:
+            if fmt == 'html':
+                for fig, path in zip(figures.values(), paths):
+                    fig.write_html(str(path), include_plotlyjs='directory')
+            elif hasattr(pio, 'write_images'):
+                pio.write_images(list(figures.values()), [str(path) for path in paths])
+            else:
+                # plotly < 6.1 has no batch export; write one image at a time
+                for fig, path in zip(figures.values(), paths):
+                    fig.write_image(str(path))
+        except Exception as e:
+            self.logger.error(f"Error writing figures: {str(e)}")
+            raise
+        self.logger.info(f"Wrote {len(paths)} figures to {output_dir}")
+        return paths
@@ -0,0 +1,37 @@
+"""The duckdb and polars backends must give the pandas backend's results."""
+import pandas as pd
+import pytest
+
+from benchmarks.backend_parity import DEFAULT_RTOL, differences
+from src.processors.dao_processor import DAODataProcessor
+
+
+@pytest.fixture
+def votes_csv(tmp_path):
+    path = tmp_path / 'votes.csv'
+    pd.DataFrame({
+        'id': range(8),
+        'proposal': ['p1', 'p1', 'p2', 'p2', 'p2', 'p3', 'p3', 'p4'],
+        'platform': ['aragon'] * 4 + ['daohaus'] * 4,
+        'network': [
+            'mainnet', 'mainnet', 'xdai', None, 'xdai', 'mainnet', 'xdai', 'xdai'
+        ],
+        'voterAddress': ['0xa', '0xb', '0xa', '0xc', '0xd', '0xb', '0xa', '0xe'],
+        'support': [True, False, True, True, False, True, True, False],
+        'weight': [1.5, 2.25, 10.0, 0.1, 3.0, 7.75, 1.0, 4.5],
+        'createdAt': [
+            1609459200, 1609462800, 1609545600, 1612137600,
+            1612224000, 1614556800, 1617235200, 1617321600
+        ]
+    }).to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize('backend', ['duckdb', 'polars'])
+def test_backend_matches_pandas(backend, votes_csv):
+    pytest.importorskip(backend)
+    metadata = {'name': 'votes'}
+    expected = DAODataProcessor().process_path(votes_csv, metadata)
+    actual = DAODataProcessor(backend=backend).process_path(votes_csv, metadata)
+
+    assert differences(expected, actual, DEFAULT_RTOL) == []
@@ -0,0 +1,66 @@
+"""Light commands must start quickly and without the data stack."""
+import subprocess
+import sys
+import time
+
+import pytest
+
+from benchmarks.startup_time import (
+    DEFAULT_MAX_SECONDS,
+    FIXTURE_VOTES,
+    HEAVY_MODULES,
+    LIGHT_COMMANDS,
+    MAIN,
+)
+from benchmarks.synthetic import generate
+
+# Runs main.py in-process and prints the heavy modules it left imported
+PROBE = """
+import runpy, sys
+sys.path.insert(0, {root!r})
+sys.argv = [{main!r}] + {args!r}
+try:
+    runpy.run_path({main!r}, run_name='__main__')
+except SystemExit as e:
+    if e.code:
+        raise
+print(sorted(name for name in {heavy!r} if name in sys.modules))
+"""
+# Timed runs per command; the fastest must fit the budget
+TIMED_RUNS = 3
+
+
+@pytest.fixture(scope='module')
+def mirror(tmp_path_factory):
+    path = tmp_path_factory.mktemp('mirror')
+    generate(path, votes=FIXTURE_VOTES)
+    return path
+
+
+def command_args(command, mirror):
+    return [arg.format(mirror=mirror) for arg in LIGHT_COMMANDS[command]]
+
+
+@pytest.mark.parametrize('command', list(LIGHT_COMMANDS))
+def test_light_command_skips_heavy_imports(command, mirror, tmp_path):
+    probe = PROBE.format(root=str(MAIN.parent), main=str(MAIN),
+                         args=command_args(command, mirror), heavy=HEAVY_MODULES)
+    proc = subprocess.run([sys.executable, '-c', probe], cwd=tmp_path,
+                          capture_output=True, text=True)
+
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.splitlines()[-1] == '[]'
+
+
+@pytest.mark.parametrize('command', list(LIGHT_COMMANDS))
+def test_light_command_within_budget(command, mirror, tmp_path):
+    args = [sys.executable, str(MAIN)] + command_args(command, mirror)
+    # Warm-up run, so bytecode compilation is not timed
+    subprocess.run(args, cwd=tmp_path, capture_output=True, check=True)
+    timings = []
+    for _ in range(TIMED_RUNS):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=tmp_path, capture_output=True, check=True)
+        timings.append(time.perf_counter() - start)
+
+    assert min(timings) < DEFAULT_MAX_SECONDS